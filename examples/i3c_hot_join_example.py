@@ -20,26 +20,23 @@ def main():
         (_, targets) = i3c.targets()
         print(f"The targets added via the ENTDAA CCC are: {targets}")
 
-    # Add hot-join procedure filter and handler
-    def is_hot_join(name, message):
-        return message['name'].strip() == "I3C IBI NOTIFICATION" and message['header']['type'] == "IBI_HOT_JOIN"
-    
-    def handle_hot_join(name, message): 
-        new_target = {'dynamic_address': message['header']['address'], 'bcr': message['bcr'], 'dcr': message['dcr'], 'pid': message['pid']}
-        print(f"NOTIFICATION: New device added via hot-join procedure -> {new_target}")
+    # The interface adds hot-joined targets to its table by itself. The listener is called once the new
+    # target is usable.
+    def handle_hot_join(target, latency_ns):
+        print(f"NOTIFICATION: New device added via hot-join procedure -> {target.to_dict()}, usable after {latency_ns} ns")
         hot_join_event.set()
 
-    device.on_notification(name="hot-join", filter_func=is_hot_join, handler_func=handle_hot_join)
+    i3c.on_hot_join(handle_hot_join)
 
     # Wait for hot-join procedure
     # This approach eliminates the need for an infinite loop. If you prefer an alternative method that allows you to perform other tasks concurrently 
     # while waiting for the hot-join procedure, you can replace the usage of "hot_join_event" with your custom code to achieve non-blocking behavior. 
     hot_join_event.wait()
     
-    # Show the device table after the hot-join
-    (_, targets) = i3c.targets()
+    # Show the device table after the hot-join, without reading it from the Supernova again
+    (_, targets) = i3c.cached_targets()
     print(f"The target table is: {targets}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -46,4 +46,24 @@ class BackendError(Exception):
     def __init__(self, message="An error occurred in the backend", original_exception=None):
         self.message = f"{message}: {original_exception}" if original_exception else message
         self.original_exception = original_exception
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+class TransferTimeoutError(Exception):
+    """Exception raised when a transfer is not completed before its deadline."""
+
+    def __init__(self, message="Transfer deadline expired"):
+        self.message = message
+        super().__init__(self.message)
+
+class ScriptValidationError(Exception):
+    """Exception raised when a transaction script is not valid."""
+
+    def __init__(self, message="Invalid transaction script"):
+        self.message = message
+        super().__init__(self.message)
+
+class TransferQueueFullError(Exception):
+    """Exception raised when a transfer is rejected because too many transfers are outstanding."""
+
+    def __init__(self, message="Too many transfers outstanding"):
+        self.message = message
+        super().__init__(self.message)
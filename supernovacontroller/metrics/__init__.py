@@ -0,0 +1,5 @@
+from .collector import TransferMetrics
+from .exporter import MetricsHTTPExporter, MetricsTextfileExporter
+from .openmetrics import render
+
+__all__ = ['TransferMetrics', 'MetricsHTTPExporter', 'MetricsTextfileExporter', 'render']
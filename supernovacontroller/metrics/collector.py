@@ -0,0 +1,123 @@
+import threading
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Interface of a command, from the first word of its name
+_INTERFACES = {
+    "I2C": "i2c",
+    "I3C": "i3c",
+    "SPI": "spi",
+    "UART": "uart",
+    "GPIO": "gpio",
+}
+
+# Response fields holding a result or error code
+_CODE_FIELDS = ("status", "result", "usb_error", "manager_error", "driver_error")
+
+
+def _is_success_code(code):
+    return not isinstance(code, str) or "SUCCESS" in code or "NO_ERROR" in code or "NO_TRANSFER_ERROR" in code
+
+
+def command_name(response):
+    name = response.get("name")
+    return name.strip() if isinstance(name, str) else "UNKNOWN"
+
+
+def interface_name(command):
+    return _INTERFACES.get(command.split(" ", 1)[0], "system")
+
+
+def response_errors(response):
+    """
+    Returns the error codes reported by a response, or an empty list if it reports success.
+
+    I3C transfers report their result in the header and their errors in the descriptor. Other commands report
+    codes like the I2C status or the USB, manager and driver errors, which name successful results explicitly,
+    e.g. NO_TRANSFER_ERROR or SYS_NO_ERROR.
+    """
+    header = response.get("header")
+    if isinstance(header, dict) and "result" in header:
+        if _is_success_code(header["result"]):
+            return []
+        return list((response.get("descriptor") or {}).get("errors") or [header["result"]])
+
+    return [response[field] for field in _CODE_FIELDS if field in response and not _is_success_code(response[field])]
+
+
+class TransferMetrics:
+    """
+    Counters of the transfers and notifications of a device, exported by the exporters of this package.
+
+    Counters:
+    - transfers: Responses per (interface, command).
+    - errors: Error codes per (interface, command, code).
+    - latency: Histogram of the round-trip times per interface, with LATENCY_BUCKETS_S buckets.
+    - notifications: Notifications per name, e.g. I3C IBI NOTIFICATION.
+
+    Note:
+    - Commands are named after the response, so every I3C transfer and CCC is counted as I3C TRANSFER.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.transfers = {}
+            self.errors = {}
+            # Interface -> [bucket counts, count, sum in seconds]
+            self.latency = {}
+            self.notifications = {}
+
+    def record_response(self, response, latency_ns: int = None):
+        command = command_name(response)
+        interface = interface_name(command)
+        errors = response_errors(response)
+
+        with self.lock:
+            key = (interface, command)
+            self.transfers[key] = self.transfers.get(key, 0) + 1
+            for code in errors:
+                key = (interface, command, str(code))
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+            if latency_ns is not None:
+                latency_s = latency_ns / 1e9
+                histogram = self.latency.get(interface)
+                if histogram is None:
+                    histogram = self.latency[interface] = [[0] * len(LATENCY_BUCKETS_S), 0, 0.0]
+                for index, bound in enumerate(LATENCY_BUCKETS_S):
+                    if latency_s <= bound:
+                        histogram[0][index] += 1
+                        break
+                histogram[1] += 1
+                histogram[2] += latency_s
+
+    def record_notification(self, message):
+        name = command_name(message)
+        with self.lock:
+            self.notifications[name] = self.notifications.get(name, 0) + 1
+
+    def snapshot(self):
+        """
+        Returns a copy of the counters. Latency buckets are cumulative, as exported.
+        """
+        with self.lock:
+            latency = {}
+            for interface, (buckets, count, total) in self.latency.items():
+                cumulative = []
+                running = 0
+                for bucket in buckets:
+                    running += bucket
+                    cumulative.append(running)
+                latency[interface] = {"buckets": list(zip(LATENCY_BUCKETS_S, cumulative)), "count": count, "sum": total}
+
+            return {
+                "transfers": dict(self.transfers),
+                "errors": dict(self.errors),
+                "latency": latency,
+                "notifications": dict(self.notifications),
+            }
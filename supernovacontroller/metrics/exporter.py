@@ -0,0 +1,135 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..utils.logging import logging
+from . import openmetrics
+
+logger = logging.getLogger("supernovacontroller")
+
+
+def _device_labels(devices):
+    """
+    Returns the devices keyed by their label: the given keys for a dictionary, and the USB address of each
+    device, or its index, for a list.
+    """
+    if isinstance(devices, dict):
+        return dict(devices)
+    return {device.usb_address or str(index): device for index, device in enumerate(devices)}
+
+
+def _enable_metrics(devices):
+    for device in devices.values():
+        if getattr(device, "metrics", None) is None:
+            device.enable_metrics()
+
+
+class MetricsHTTPExporter:
+    """
+    Serves the metrics of one or more devices in the OpenMetrics text format over HTTP, on /metrics.
+
+    The server only listens on localhost unless another address is given. Metrics collection is enabled on the
+    devices when the exporter is created.
+
+    Example:
+        exporter = MetricsHTTPExporter([device], port=9464)
+        exporter.start()
+        ...
+        exporter.close()
+    """
+
+    DEFAULT_PORT = 9464
+
+    def __init__(self, devices, port: int = DEFAULT_PORT, address: str = "127.0.0.1"):
+        """
+        Args:
+        devices: The devices to export, as a list or as a dictionary keyed by the value of their device label.
+        port (int, optional): The TCP port. 0 picks a free port, see the port attribute.
+        address (str, optional): The address to listen on.
+        """
+        self.devices = _device_labels(devices)
+        _enable_metrics(self.devices)
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = openmetrics.render(exporter.devices).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", openmetrics.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("Metrics exporter: " + format, *args)
+
+        self.server = ThreadingHTTPServer((address, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsTextfileExporter:
+    """
+    Periodically rewrites a file with the metrics of one or more devices, e.g. for the textfile collector of the
+    Prometheus node exporter. The file is replaced atomically, so readers never see a partial exposition.
+
+    Example:
+        exporter = MetricsTextfileExporter([device], "/var/lib/node_exporter/supernova.prom", interval_s=15)
+        exporter.start()
+    """
+
+    def __init__(self, devices, path: str, interval_s: float = 15.0):
+        """
+        Args:
+        devices: The devices to export, as a list or as a dictionary keyed by the value of their device label.
+        path (str): The file to write.
+        interval_s (float, optional): The time between writes, in seconds.
+        """
+        self.devices = _device_labels(devices)
+        _enable_metrics(self.devices)
+        self.path = path
+        self.interval_s = interval_s
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+
+    def write(self):
+        """
+        Writes the current metrics to the file.
+        """
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(openmetrics.render(self.devices))
+        os.replace(temporary_path, self.path)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        """
+        Stops the periodic writes, after writing the metrics one last time.
+        """
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.write()
+
+    def __run(self):
+        while not self.stopped.wait(self.interval_s):
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning("Unable to write the metrics to %s: %s", self.path, e)
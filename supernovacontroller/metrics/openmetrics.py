@@ -0,0 +1,94 @@
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Gauges taken from the transfer statistics of a device: metric name, statistics key and help text
+_STATISTICS_GAUGES = [
+    ("supernova_transfer_ids_in_flight", "in_flight", "Transfer ids waiting for a response."),
+    ("supernova_transfer_window", "window", "Sequences allowed at the adapter by the flow control."),
+    ("supernova_transfer_window_in_flight", "window_in_flight", "Sequences holding a slot of the flow control window."),
+    ("supernova_transfer_waiting_submitters", "waiting_submitters", "Submitters waiting for a slot of the flow control window."),
+]
+
+# Counters taken from the transfer statistics of a device
+_STATISTICS_COUNTERS = [
+    ("supernova_cancelled_transfers", "cancelled_transfers", "Transfers cancelled after their deadline."),
+    ("supernova_late_responses", "late_responses", "Responses of cancelled transfers, dropped."),
+    ("supernova_unmatched_responses", "unmatched_responses", "Responses that matched no transfer."),
+    ("supernova_rejected_transfers", "rejected_transfers", "Transfers rejected because the flow control window was full."),
+]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(devices):
+    """
+    Renders the metrics of several devices in the OpenMetrics text format.
+
+    Args:
+    devices (dict): The devices to export, keyed by the value of their device label. Devices without metrics,
+                    see SupernovaDevice.enable_metrics, only export their transfer statistics and queue depths.
+
+    Returns:
+    str: The exposition, ending with the # EOF marker.
+    """
+    families = {}
+
+    def add(name, metric_type, help_text, sample_name, labels, value):
+        family = families.setdefault(name, (metric_type, help_text, []))
+        family[2].append(f"{sample_name}{_labels(**labels)} {_number(value)}")
+
+    for label, device in devices.items():
+        snapshot = device.metrics.snapshot() if getattr(device, "metrics", None) is not None else None
+
+        if snapshot is not None:
+            for (interface, command), count in sorted(snapshot["transfers"].items()):
+                add("supernova_transfers", "counter", "Transfers answered by the Supernova.", "supernova_transfers_total",
+                    {"device": label, "interface": interface, "command": command}, count)
+            for (interface, command, code), count in sorted(snapshot["errors"].items()):
+                add("supernova_transfer_errors", "counter", "Error codes reported in the responses.", "supernova_transfer_errors_total",
+                    {"device": label, "interface": interface, "command": command, "code": code}, count)
+            for interface, histogram in sorted(snapshot["latency"].items()):
+                name = "supernova_transfer_latency_seconds"
+                help_text = "Time between a request and its response."
+                for bound, count in histogram["buckets"]:
+                    add(name, "histogram", help_text, f"{name}_bucket", {"device": label, "interface": interface, "le": bound}, count)
+                add(name, "histogram", help_text, f"{name}_bucket", {"device": label, "interface": interface, "le": "+Inf"}, histogram["count"])
+                add(name, "histogram", help_text, f"{name}_count", {"device": label, "interface": interface}, histogram["count"])
+                add(name, "histogram", help_text, f"{name}_sum", {"device": label, "interface": interface}, histogram["sum"])
+            for name, count in sorted(snapshot["notifications"].items()):
+                add("supernova_notifications", "counter", "Notifications received from the Supernova.", "supernova_notifications_total",
+                    {"device": label, "name": name}, count)
+
+        queues = {
+            "responses": device.response_queue.qsize(),
+            "notifications": device.notification_queue.qsize(),
+            "pending_sequences": len(device.controller.request_states),
+        }
+        for queue_name, depth in queues.items():
+            add("supernova_queue_depth", "gauge", "Items waiting in the queues of the device.", "supernova_queue_depth",
+                {"device": label, "queue": queue_name}, depth)
+
+        statistics = device.get_transfer_statistics()
+        for name, key, help_text in _STATISTICS_GAUGES:
+            if key in statistics:
+                add(name, "gauge", help_text, name, {"device": label}, statistics[key])
+        for name, key, help_text in _STATISTICS_COUNTERS:
+            if key in statistics:
+                add(name, "counter", help_text, f"{name}_total", {"device": label}, statistics[key])
+
+    lines = []
+    for name, (metric_type, help_text, samples) in families.items():
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.extend(samples)
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,258 @@
+import time
+from collections import deque
+from threading import Condition, Lock
+from typing import Any, NamedTuple
+
+from BinhoSupernova.commands.definitions import GpioPinNumber, GpioTriggerType
+from supernovacontroller.errors import BackendError, TransferQueueFullError, TransferTimeoutError
+
+# Request builders of the reads an acquisition can be bound to
+from .prepared import i2c_read_request, i3c_read_request, spi_transfer_request
+
+
+class AcquisitionSample(NamedTuple):
+    """
+    Result of the read submitted for one trigger.
+
+    Attributes:
+    sequence (int): Trigger number, starting at 0. Gaps indicate skipped triggers.
+    success (bool): Whether the read succeeded.
+    data: The data read, or the error reported by the Supernova.
+    trigger_timestamp_ns (int): time.monotonic_ns() when the trigger notification arrived.
+    data_timestamp_ns (int): time.monotonic_ns() when the read response arrived.
+    """
+    sequence: int
+    success: bool
+    data: Any
+    trigger_timestamp_ns: int
+    data_timestamp_ns: int
+
+    @property
+    def latency_ns(self):
+        return self.data_timestamp_ns - self.trigger_timestamp_ns
+
+
+class TriggeredAcquisition:
+    """
+    Binds a trigger source to a pre-built read.
+
+    Every time the trigger fires, the read is submitted straight from the notification thread without waiting
+    for its response, and the result is appended to a bounded sample stream together with the measured
+    trigger-to-data latency. The notification thread never waits for a slot of the flow control window either:
+    a trigger arriving while the window is full is skipped.
+
+    Example:
+        request, decode = i3c_read_request(i3c, target_address, [0x1D], 14)
+        acquisition = TriggeredAcquisition(device.controller, request, decode)
+        acquisition.trigger_on_gpio(gpio, GpioPinNumber.GPIO_5, GpioTriggerType.TRIGGER_RISING_EDGE)
+        acquisition.start()
+        for sample in acquisition.samples(timeout=1):
+            print(sample.data, sample.latency_ns)
+        acquisition.stop()
+    """
+
+    DEFAULT_MAX_SAMPLES = 1024
+
+    def __init__(self, controller, request, decode, max_samples: int = DEFAULT_MAX_SAMPLES, max_in_flight: int = 1):
+        """
+        Args:
+        controller (SupernovaTransferController): The controller of the device.
+        request: Function that issues the read on the driver given a transfer id.
+        decode: Function that turns the read response into a (success, data) tuple.
+        max_samples (int, optional): Capacity of the sample stream. When full, the oldest sample is discarded.
+        max_in_flight (int, optional): Maximum number of reads awaiting a response. Triggers arriving while
+                                       the limit is reached are skipped and counted.
+        """
+        self.controller = controller
+        self.request = request
+        self.decode = decode
+        self.max_in_flight = max_in_flight
+
+        self.running = False
+        self.condition = Condition()
+        self.samples_queue = deque(maxlen=max_samples)
+        self.in_flight = 0
+        self.sequence = 0
+        self.statistics_lock = Lock()
+        self.statistics = self.__new_statistics()
+
+        self.__detach_trigger = None
+
+    @staticmethod
+    def __new_statistics():
+        return {
+            "triggers": 0,
+            "skipped": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "latency_min_ns": None,
+            "latency_max_ns": None,
+            "latency_total_ns": 0,
+        }
+
+    def trigger_on_gpio(self, gpio, pin_number: GpioPinNumber, trigger: GpioTriggerType = None, debounce_us: int = 0):
+        """
+        Uses a GPIO interrupt as trigger source.
+
+        Args:
+        gpio (SupernovaGPIOInterface): The GPIO interface of the device.
+        pin_number (GpioPinNumber): The pin the data-ready signal is routed to.
+        trigger (GpioTriggerType, optional): If provided, the interrupt is armed with set_interrupt.
+                                             Otherwise the pin must already be armed.
+        debounce_us (int, optional): Software debounce interval passed to set_interrupt.
+
+        Raises:
+        BackendError: If the interrupt could not be armed.
+        """
+        if trigger is not None:
+            (success, result) = gpio.set_interrupt(pin_number, trigger, debounce_us)
+            if not success:
+                raise BackendError(result)
+
+        def on_gpio_event(event):
+            self.__on_trigger(event.timestamp_ns)
+
+        gpio.gpio_notification.add_listener(pin_number, on_gpio_event)
+        self.__set_trigger(lambda: gpio.gpio_notification.remove_listener(pin_number, on_gpio_event))
+
+    def trigger_on_ibi(self, device, dynamic_address):
+        """
+        Uses the IBIs of a target as trigger source.
+
+        Args:
+        device (SupernovaDevice): The device the I3C controller interface belongs to.
+        dynamic_address (int): Dynamic address of the target whose IBIs trigger the read.
+        """
+        subscription_name = f"Triggered acquisition IBI 0x{dynamic_address:02X} ({id(self):x})"
+
+        def is_target_ibi(name, message):
+            return message["name"].strip() == "I3C IBI NOTIFICATION" and message["header"]["type"] == "IBI_NORMAL" \
+                and message["header"]["address"] == dynamic_address
+
+        def handle_target_ibi(name, message):
+            self.__on_trigger(time.monotonic_ns())
+
+        device.on_notification(name=subscription_name, filter_func=is_target_ibi, handler_func=handle_target_ibi)
+        self.__set_trigger(lambda: device.remove_notification(subscription_name))
+
+    def __set_trigger(self, detach):
+        if self.__detach_trigger is not None:
+            self.__detach_trigger()
+        self.__detach_trigger = detach
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        """
+        Stops submitting reads on new triggers. Reads already in flight still land in the stream.
+        """
+        self.running = False
+
+    def close(self):
+        """
+        Stops the acquisition and detaches it from its trigger source.
+        """
+        self.stop()
+        self.__set_trigger(None)
+
+    def __on_trigger(self, trigger_timestamp_ns):
+        if not self.running:
+            return
+
+        with self.condition:
+            sequence = self.sequence
+            self.sequence += 1
+            with self.statistics_lock:
+                self.statistics["triggers"] += 1
+                if self.in_flight >= self.max_in_flight:
+                    self.statistics["skipped"] += 1
+                    return
+            self.in_flight += 1
+
+        def on_ready(responses):
+            try:
+                result = self.decode(responses[0])
+            except Exception as e:
+                result = (False, str(e))
+            self.__on_data(sequence, trigger_timestamp_ns, result)
+
+        def on_error(responses, error):
+            self.__on_data(sequence, trigger_timestamp_ns, (False, str(error)))
+
+        try:
+            # A zero deadline makes the submission fail instead of blocking the notification thread
+            with self.controller.deadline(0):
+                self.controller.submit(self.request, on_ready=on_ready, on_error=on_error)
+        except (TransferQueueFullError, TransferTimeoutError):
+            with self.condition:
+                self.in_flight -= 1
+            with self.statistics_lock:
+                self.statistics["skipped"] += 1
+        except Exception as e:
+            self.__on_data(sequence, trigger_timestamp_ns, (False, str(e)))
+
+    def __on_data(self, sequence, trigger_timestamp_ns, result):
+        data_timestamp_ns = time.monotonic_ns()
+        (success, data) = result
+        sample = AcquisitionSample(sequence, success, data, trigger_timestamp_ns, data_timestamp_ns)
+        latency_ns = sample.latency_ns
+
+        with self.statistics_lock:
+            statistics = self.statistics
+            statistics["completed" if success else "failed"] += 1
+            statistics["latency_total_ns"] += latency_ns
+            if statistics["latency_min_ns"] is None or latency_ns < statistics["latency_min_ns"]:
+                statistics["latency_min_ns"] = latency_ns
+            if statistics["latency_max_ns"] is None or latency_ns > statistics["latency_max_ns"]:
+                statistics["latency_max_ns"] = latency_ns
+
+        with self.condition:
+            self.in_flight -= 1
+            if len(self.samples_queue) == self.samples_queue.maxlen:
+                with self.statistics_lock:
+                    self.statistics["dropped"] += 1
+            self.samples_queue.append(sample)
+            self.condition.notify_all()
+
+    def get_sample(self, timeout=None):
+        """
+        Removes and returns the oldest sample, blocking until one is available.
+
+        Args:
+        timeout: The duration in seconds to wait for a sample. None waits forever.
+
+        Returns:
+        AcquisitionSample: The sample, or None if the timeout expired.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.samples_queue) > 0, timeout):
+                return None
+            return self.samples_queue.popleft()
+
+    def samples(self, timeout=None):
+        """
+        Iterates over samples as they arrive, stopping once no sample arrives within timeout seconds.
+        """
+        while True:
+            sample = self.get_sample(timeout)
+            if sample is None:
+                return
+            yield sample
+
+    def get_statistics(self):
+        """
+        Returns the trigger, read and latency counters of the acquisition.
+
+        Returns:
+        dict: Number of triggers, skipped triggers, completed and failed reads, samples dropped because the
+              stream was full, and the minimum, maximum and average trigger-to-data latency in nanoseconds.
+        """
+        with self.statistics_lock:
+            statistics = dict(self.statistics)
+
+        reads = statistics["completed"] + statistics["failed"]
+        statistics["latency_avg_ns"] = statistics.pop("latency_total_ns") / reads if reads else None
+
+        return statistics
@@ -0,0 +1,505 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+from transfer_controller import TransferController
+
+from supernovacontroller.errors import TransferTimeoutError
+
+from .flow_control import FlowControl
+from .scheduler import Priority
+
+
+class TransferIdAllocator:
+    """
+    Hands out transfer ids in the 16-bit space of the Supernova protocol.
+
+    Ids go from 1 to 65535, since 0 is reserved for notifications, and wrap around. An id stays in flight from
+    its allocation until it is released, and ids in flight are skipped, so a wrapped id never collides with the
+    id of an outstanding transfer.
+
+    The allocator is also an iterator, so it can be used as the id generator of a TransferController.
+    """
+
+    MAX_ID = 0xFFFF
+
+    def __init__(self, start_id: int = 0):
+        """
+        Args:
+        start_id (int, optional): The id after which ids are handed out.
+        """
+        self.lock = threading.Lock()
+        self.last_id = start_id % self.MAX_ID
+        self.in_flight = set()
+        self.peak_in_flight = 0
+        self.allocated = 0
+        self.wraps = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.allocate()
+
+    def allocate(self):
+        """
+        Returns a free id and marks it as in flight.
+
+        Raises:
+        RuntimeError: If every id is in flight.
+        """
+        return self.allocate_many(1)[0]
+
+    def allocate_many(self, count: int):
+        """
+        Returns count free ids, in allocation order, and marks them as in flight.
+
+        Raises:
+        RuntimeError: If there are not enough free ids.
+        """
+        with self.lock:
+            if len(self.in_flight) + count > self.MAX_ID:
+                raise RuntimeError(f"No transfer id available: {len(self.in_flight)} transfers in flight")
+
+            ids = []
+            transfer_id = self.last_id
+            while len(ids) < count:
+                if transfer_id == self.MAX_ID:
+                    transfer_id = 1
+                    self.wraps += 1
+                else:
+                    transfer_id += 1
+                if transfer_id not in self.in_flight:
+                    self.in_flight.add(transfer_id)
+                    ids.append(transfer_id)
+
+            self.last_id = transfer_id
+            self.allocated += count
+            self.peak_in_flight = max(self.peak_in_flight, len(self.in_flight))
+            return ids
+
+    def release(self, transfer_id):
+        """
+        Marks an id as free again.
+        """
+        with self.lock:
+            self.in_flight.discard(transfer_id)
+
+    def get_statistics(self):
+        """
+        Returns the number of ids in flight, the peak number of ids in flight, the number of ids handed out and
+        the number of times the id space wrapped around.
+        """
+        with self.lock:
+            return {
+                "in_flight": len(self.in_flight),
+                "peak_in_flight": self.peak_in_flight,
+                "allocated": self.allocated,
+                "wraps": self.wraps,
+            }
+
+
+class SupernovaTransferController(TransferController):
+    """
+    TransferController with wrap-safe transfer ids and blocking submissions that expire after a deadline.
+
+    Transfer ids come from a TransferIdAllocator and are released when their response is handled, so ids of
+    outstanding transfers are never reused. Pending sequences are indexed by transfer id and forgotten once they
+    complete.
+
+    A deadline is given either as the timeout of a single sync_submit() call, as a default timeout for every
+    submission, or for a block of code with the deadline() context manager, which applies to every interface
+    method and batch called inside it from the same thread:
+
+        with device.controller.deadline(0.5):
+            i3c.read(0x08, i3c.TransferMode.I3C_SDR, [0x00], 2)
+
+    When a deadline expires the sequence is cancelled: it is completed without issuing its remaining transfers
+    and TransferTimeoutError is raised. The id of the transfer in flight stays reserved, so a response that
+    arrives later is dropped and counted instead of being taken for the response of another transfer.
+
+    With a FlowControl, every sequence holds a slot of its window from submission to completion, so the
+    number of sequences outstanding at the adapter is capped. Submitters wait for a slot until their deadline.
+    Waiting submitters are served by priority class, and fairly across flows within a class. Both are set for a
+    block of code with the scheduling() context manager; by default submissions have Priority.NORMAL and every
+    thread is a flow of its own:
+
+        with device.controller.scheduling(Priority.BULK, flow=("spi", "flash")):
+            spi.transfer(data, len(data))
+    """
+
+    # Ids of cancelled transfers kept to recognize their late responses
+    MAX_CANCELLED_IDS = 4096
+
+    def __init__(self, id_allocator: TransferIdAllocator = None, default_timeout: float = None, flow_control: FlowControl = None):
+        """
+        Args:
+        id_allocator (TransferIdAllocator, optional): The allocator of transfer ids.
+        default_timeout (float, optional): The time in seconds a blocking submission may take when no other
+                                           deadline applies. None waits forever.
+        flow_control (FlowControl, optional): The window capping the outstanding sequences. If None, the
+                                              number of outstanding sequences is not limited.
+        """
+        self.ids = id_allocator if id_allocator is not None else TransferIdAllocator()
+        super().__init__(self.ids)
+        self.default_timeout = default_timeout
+        self.flow_control = flow_control
+        # Collector of per-response metrics, see SupernovaDevice.enable_metrics
+        self.metrics = None
+        # Tracing callbacks, see TransferHooks. None while no callback is registered.
+        self.hooks = None
+        self.deadlines = threading.local()
+        self.schedules = threading.local()
+        # Pending sequences, keyed by the id of each of their transfers, and ids of cancelled transfers. Both are
+        # guarded by the same lock, so the id of a transfer is owned either by its pending sequence or by the
+        # cancelled ids, never by both, and is released exactly once.
+        self.states_lock = threading.Lock()
+        self.transfer_states = {}
+        self.cancelled_ids = OrderedDict()
+        self.cancelled_transfers = 0
+        self.late_responses = 0
+        self.unmatched_responses = 0
+
+    def _submit_sequence(self, sequence=None, on_ready=None, on_error=None, wait_for=None):
+        if self.flow_control is not None:
+            (priority, flow) = self.current_scheduling()
+            self.flow_control.acquire(self.remaining_time(), priority, flow)
+
+        try:
+            transfer_ids = self.ids.allocate_many(len(sequence))
+        except Exception:
+            if self.flow_control is not None:
+                self.flow_control.release()
+            raise
+
+        request_state = {
+            'current_index': 0,
+            'transfer_ids': transfer_ids,
+            'responses': [],
+            'sequence': sequence,
+            'on_ready': on_ready,
+            'on_error': on_error,
+            'complete_event': threading.Event(),
+            'issued_ns': None,
+        }
+
+        with self.states_lock:
+            sequence_id = self.sequence_counter
+            self.sequence_counter += 1
+            request_state['sequence_id'] = sequence_id
+            self.request_states[sequence_id] = request_state
+            for transfer_id in transfer_ids:
+                self.transfer_states[transfer_id] = request_state
+
+        def sequence_runner():
+            if wait_for is not None:
+                self.wait_for(wait_for)
+
+            self.__issue(request_state)
+
+        thread = threading.Thread(target=sequence_runner, daemon=True)
+        thread.start()
+
+        return sequence_id
+
+    def __issue(self, request_state):
+        """
+        Issues the current transfer of a sequence, unless the sequence was cancelled.
+        """
+        with self.global_lock:
+            if request_state['complete_event'].is_set():
+                return
+
+            current_index = request_state['current_index']
+            transfer_id = request_state['transfer_ids'][current_index]
+            issued_ns = request_state['issued_ns'] = time.perf_counter_ns()
+            if self.hooks is not None:
+                self.hooks.emit("submit", issued_ns, transfer_id, request_state['sequence_id'])
+            try:
+                request_state['sequence'][current_index](transfer_id)
+            except Exception as e:
+                if self.hooks is not None:
+                    self.hooks.emit("error", time.perf_counter_ns(), transfer_id, None, e)
+                # We are assuming that the exception was raised before triggering the
+                # downstream operation that eventually generates an asynchronous response
+                try:
+                    if request_state['on_error']:
+                        request_state['on_error'](request_state['responses'], e)
+                finally:
+                    self.__complete(request_state, released_ids=request_state['transfer_ids'][current_index:])
+
+    def __complete(self, request_state, released_ids=(), cancelled_id=None):
+        """
+        Completes a sequence, forgets it and releases the ids of the transfers that will not be answered.
+
+        Args:
+        cancelled_id (int, optional): The id of the transfer in flight, kept in the cancelled ids until its late
+                                      response arrives, unless its response is being handled already.
+
+        Returns:
+        bool: False if the sequence had already completed.
+        """
+        evicted = []
+        with self.states_lock:
+            if self.request_states.pop(request_state['sequence_id'], None) is None:
+                return False
+            for transfer_id in request_state['transfer_ids'][request_state['current_index']:]:
+                # The id may already belong to another sequence if its response was just handled
+                if self.transfer_states.get(transfer_id) is request_state:
+                    del self.transfer_states[transfer_id]
+                    if transfer_id == cancelled_id:
+                        self.cancelled_ids[transfer_id] = None
+                        while len(self.cancelled_ids) > self.MAX_CANCELLED_IDS:
+                            evicted.append(self.cancelled_ids.popitem(last=False)[0])
+            if cancelled_id is not None:
+                self.cancelled_transfers += 1
+
+        # The slot is freed before waking up the submitter, which may submit again right away
+        if self.flow_control is not None:
+            self.flow_control.release()
+
+        request_state['complete_event'].set()
+
+        # The late responses of the evicted cancelled transfers are not expected anymore
+        for transfer_id in [*released_ids, *evicted]:
+            self.ids.release(transfer_id)
+
+        return True
+
+    def handle_response(self, *, transfer_id, response):
+        with self.states_lock:
+            request_state = self.transfer_states.get(transfer_id)
+            if request_state is None:
+                return False
+
+            current_index = request_state['current_index']
+            if transfer_id != request_state['transfer_ids'][current_index]:
+                return True
+
+            # The response takes the id over from the sequence, so a concurrent cancel does not keep it
+            del self.transfer_states[transfer_id]
+
+        received_ns = time.perf_counter_ns()
+        rtt_ns = received_ns - request_state['issued_ns']
+        if self.flow_control is not None:
+            self.flow_control.on_response(rtt_ns)
+        if self.metrics is not None:
+            self.metrics.record_response(response, rtt_ns)
+        if self.hooks is not None:
+            self.hooks.emit("response", received_ns, transfer_id, response.get('name'), rtt_ns)
+
+        request_state['responses'].append(response)
+        request_state['current_index'] = current_index + 1
+        self.ids.release(transfer_id)
+
+        if current_index + 1 < len(request_state['sequence']):
+            self.__issue(request_state)
+        else:
+            # A failing callback must not keep the sequence, and its flow control slot, alive
+            try:
+                if request_state['on_ready']:
+                    request_state['on_ready'](request_state['responses'])
+            finally:
+                self.__complete(request_state)
+
+        return True
+
+    def wait_for(self, sequence_id):
+        with self.states_lock:
+            request_state = self.request_states.get(sequence_id)
+        if request_state is not None:
+            request_state['complete_event'].wait()
+
+    def wait_for_all(self):
+        with self.states_lock:
+            request_states = list(self.request_states.values())
+        for request_state in request_states:
+            request_state['complete_event'].wait()
+
+    @contextmanager
+    def deadline(self, timeout: float):
+        """
+        Sets the deadline of the blocking submissions done by the current thread inside the block.
+
+        Nested blocks can only shorten the deadline of the outer block.
+        """
+        deadline = time.monotonic() + timeout
+        previous = getattr(self.deadlines, "value", None)
+        self.deadlines.value = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            self.deadlines.value = previous
+
+    @contextmanager
+    def scheduling(self, priority: Priority = None, flow=None, override: bool = True):
+        """
+        Sets the priority class and flow of the submissions done by the current thread inside the block.
+
+        Args:
+        priority (Priority, optional): The priority class. None keeps the one of the enclosing block.
+        flow (optional): The flow, any hashable value. None keeps the one of the enclosing block.
+        override (bool, optional): If False, the values only apply where no enclosing block set them. Used by
+                                   interfaces to set defaults, e.g. for bulk transfers, that callers can override.
+        """
+        previous = getattr(self.schedules, "value", (None, None))
+        if override:
+            current = (priority if priority is not None else previous[0], flow if flow is not None else previous[1])
+        else:
+            current = (previous[0] if previous[0] is not None else priority, previous[1] if previous[1] is not None else flow)
+        self.schedules.value = current
+        try:
+            yield
+        finally:
+            self.schedules.value = previous
+
+    def current_scheduling(self):
+        """
+        Returns the priority class and flow of a submission done now by the current thread.
+        """
+        (priority, flow) = getattr(self.schedules, "value", (None, None))
+        return (Priority.NORMAL if priority is None else priority, threading.get_ident() if flow is None else flow)
+
+    def remaining_time(self, timeout: float = None):
+        """
+        Returns the seconds left until the deadline of a submission done now by the current thread, or None
+        if there is no deadline.
+
+        Args:
+        timeout (float, optional): The timeout of the submission. Defaults to default_timeout.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        now = time.monotonic()
+        deadline = getattr(self.deadlines, "value", None)
+        if timeout is not None:
+            deadline = now + timeout if deadline is None else min(deadline, now + timeout)
+
+        return None if deadline is None else max(deadline - now, 0)
+
+    def wait(self, sequence_id, timeout: float = None):
+        """
+        Waits for a submitted sequence to complete, cancelling it if its deadline expires.
+
+        Raises:
+        TransferTimeoutError: If the sequence was cancelled.
+        """
+        with self.states_lock:
+            request_state = self.request_states.get(sequence_id)
+        if request_state is None:
+            return
+
+        if not request_state['complete_event'].wait(self.remaining_time(timeout)) and self.cancel(sequence_id):
+            raise TransferTimeoutError(f"Transfer {request_state['transfer_ids'][request_state['current_index']]} "
+                                       f"not completed before its deadline")
+
+    def cancel(self, sequence_id):
+        """
+        Completes a sequence without waiting for its pending responses.
+
+        Returns:
+        bool: True if the sequence was cancelled, False if it had already completed.
+        """
+        with self.states_lock:
+            request_state = self.request_states.get(sequence_id)
+        if request_state is None:
+            return False
+
+        # The lock is held while the next transfer of a sequence is issued
+        with self.global_lock:
+            if request_state['complete_event'].is_set():
+                return False
+            # Transfers after the one in flight were not issued, so their ids are free
+            (in_flight_id, *unissued_ids) = request_state['transfer_ids'][request_state['current_index']:]
+            if not self.__complete(request_state, released_ids=unissued_ids, cancelled_id=in_flight_id):
+                return False
+
+        # The adapter did not answer in time, so it is given fewer transfers
+        if self.flow_control is not None:
+            self.flow_control.on_timeout()
+        if self.hooks is not None:
+            self.hooks.emit("error", time.perf_counter_ns(), in_flight_id, None,
+                            TransferTimeoutError(f"Transfer {in_flight_id} not completed before its deadline"))
+
+        return True
+
+    def drop_response(self, transfer_id):
+        """
+        Accounts for a response that did not match any pending transfer.
+
+        Returns:
+        bool: True if it is the late response of a cancelled transfer, whose id is released.
+        """
+        with self.states_lock:
+            if transfer_id not in self.cancelled_ids:
+                self.unmatched_responses += 1
+                return False
+            del self.cancelled_ids[transfer_id]
+            self.late_responses += 1
+
+        self.ids.release(transfer_id)
+        return True
+
+    def get_statistics(self):
+        """
+        Returns the counters of the transfer ids (see TransferIdAllocator.get_statistics), of cancelled
+        transfers, of late responses of cancelled transfers and of responses that matched no transfer, and the
+        metrics of the flow control, if any (see FlowControl.get_statistics).
+        """
+        statistics = self.ids.get_statistics()
+        if self.flow_control is not None:
+            statistics.update(self.flow_control.get_statistics())
+        with self.states_lock:
+            statistics.update({
+                "cancelled_transfers": self.cancelled_transfers,
+                "late_responses": self.late_responses,
+                "unmatched_responses": self.unmatched_responses,
+            })
+        return statistics
+
+    def sync_submit(self, sequence, timeout: float = None):
+        """
+        Submits a sequence and waits for its responses.
+
+        Args:
+        sequence (list): The requests, each a function taking a transfer id.
+        timeout (float, optional): The time in seconds the sequence may take. Defaults to default_timeout. The
+                                   deadline of an enclosing deadline() block applies as well.
+
+        Returns:
+        list: The responses of the sequence.
+
+        Raises:
+        TransferTimeoutError: If the deadline expired before every response arrived.
+        TransferQueueFullError: If the window of the flow control is full and it rejects submissions.
+        """
+        result = None
+        error_info = None
+
+        def collect_responses(responses):
+            nonlocal result
+            result = responses
+
+        def handle_error(responses, error):
+            nonlocal result
+            nonlocal error_info
+
+            result = responses
+            error_info = error
+
+        # The deadline covers the wait for a slot of the flow control window as well
+        with self.deadline(timeout) if timeout is not None else nullcontext():
+            sequence_id = self.submit(
+                sequence=sequence,
+                on_ready=collect_responses,
+                on_error=handle_error
+            )
+
+            self.wait(sequence_id, timeout)
+
+        if error_info is not None:
+            raise error_info
+
+        return result
@@ -0,0 +1,70 @@
+from threading import Lock, RLock
+
+
+class DeviceStateShadow:
+    """
+    Keeps the last configuration successfully applied to a Supernova.
+
+    A single instance is shared by all the interfaces created from a SupernovaDevice, so configuration that
+    several peripherals have in common (e.g. the I2C/SPI/UART bus voltage, which is a single rail) is tracked
+    once. Interfaces consult the shadow before sending a configuration command and skip the command when the
+    requested value is already applied.
+
+    Note:
+    - The shadow only knows about the commands sent through this library. If the device is reconfigured by
+      other means, call invalidate() so that the next configuration request is sent to the device.
+    """
+
+    I2C_SPI_UART_BUS_VOLTAGE = "i2c_spi_uart_bus_voltage"
+    I3C_BUS_VOLTAGE = "i3c_bus_voltage"
+
+    def __init__(self):
+        self.lock = Lock()
+        self.values = {}
+        self.skipped = 0
+        self.key_locks = {}
+
+    def key_lock(self, key):
+        """
+        Returns the lock serializing the configuration of key by the interfaces sharing it, so that checking,
+        applying and recording a value is atomic.
+        """
+        with self.lock:
+            return self.key_locks.setdefault(key, RLock())
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.values.get(key, default)
+
+    def set(self, key, value):
+        """
+        Records that value was applied to the device. Setting None forgets the key.
+        """
+        with self.lock:
+            if value is None:
+                self.values.pop(key, None)
+            else:
+                self.values[key] = value
+
+    def matches(self, key, value):
+        """
+        Checks whether value is already applied to the device. Every match is counted as a skipped command.
+
+        Returns:
+        bool: True if the configuration command for key can be skipped, False otherwise.
+        """
+        with self.lock:
+            if key in self.values and self.values[key] == value:
+                self.skipped += 1
+                return True
+            return False
+
+    def invalidate(self, key=None):
+        """
+        Forgets the value of key, or every value if key is None.
+        """
+        with self.lock:
+            if key is None:
+                self.values.clear()
+            else:
+                self.values.pop(key, None)
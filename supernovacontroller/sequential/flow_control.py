@@ -0,0 +1,179 @@
+import threading
+import time
+
+from supernovacontroller.errors import TransferQueueFullError, TransferTimeoutError
+
+from .scheduler import FairQueue, Priority
+
+
+class FlowControl:
+    """
+    Caps the number of sequences outstanding at the Supernova and adapts the cap to the round-trip times.
+
+    Every submitted sequence takes a slot of the window until it completes, so at most window transfers are
+    queued at the adapter at any time. When the window is full, submitters wait for a free slot, or are
+    rejected with TransferQueueFullError if block is False.
+
+    The window follows an AIMD scheme: every response whose round-trip time stays below latency_threshold times
+    the base round-trip time grows the window by 1/window, i.e. by one slot per window of responses, while a
+    slower response or a cancelled transfer halves it, at most once per round-trip time. The base round-trip
+    time is the fastest one seen in the last BASE_RTT_SAMPLES responses.
+
+    Free slots are granted to waiting submitters by priority class, and round robin across the flows of a class,
+    see FairQueue.
+    """
+
+    BASE_RTT_SAMPLES = 256
+    # Weight of a new sample in the smoothed round-trip time and queueing delay
+    SMOOTHING = 0.125
+
+    def __init__(self, initial_window: int = 8, min_window: int = 1, max_window: int = 64, latency_threshold: float = 2.0, block: bool = True):
+        """
+        Args:
+        initial_window (int, optional): The number of outstanding sequences allowed at first.
+        min_window (int, optional): The lower bound of the window.
+        max_window (int, optional): The upper bound of the window.
+        latency_threshold (float, optional): The round-trip time, relative to the base one, above which the
+                                             adapter is considered congested.
+        block (bool, optional): If True, submitters wait for a free slot. If False, they are rejected.
+        """
+        if not 1 <= min_window <= initial_window <= max_window:
+            raise ValueError("The windows must satisfy 1 <= min_window <= initial_window <= max_window")
+
+        self.min_window = min_window
+        self.max_window = max_window
+        self.latency_threshold = latency_threshold
+        self.block = block
+
+        self.condition = threading.Condition()
+        self.window = float(initial_window)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queue = FairQueue()
+        self.rejected = 0
+        self.decreases = 0
+        self.queueing_delay_ns = 0.0
+        self.max_queueing_delay_ns = 0
+        self.max_queueing_delay_by_priority = {}
+        self.rtt_ns = 0.0
+        self.base_rtt_ns = None
+        self.epoch_min_rtt_ns = None
+        self.epoch_samples = 0
+        self.last_decrease_ns = 0
+
+    def acquire(self, timeout: float = None, priority: Priority = Priority.NORMAL, flow=None):
+        """
+        Takes a slot of the window, waiting for one to be free if needed.
+
+        Args:
+        timeout (float, optional): The maximum time to wait, in seconds. None waits forever.
+        priority (Priority, optional): The priority class of the submission.
+        flow (optional): The flow the submission belongs to, see FairQueue.
+
+        Raises:
+        ValueError: If priority is not a Priority.
+        TransferQueueFullError: If the window is full and block is False.
+        TransferTimeoutError: If no slot was freed before the timeout.
+        """
+        # Validated before a slot is taken, which an invalid priority would otherwise never give back
+        priority = Priority(priority)
+        started_ns = time.perf_counter_ns()
+        with self.condition:
+            if self.queue or self.in_flight >= int(self.window):
+                if not self.block:
+                    self.rejected += 1
+                    raise TransferQueueFullError(f"{self.in_flight} transfers outstanding")
+
+                ticket = {'granted': False}
+                self.queue.push(priority, flow, ticket)
+                if not self.condition.wait_for(lambda: ticket['granted'], timeout):
+                    self.queue.remove(priority, flow, ticket)
+                    raise TransferTimeoutError("No room for the transfer before its deadline")
+            else:
+                self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+            delay_ns = time.perf_counter_ns() - started_ns
+            self.queueing_delay_ns += self.SMOOTHING * (delay_ns - self.queueing_delay_ns)
+            self.max_queueing_delay_ns = max(self.max_queueing_delay_ns, delay_ns)
+            self.max_queueing_delay_by_priority[priority.name] = max(self.max_queueing_delay_by_priority.get(priority.name, 0), delay_ns)
+
+    def release(self):
+        """
+        Frees the slot of a completed sequence.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.__grant()
+
+    def __grant(self):
+        """
+        Hands the free slots to the next waiting submitters.
+        """
+        granted = False
+        while self.queue and self.in_flight < int(self.window):
+            self.queue.pop()['granted'] = True
+            self.in_flight += 1
+            granted = True
+        if granted:
+            self.condition.notify_all()
+
+    def on_response(self, rtt_ns: int):
+        """
+        Adapts the window to the round-trip time of a response.
+        """
+        with self.condition:
+            self.rtt_ns = rtt_ns if self.rtt_ns == 0 else self.rtt_ns + self.SMOOTHING * (rtt_ns - self.rtt_ns)
+
+            self.epoch_min_rtt_ns = rtt_ns if self.epoch_min_rtt_ns is None else min(self.epoch_min_rtt_ns, rtt_ns)
+            self.epoch_samples += 1
+            if self.base_rtt_ns is None or rtt_ns < self.base_rtt_ns:
+                self.base_rtt_ns = rtt_ns
+            if self.epoch_samples == self.BASE_RTT_SAMPLES:
+                # Forget old samples, so the base follows changes of the bus speed
+                self.base_rtt_ns = self.epoch_min_rtt_ns
+                self.epoch_min_rtt_ns = None
+                self.epoch_samples = 0
+
+            if rtt_ns > self.latency_threshold * self.base_rtt_ns:
+                self.__decrease()
+            else:
+                self.window = min(self.window + 1 / self.window, self.max_window)
+                self.__grant()
+
+    def on_timeout(self):
+        """
+        Halves the window after a transfer was cancelled because no response arrived in time.
+        """
+        with self.condition:
+            self.__decrease()
+
+    def __decrease(self):
+        now_ns = time.perf_counter_ns()
+        # A burst of slow responses is a single congestion event
+        if now_ns - self.last_decrease_ns < self.rtt_ns:
+            return
+        self.last_decrease_ns = now_ns
+        self.window = max(self.window / 2, self.min_window)
+        self.decreases += 1
+
+    def get_statistics(self):
+        """
+        Returns the current window, the outstanding sequences and their peak, the submitters waiting for a slot,
+        the smoothed and maximum queueing delay, the maximum queueing delay of each priority class, the smoothed
+        and base round-trip time, the rejected submissions and the number of times the window was decreased.
+        """
+        with self.condition:
+            return {
+                "window": int(self.window),
+                "window_in_flight": self.in_flight,
+                "window_peak_in_flight": self.peak_in_flight,
+                "waiting_submitters": len(self.queue),
+                "queueing_delay_ns": int(self.queueing_delay_ns),
+                "max_queueing_delay_ns": self.max_queueing_delay_ns,
+                "max_queueing_delay_ns_by_priority": dict(self.max_queueing_delay_by_priority),
+                "round_trip_ns": int(self.rtt_ns),
+                "base_round_trip_ns": self.base_rtt_ns,
+                "rejected_transfers": self.rejected,
+                "window_decreases": self.decreases,
+            }
@@ -1,20 +1,263 @@
+import time
+from collections import deque
+from threading import Condition, RLock
+from typing import NamedTuple, Optional
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import (
     GpioPinNumber, GpioLogicLevel, GpioFunctionality, GpioTriggerType,
 )
 from supernovacontroller.errors import BackendError
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class GpioInterruptEvent(NamedTuple):
+    """
+    A decoded GPIO interrupt edge.
+
+    Attributes:
+    pin (GpioPinNumber): The pin that triggered the interrupt.
+    level (GpioLogicLevel): The logic level after the edge, or None if it cannot be inferred
+                            (interrupts armed with TRIGGER_BOTH_EDGES).
+    trigger (GpioTriggerType): The trigger type the pin was armed with, or None if unknown.
+    timestamp_ns (int): Host timestamp taken with time.monotonic_ns() when the notification arrived.
+    """
+    pin: GpioPinNumber
+    level: Optional[GpioLogicLevel]
+    trigger: Optional[GpioTriggerType]
+    timestamp_ns: int
+
+
+class GPIOInterruptNotificationHandler:
+
+    DEFAULT_QUEUE_SIZE = 1024
+
+    __levels_by_trigger = {
+        GpioTriggerType.TRIGGER_RISING_EDGE: GpioLogicLevel.HIGH,
+        GpioTriggerType.TRIGGER_FALLING_EDGE: GpioLogicLevel.LOW,
+    }
+
+    def __init__(self, notification_subscription, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initializes the GPIOInterruptNotificationHandler.
+
+        Args:
+        notification_subscription: A subscription object for receiving notifications.
+        queue_size (int, optional): Maximum number of events buffered per pin. When a queue is full the
+                                    oldest event is discarded and counted as dropped.
+
+        Note:
+        Events are buffered in one bounded queue per pin, so a burst on a noisy pin cannot evict the
+        events of the other pins.
+        """
+        self.queue_size = queue_size
+        self.condition = Condition()
+        self.queues = {pin: deque(maxlen=queue_size) for pin in GpioPinNumber}
+        self.triggers = {}
+        self.debounce_ns = {}
+        self.listeners = {}
+        self.statistics = {pin: self.__new_statistics() for pin in GpioPinNumber}
+        notification_subscription(name="GPIO Interrupt Notification", filter_func=self.__is_gpio_interrupt, handler_func=self.__handle_gpio_interrupt)
+
+    @staticmethod
+    def __new_statistics():
+        return {
+            "received": 0,
+            "accepted": 0,
+            "debounced": 0,
+            "dropped": 0,
+            "errors": 0,
+            "first_timestamp_ns": None,
+            "last_timestamp_ns": None,
+        }
+
+    def arm(self, pin: GpioPinNumber, trigger: GpioTriggerType, debounce_us: int = 0):
+        """
+        Records the trigger type and the software debounce interval of a pin.
+
+        Args:
+        pin (GpioPinNumber): The pin whose interrupt was armed.
+        trigger (GpioTriggerType): The trigger type the pin was armed with.
+        debounce_us (int, optional): Edges arriving less than this many microseconds after the last
+                                     accepted edge of the same pin are discarded. 0 disables debouncing.
+        """
+        with self.condition:
+            self.triggers[pin] = trigger
+            self.debounce_ns[pin] = debounce_us * 1000
+
+    def disarm(self, pin: GpioPinNumber):
+        """
+        Forgets the trigger type of a pin. Events already buffered remain available.
+        """
+        with self.condition:
+            self.triggers.pop(pin, None)
+            self.debounce_ns.pop(pin, None)
+
+    def add_listener(self, pin: GpioPinNumber, callback):
+        """
+        Registers a callback invoked with every accepted GpioInterruptEvent of a pin.
+
+        The callback runs on the notification thread once the event is queued, so it must return quickly.
+        Exceptions it raises are logged.
+        """
+        with self.condition:
+            self.listeners.setdefault(pin, []).append(callback)
+
+    def remove_listener(self, pin: GpioPinNumber, callback):
+        with self.condition:
+            if callback in self.listeners.get(pin, []):
+                self.listeners[pin].remove(callback)
+
+    def get_event(self, pin: GpioPinNumber = None, timeout=None):
+        """
+        Removes and returns the oldest buffered event, blocking until one is available.
+
+        Args:
+        pin (GpioPinNumber, optional): Pin to read events from. If None, the oldest event of any pin is returned.
+        timeout: The duration in seconds to wait for an event. None waits forever.
+
+        Returns:
+        GpioInterruptEvent: The event, or None if the timeout expired.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.__has_event(pin), timeout):
+                return None
+            return self.__pop_event(pin)
+
+    def pending(self, pin: GpioPinNumber = None):
+        """
+        Returns the number of buffered events for a pin, or for all pins if pin is None.
+        """
+        with self.condition:
+            if pin is not None:
+                return len(self.queues[pin])
+            return sum(len(events) for events in self.queues.values())
+
+    def clear(self, pin: GpioPinNumber = None):
+        with self.condition:
+            for queue_pin, events in self.queues.items():
+                if pin is None or queue_pin == pin:
+                    events.clear()
+
+    def get_statistics(self, pin: GpioPinNumber):
+        """
+        Returns the edge counters of a pin together with its average accepted edge rate in Hz.
+        """
+        with self.condition:
+            statistics = dict(self.statistics[pin])
+            statistics["queued"] = len(self.queues[pin])
+
+        first, last = statistics["first_timestamp_ns"], statistics["last_timestamp_ns"]
+        if first is not None and last > first:
+            statistics["rate_hz"] = (statistics["accepted"] - 1) * 1e9 / (last - first)
+        else:
+            statistics["rate_hz"] = 0.0
+
+        return statistics
+
+    def reset_statistics(self, pin: GpioPinNumber = None):
+        with self.condition:
+            for statistics_pin in self.statistics:
+                if pin is None or statistics_pin == pin:
+                    self.statistics[statistics_pin] = self.__new_statistics()
+
+    def __has_event(self, pin):
+        if pin is not None:
+            return len(self.queues[pin]) > 0
+        return any(self.queues.values())
+
+    def __pop_event(self, pin):
+        if pin is not None:
+            return self.queues[pin].popleft()
+        oldest = min((events for events in self.queues.values() if events), key=lambda events: events[0].timestamp_ns)
+        return oldest.popleft()
+
+    def __is_gpio_interrupt(self, name, message):
+        """
+        Checks if the received notification is a GPIO interrupt.
+
+        Args:
+        name: The name of the received notification.
+        message: The content of the received notification.
+
+        Returns:
+        bool: True if the notification is a GPIO interrupt, False otherwise.
+        """
+        return message["name"].strip() == "GPIO INTERRUPTION"
 
+    def __handle_gpio_interrupt(self, name, message):
+        """
+        Decodes a GPIO interrupt notification, applies the debounce filter and queues the resulting event.
+
+        Args:
+        name: The name of the received notification.
+        message: The content of the received notification.
+        """
+        timestamp_ns = time.monotonic_ns()
+        pin = GpioPinNumber[message["pin_number"]]
+
+        with self.condition:
+            statistics = self.statistics[pin]
+            statistics["received"] += 1
+
+            if message.get("manager_error", "GPIO_NO_ERROR") != "GPIO_NO_ERROR" or message.get("driver_error", "GPIO_DRIVER_NO_ERROR") != "GPIO_DRIVER_NO_ERROR":
+                statistics["errors"] += 1
+                return
+
+            last_timestamp_ns = statistics["last_timestamp_ns"]
+            if last_timestamp_ns is not None and timestamp_ns - last_timestamp_ns < self.debounce_ns.get(pin, 0):
+                statistics["debounced"] += 1
+                return
+
+            trigger = self.triggers.get(pin)
+            event = GpioInterruptEvent(pin, self.__levels_by_trigger.get(trigger), trigger, timestamp_ns)
+
+            statistics["accepted"] += 1
+            statistics["last_timestamp_ns"] = timestamp_ns
+            if statistics["first_timestamp_ns"] is None:
+                statistics["first_timestamp_ns"] = timestamp_ns
+
+            events = self.queues[pin]
+            if len(events) == events.maxlen:
+                statistics["dropped"] += 1
+            events.append(event)
+            self.condition.notify_all()
+
+            listeners = list(self.listeners.get(pin, []))
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Exception in the listener of the %s interrupts", pin.name)
+
+
+@thread_safe
 class SupernovaGPIOInterface:
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, hardware_version):
+    GpioInterruptEvent = GpioInterruptEvent
+    # Waiting for notifications does not block the other users of the interface
+    UNLOCKED_METHODS = ("wait_for_interrupt", "interrupt_events")
+
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, hardware_version, device_state: DeviceStateShadow = None):
         """
         Initializes a new instance of the SupernovaGPIOInterface class. This interface is used for GPIO communication with the Supernova.
         """
         self.driver = driver
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
         self.controller = controller
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
         self.configured_pins = {}
         self.pins_voltage = None
         self.hardware_version = hardware_version
+        # GPIO interrupt notification handler
+        self.gpio_notification = GPIOInterruptNotificationHandler(notification_subscription)
 
     def set_pins_voltage(self, voltage_mv: int):
         """
@@ -34,34 +277,46 @@ class SupernovaGPIOInterface:
         - The SDK method called depends upon which hardware revision is connected.
           - If Rev. B is used, voltage can be set in pins 1 and 2 with setI3cBusVoltage(). Pins 3 to 6 are fixed at 3.3 V.
           - If Rev. C is used, voltage is set with setI2cSpiUartBusVoltage() for all pins.
+        - Since the GPIO pins share their voltage rail with other interfaces, no command is sent if the
+          voltage is already applied to that rail.
         """
         set_voltage_method = None
 
         if self.hardware_version.startswith("HW-B"):
             set_voltage_method = self.driver.setI3cBusVoltage
             expected_command_name = "SET I3C BUS VOLTAGE"
+            voltage_rail = DeviceStateShadow.I3C_BUS_VOLTAGE
         elif self.hardware_version.startswith("HW-C"):
             set_voltage_method = self.driver.setI2cSpiUartBusVoltage
             expected_command_name = "SET I2C-SPI-UART BUS VOLTAGE"
+            voltage_rail = DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE
         else:
             raise BackendError(f"Unsupported hardware version: {self.hardware_version}")
 
-        responses = None
-        try:
-            responses = self.controller.sync_submit([
-                lambda transfer_id: set_voltage_method(transfer_id, voltage_mv),
-            ])
-        except Exception as e:
-            raise BackendError(original_exception=e) from e
+        # The rail is shared with the other interfaces, which may set it from other threads
+        with self.device_state.key_lock(voltage_rail):
+            if self.device_state.matches(voltage_rail, voltage_mv):
+                self.pins_voltage = voltage_mv
+                return (True, voltage_mv)
 
-        response_success = responses[0]["name"] == expected_command_name and responses[0]["result"] == "SYS_NO_ERROR"
+            responses = None
+            try:
+                responses = self.controller.sync_submit([
+                    lambda transfer_id: set_voltage_method(transfer_id, voltage_mv),
+                ])
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
 
-        if not response_success:
-            return (False, responses[0]["result"])
+            response_success = responses[0]["name"] == expected_command_name and responses[0]["result"] == "SYS_NO_ERROR"
+
+            if not response_success:
+                self.device_state.invalidate(voltage_rail)
+                return (False, responses[0]["result"])
 
-        self.pins_voltage = voltage_mv
+            self.pins_voltage = voltage_mv
+            self.device_state.set(voltage_rail, voltage_mv)
 
-        return (True, voltage_mv)
+            return (True, voltage_mv)
 
     def __check_if_response_is_successful(self, response):
         """
@@ -170,13 +425,15 @@ class SupernovaGPIOInterface:
 
         return (True, responses[0]["logic_level"])
 
-    def set_interrupt(self, pin_number: GpioPinNumber, trigger: GpioTriggerType):
+    def set_interrupt(self, pin_number: GpioPinNumber, trigger: GpioTriggerType, debounce_us: int = 0):
         """
         Sets an interrupt on a GPIO pin.
 
         Args:
         pin_number (GpioPinNumber): The GPIO pin number to set the interrupt on.
         trigger (GpioTriggerType): The trigger type for the interrupt.
+        debounce_us (int, optional): Software debounce interval in microseconds. Edges arriving closer than this
+                                     to the previous accepted edge of the pin are discarded. Defaults to 0 (disabled).
 
         Returns:
         tuple: A tuple containing two elements:
@@ -199,6 +456,8 @@ class SupernovaGPIOInterface:
         if not response_success:
             return (False, "Set interrupt failed, error from the Supernova")
 
+        self.gpio_notification.arm(pin_number, trigger, debounce_us)
+
         return (True, None)
 
     def disable_interrupt(self, pin_number: GpioPinNumber):
@@ -226,4 +485,70 @@ class SupernovaGPIOInterface:
         if not response_success:
             return (False, "Disable interrupt failed, error from the Supernova")
 
+        self.gpio_notification.disarm(pin_number)
+
         return (True, None)
+
+    def wait_for_interrupt(self, pin_number: GpioPinNumber = None, timeout=None):
+        """
+        Waits for the next GPIO interrupt event.
+
+        Events are decoded and stamped with time.monotonic_ns() as soon as the notification arrives, and are
+        buffered in a bounded queue per pin, so interrupts that occur before this method is called are not lost.
+
+        Args:
+        pin_number (GpioPinNumber, optional): The pin to wait on. If None, the oldest event of any pin is returned.
+        timeout: The duration in seconds to wait for the event. None waits forever.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating if an event was received (True) or the timeout expired (False).
+            - The second element is either the GpioInterruptEvent or an error message.
+        """
+        event = self.gpio_notification.get_event(pin_number, timeout)
+
+        if event is None:
+            return (False, "Timeout occurred while waiting for the GPIO interrupt")
+
+        return (True, event)
+
+    def interrupt_events(self, pin_number: GpioPinNumber = None, timeout=None):
+        """
+        Iterates over GPIO interrupt events as they arrive.
+
+        Args:
+        pin_number (GpioPinNumber, optional): The pin to read events from. If None, events of all pins are returned.
+        timeout: The duration in seconds to wait for each event. The iteration stops when it expires.
+                 None iterates forever.
+
+        Yields:
+        GpioInterruptEvent: The next buffered event.
+        """
+        while True:
+            event = self.gpio_notification.get_event(pin_number, timeout)
+            if event is None:
+                return
+            yield event
+
+    async def wait_for_interrupt_async(self, pin_number: GpioPinNumber = None, timeout=None):
+        """
+        Asyncio counterpart of wait_for_interrupt. The blocking wait runs in the event loop's default executor.
+        """
+        # Imported here so that synchronous users do not pay for loading asyncio
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.wait_for_interrupt, pin_number, timeout)
+
+    def get_interrupt_statistics(self, pin_number: GpioPinNumber):
+        """
+        Retrieves the interrupt counters of a GPIO pin.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is always True.
+            - The second element is a dictionary with the number of received, accepted, debounced and dropped
+              edges, the notifications that reported an error, the number of queued events and the average
+              accepted edge rate in Hz.
+        """
+        return (True, self.gpio_notification.get_statistics(pin_number))
@@ -0,0 +1,64 @@
+import threading
+
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class TransferHooks:
+    """
+    Callbacks notified of the transfers and notifications of a device, for tracing and profiling.
+
+    Events and the arguments of their callbacks, timestamps being time.perf_counter_ns() values:
+    - submit: (timestamp_ns, transfer_id, sequence_id), right before a transfer is handed to the driver.
+    - response: (timestamp_ns, transfer_id, command, latency_ns), when the response of a transfer is matched.
+    - notification_dispatched: (timestamp_ns, command, handler_name, duration_ns), after a notification handler
+      returns.
+    - error: (timestamp_ns, transfer_id, command, error), when a transfer could not be issued or was cancelled
+      at its deadline. command is None, since it is only known from the response.
+
+    Note:
+    - Callbacks run on the thread that issues the transfer or handles the response, so they must be quick.
+    - Exceptions raised by callbacks are logged and ignored.
+    - Owners only keep a reference to the hooks while a callback is registered, so that the hot path costs a
+      single attribute check when there are none.
+    """
+
+    EVENTS = ("submit", "response", "notification_dispatched", "error")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Tuples are replaced, not mutated, so events are emitted without holding the lock
+        self.callbacks = {event: () for event in self.EVENTS}
+
+    def add(self, event: str, callback):
+        if event not in self.callbacks:
+            raise ValueError(f"Unknown hook event {event}, expected one of {', '.join(self.EVENTS)}")
+        with self.lock:
+            self.callbacks[event] = self.callbacks[event] + (callback,)
+
+    def remove(self, callback, event: str = None):
+        """
+        Removes a callback from an event, or from every event if event is None.
+
+        Returns:
+        bool: True if the callback was registered.
+        """
+        removed = False
+        with self.lock:
+            for name in ([event] if event is not None else self.EVENTS):
+                callbacks = self.callbacks.get(name, ())
+                if callback in callbacks:
+                    self.callbacks[name] = tuple(registered for registered in callbacks if registered != callback)
+                    removed = True
+        return removed
+
+    def __bool__(self):
+        return any(self.callbacks.values())
+
+    def emit(self, event: str, *args):
+        for callback in self.callbacks[event]:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Exception in %s hook %r", event, callback)
@@ -1,10 +1,24 @@
+from threading import RLock
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import I2cPullUpResistorsValue
 from supernovacontroller.errors import BackendError
 from supernovacontroller.errors import BusVoltageError
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
+from .prepared import PreparedTransfer, check_byte_list, check_range, i2c_read_request, i2c_write_request
+from .retry import RetryPolicy, RetryStatistics, submit_with_retry
 
 
+def _transfer_error(response):
+    """
+    Returns the status of a failed transfer response, or None for successful and other responses.
+    """
+    status = response.get("status")
+    return None if status in (None, "NO_TRANSFER_ERROR") else status
+
+
+@thread_safe
 class SupernovaI2CBlockingInterface:
     """
     The SupernovaI2CBlockingInterface class provides methods to interact with I2C devices.
@@ -61,13 +75,53 @@ class SupernovaI2CBlockingInterface:
       while others may use 2 or more bytes.
     """
 
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
+    PULL_UP_RESISTORS = "i2c.pull_up_resistors"
+    CLOCK_FREQUENCY = "i2c.clock_frequency_hz"
+
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, device_state: DeviceStateShadow = None):
         self.driver = driver
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
         self.controller = controller
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
 
-        self.bus_voltage = None
         self.clock_frequency_hz = 1000000
 
+        # Failed transfers are not repeated unless a retry policy is set
+        self.retry_policy = None
+        self.retry_statistics = RetryStatistics()
+
+    @property
+    def bus_voltage(self):
+        # I2C, SPI and UART share the same bus voltage rail
+        return self.device_state.get(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE)
+
+    @bus_voltage.setter
+    def bus_voltage(self, voltage_mv):
+        self.device_state.set(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv)
+
+    def set_retry_policy(self, policy: RetryPolicy):
+        """
+        Sets the policy used to repeat transfers that fail with a transient error, like a NACK.
+
+        The failed transfer is repeated by the interface before its result is returned, and only the failed
+        transfers of a batch are repeated. The retries done are counted in retry_statistics.
+
+        Args:
+        policy (RetryPolicy): The retry policy, or None to report every failure to the caller right away.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the retry policy.
+        """
+        self.retry_policy = policy
+        return (True, policy)
+
+    def _sync_submit(self, sequence):
+        return submit_with_retry(self.controller.sync_submit, sequence, _transfer_error, self.retry_policy, self.retry_statistics)
+
     def set_parameters(self, clock_frequency_hz: int = 1000000):
         """
         Sets the I2C clock frequency to a specified value. The operation's success or failure
@@ -91,10 +145,15 @@ class SupernovaI2CBlockingInterface:
         - The method does not perform validation on the input frequency value. Users of this
           method should ensure that the provided frequency value is within acceptable limits for
           their specific I2C device and setup.
+        - No command is sent if the frequency is already applied to the device.
         """
+        if self.device_state.matches(self.CLOCK_FREQUENCY, clock_frequency_hz):
+            self.clock_frequency_hz = clock_frequency_hz
+            return (True, clock_frequency_hz)
+
         responses = None
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cSetParameters(transfer_id, baudrate=clock_frequency_hz),
             ])
         except Exception as e:
@@ -103,8 +162,11 @@ class SupernovaI2CBlockingInterface:
         response_ok = responses[0]["name"] == "I2C SET PARAMETERS" and responses[0]["completed"] == 0
         if response_ok:
             result = (True, clock_frequency_hz)
+            self.clock_frequency_hz = clock_frequency_hz
+            self.device_state.set(self.CLOCK_FREQUENCY, clock_frequency_hz)
         else:
             result = (False, "Set parameters failed")
+            self.device_state.invalidate(self.CLOCK_FREQUENCY)
 
         return result
 
@@ -152,24 +214,31 @@ class SupernovaI2CBlockingInterface:
           method should ensure that the provided voltage value is within acceptable limits
           for their specific hardware configuration.
         - The bus voltage is updated in the interface instance only if the operation is successful.
+        - The bus voltage is shared with the SPI and UART interfaces. No command is sent if the voltage
+          is already applied to the device.
         """
-        responses = None
-        try:
-            responses = self.controller.sync_submit([
-                lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
-            ])
-        except Exception as e:
-            raise BackendError(original_exception=e) from e
-
-        response_ok = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
-        if response_ok:
-            result = (True, voltage_mv)
-            self.bus_voltage = voltage_mv
-        else:
-            result = (False, responses[0]["result"])
-            self.bus_voltage = None
-
-        return result
+        # The rail is shared with the other interfaces, which may set it from other threads
+        with self.device_state.key_lock(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE):
+            if self.device_state.matches(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv):
+                return (True, voltage_mv)
+
+            responses = None
+            try:
+                responses = self._sync_submit([
+                    lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
+                ])
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
+
+            response_ok = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+            if response_ok:
+                result = (True, voltage_mv)
+                self.bus_voltage = voltage_mv
+            else:
+                result = (False, responses[0]["result"])
+                self.bus_voltage = None
+
+            return result
 
     def init_bus(self, voltage: int=None):
         """
@@ -250,6 +319,7 @@ class SupernovaI2CBlockingInterface:
         Notes: 
             - By default the pull up resistors are set to 10000 Ohms
             - This feature is only supported in Rev. C Supernovas, otherwise it fails.  
+            - No command is sent if the resistance is already applied to the device.
 
         Raises:
             ValueError: If an unsupported resistance value is attempted to be set
@@ -260,9 +330,12 @@ class SupernovaI2CBlockingInterface:
             # unsupported resistor value
             raise ValueError
 
+        if self.device_state.matches(self.PULL_UP_RESISTORS, resistor_value_in_ohm):
+            return (True, resistor_value_in_ohm)
+
         responses = None
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cSetPullUpResistors(id=transfer_id, pullUpResistorsValue=resistor_value),
             ])
         except Exception as e:
@@ -271,8 +344,11 @@ class SupernovaI2CBlockingInterface:
         errors = self.__get_set_pullup_response_errors(responses[0])
         success = responses[0]["name"].strip() == "I2C SET PULL UP RESISTORS" and len(errors) == 0
         if not success:
+           self.device_state.invalidate(self.PULL_UP_RESISTORS)
            return (False, errors)
 
+        self.device_state.set(self.PULL_UP_RESISTORS, resistor_value_in_ohm)
+
         return (True, resistor_value_in_ohm)
 
     def write(self, address, register, data):
@@ -304,7 +380,7 @@ class SupernovaI2CBlockingInterface:
         """
         responses = None
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cWrite(transfer_id, address, register, data),
             ])
         except Exception as e:
@@ -347,7 +423,7 @@ class SupernovaI2CBlockingInterface:
         """
         responses = None
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cWriteNonStop(transfer_id, address, register, data),
             ])
         except Exception as e:
@@ -390,7 +466,7 @@ class SupernovaI2CBlockingInterface:
           should ensure these parameters are correct and within the acceptable range for the intended device.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cRead(transfer_id, address, length),
             ])
         except Exception as e:
@@ -433,7 +509,7 @@ class SupernovaI2CBlockingInterface:
           should ensure these parameters are correct and within the acceptable range for the intended device.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda transfer_id: self.driver.i2cReadFrom(transfer_id, address, register, length),
             ])
         except Exception as e:
@@ -446,3 +522,48 @@ class SupernovaI2CBlockingInterface:
             result = (False, responses[0]["status"])
 
         return result
+
+    def prepare_read(self, address, register, length):
+        """
+        Prepares a read to be executed many times, e.g. in a polling loop.
+
+        The arguments are validated and bound once.
+
+        Args:
+        address (int): The I2C address of the device to read from.
+        register (list): The register address within the device from which to read. If empty, a plain read
+                         is issued, as with read().
+        length (int): The number of bytes to read.
+
+        Returns:
+        PreparedTransfer: The read. Its execute() method returns the same tuple as read_from().
+
+        Raises:
+        ValueError: If an argument is out of range.
+        """
+        check_range("address", address, 0, 0x7F)
+        check_byte_list("register", register)
+        check_range("length", length, 1, 0xFFFF)
+
+        return PreparedTransfer(self.controller, *i2c_read_request(self, address, list(register), length), submit=self._sync_submit)
+
+    def prepare_write(self, address, register, data):
+        """
+        Prepares a write to be executed many times, like prepare_read().
+
+        Args:
+        address (int): The I2C address of the device to write to.
+        register (list): The register address within the device where the data will be written.
+        data (list): The data to be written to the specified register.
+
+        Returns:
+        PreparedTransfer: The write. Its execute() method returns the same tuple as write().
+
+        Raises:
+        ValueError: If an argument is out of range.
+        """
+        check_range("address", address, 0, 0x7F)
+        check_byte_list("register", register)
+        check_byte_list("data", data)
+
+        return PreparedTransfer(self.controller, *i2c_write_request(self, address, list(register), list(data)), submit=self._sync_submit)
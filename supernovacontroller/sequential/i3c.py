@@ -1,3 +1,7 @@
+import time
+from threading import RLock
+from typing import NamedTuple
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import TransferMode
@@ -10,27 +14,315 @@ from BinhoSupernova.commands.definitions import I3cOpenDrainTransferRate
 from BinhoSupernova.commands.definitions import I3cChangeDynAddrError
 from supernovacontroller.errors import BusVoltageError
 from supernovacontroller.errors import BackendError
-
-
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
+from .i3c_capabilities import I3CCapabilityCache, default_cache_path
+from .prepared import PreparedTransfer, check_byte_list, check_range, i3c_read_request, i3c_write_request
+from .retry import RetryPolicy, RetryStatistics, submit_with_retry
+from .scheduler import Priority
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
+
+
+# Push-pull rates in ascending order of frequency, in MHz
+_PUSH_PULL_RATES_MHZ = {
+    I3cPushPullTransferRate.PUSH_PULL_3_75_MHZ: 3.75,
+    I3cPushPullTransferRate.PUSH_PULL_5_MHZ: 5,
+    I3cPushPullTransferRate.PUSH_PULL_6_25_MHZ: 6.25,
+    I3cPushPullTransferRate.PUSH_PULL_7_5_MHZ: 7.5,
+    I3cPushPullTransferRate.PUSH_PULL_10_MHZ: 10,
+    I3cPushPullTransferRate.PUSH_PULL_12_5_MHZ: 12.5,
+}
+
+# Maximum sustained data rate encoded in the low 3 bits of the GETMXDS maxWr and maxRd bytes, in MHz.
+# 0 means no limitation (fSCL Max).
+_MXDS_RATE_LIMITS_MHZ = {0: None, 1: 8, 2: 6, 3: 4, 4: 2}
+
+
+def _mxds_limit_mhz(mxds):
+    """
+    Returns the lowest data rate limit reported by a target through GETMXDS, in MHz, or None if the target
+    supports fSCL Max.
+    """
+    # Only the low 3 bits are rate codes, the next 3 bits of maxRead are the clock to data turnaround (tSCO)
+    limits = [_MXDS_RATE_LIMITS_MHZ.get(mxds[field] & 0x07) for field in ("maxWrite", "maxRead")]
+    limits = [limit for limit in limits if limit is not None]
+    return min(limits) if limits else None
+
+
+class I3CTarget(NamedTuple):
+    """
+    Entry of the target device table, with every field decoded to an integer.
+
+    Attributes:
+    static_address (int): The static address of the target.
+    dynamic_address (int): The dynamic address of the target.
+    bcr (int): The Bus Characteristics Register.
+    dcr (int): The Device Characteristics Register.
+    pid (int): The 48-bit Provisional ID.
+    """
+    static_address: int
+    dynamic_address: int
+    bcr: int
+    dcr: int
+    pid: int
+
+    @property
+    def pid_bytes(self):
+        """
+        The Provisional ID as 6 bytes, most significant first.
+        """
+        return self.pid.to_bytes(6, "big")
+
+    def to_dict(self):
+        """
+        Returns the entry in the dictionary shape returned by targets() and find_target_device_by_pid().
+        """
+        return {
+            "static_address" : self.static_address,
+            "dynamic_address" : self.dynamic_address,
+            "bcr" : self.bcr,
+            "dcr" : self.dcr,
+            "pid" : [f"{byte:#04x}" for byte in self.pid_bytes],
+        }
+
+
+def _pid_to_int(pid):
+    """
+    Converts a PID given as an integer, as bytes or as the SDK list of hexadecimal strings to an integer.
+    """
+    if isinstance(pid, int):
+        return pid
+    if isinstance(pid, (bytes, bytearray)):
+        return int.from_bytes(pid, "big")
+    return int.from_bytes(bytes(int(byte, 16) if isinstance(byte, str) else byte for byte in pid), "big")
+
+
+def _decode_target(target_info):
+    return I3CTarget(
+        target_info["staticAddress"],
+        target_info["dynamicAddress"],
+        int(target_info["bcr"]["value"][2][2:4], 16),
+        target_info["dcr"],
+        _pid_to_int(target_info["pid"]),
+    )
+
+
+def _decode_hot_join(notification):
+    # Hot-join IBIs carry the BCR and DCR as integers, unlike the target device table
+    return I3CTarget(
+        0,
+        notification["header"]["address"],
+        notification["bcr"],
+        notification["dcr"],
+        _pid_to_int(notification["pid"]),
+    )
+
+
+def _decode_none(response):
+    return None
+
+
+def _decode_data(response):
+    return response["data"]
+
+
+# Payload of a successful response, per command. Commands not listed return None.
+_SUCCESS_DECODERS = {
+    "write": _decode_none,
+    "read": _decode_data,
+    "ccc_getpid": lambda response: [int(item[2:], 16) for item in response["pid"]],
+    "ccc_getbcr": lambda response: response["bcr"]["value"][2][2:].upper(),
+    "ccc_getdcr": lambda response: response["dcr"][2:].upper(),
+    "ccc_getmrl": lambda response: response["maxReadLength"],
+    "ccc_getmwl": lambda response: response["maxWriteLength"],
+    "ccc_getxtime": lambda response: {
+        "supportedModes": response["supportedModes"]["value"][1],
+        "currentState": response["state"]["value"][1],
+        "frequency": response["frequency"]["value"],
+        "inaccuracy": response["inaccuracy"]["value"],
+    },
+    "ccc_getmxds": lambda response: {
+        "maxWrite": response["maxWr"]["value"][1],
+        "maxRead": response["maxRd"]["value"][1],
+        "maxReadTurnaround": float(response["maxRdTurn"][1].split(" ")[0]),
+    },
+    "ccc_getcaps": lambda response: [
+        response["caps1"]["value"][1],
+        response["caps2"]["value"][1],
+        response["caps3"]["value"][1],
+        response["caps4"]["value"],
+    ],
+    "ccc_get_status": _decode_data,
+    "ccc_setnewda": _decode_none,
+    "ccc_rstdaa": _decode_none,
+    "ccc_direct_rstact": lambda response: response["data"] if response["descriptor"] and response["descriptor"]["dataLength"] > 0 else None,
+    "ccc_unicast_setmrl": _decode_data,
+    "ccc_unicast_setmwl": _decode_data,
+    "ccc_broadcast_setmwl": _decode_data,
+    "ccc_broadcast_setmrl": _decode_data,
+}
+
+
+# Payload of a successful response with typed=True, per command, decoded to integers like the fields of I3CTarget.
+# Other commands return the same payload as without typed.
+_TYPED_SUCCESS_DECODERS = {
+    "ccc_getpid": lambda response: _pid_to_int(response["pid"]),
+    "ccc_getbcr": lambda response: int(response["bcr"]["value"][2], 16),
+    "ccc_getdcr": lambda response: int(response["dcr"], 16),
+}
+
+
+def _decode_address_assignment_error(response):
+    result = {"error": response["header"]["result"]}
+    if response["invalidAddresses"]:
+        result["error_data"] = response["invalidAddresses"]
+    return result
+
+
+def _decode_first_error(response):
+    errors = _transfer_error(response)
+    return errors[0] if isinstance(errors, list) else errors
+
+
+# Payload of a failed response, per command. Commands not listed return the first error of the descriptor.
+_ERROR_DECODERS = {
+    "ccc_setaasa": _decode_address_assignment_error,
+    "ccc_setdasa": _decode_address_assignment_error,
+    "ccc_entdaa": _decode_address_assignment_error,
+}
+
+_SUCCESSFUL_RESULTS = frozenset(["I3C_TRANSFER_SUCCESS", "DAA_SUCCESS"])
+
+
+# Errors of the HDR-DDR signalling itself, showing that HDR-DDR can not be used with a target, as opposed to
+# transient errors like a NACK
+_HDR_DDR_ERRORS = frozenset(["DDR_CRC_ERROR", "DDR_PARITY_ERROR"])
+
+
+def _transfer_error(response):
+    """
+    Returns the errors of a failed transfer or CCC response, or None for successful and other responses.
+    """
+    header = response.get("header")
+    if header is None or header["result"] in _SUCCESSFUL_RESULTS:
+        return None
+    return (response.get("descriptor") or {}).get("errors") or header["result"]
+
+# Field of the capability record, ccc_* method whose payload it holds and driver method that requests it
+_CHARACTERIZATION_CCCS = [
+    ("pid", "ccc_getpid", "i3cGETPID"),
+    ("bcr", "ccc_getbcr", "i3cGETBCR"),
+    ("dcr", "ccc_getdcr", "i3cGETDCR"),
+    ("mrl", "ccc_getmrl", "i3cGETMRL"),
+    ("mwl", "ccc_getmwl", "i3cGETMWL"),
+    ("mxds", "ccc_getmxds", "i3cGETMXDS"),
+    ("caps", "ccc_getcaps", "i3cGETCAPS"),
+    ("xtime", "ccc_getxtime", "i3cGETXTIME"),
+]
+
+
+@thread_safe
 class SupernovaI3CBlockingInterface:
     # TODO: Replicate definitions (TransferMode, I3cCommandType, TransferDirection)
 
     TransferMode = TransferMode
     I3cPushPullTransferRate = I3cPushPullTransferRate
     I3cOpenDrainTransferRate = I3cOpenDrainTransferRate
+    I3CTarget = I3CTarget
 
     BROADCAST_ADDRESS = 0x7E
 
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
+    # Bulk transfers shorter than this are done in SDR, where they do not pay for entering and exiting HDR mode
+    HDR_DDR_MIN_LENGTH = 32
+    BULK_CHUNK_SIZE = 1024
+
+    I3C_MODE = "i3c.mode"
+
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, device_state: DeviceStateShadow = None):
         self.driver = driver
-        self.controller = controller
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
+        self.__controller = controller
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
 
         self.push_pull_clock_freq_mhz = I3cPushPullTransferRate.PUSH_PULL_3_75_MHZ
         self.open_drain_clock_freq_mhz = I3cOpenDrainTransferRate.OPEN_DRAIN_100_KHZ
-        self.bus_voltage = None
 
-        self.controller_init()
+        # The Supernova is initialized in controller mode on first use instead of on construction
+        self.initialized = False
+
+        # Capability records of the targets, loaded by characterize()
+        self.capability_cache = None
+
+        # Clock rates of specific targets, keyed by dynamic address, that override the rates of the interface
+        self.clock_profiles = {}
+
+        # Failed transfers are not repeated unless a retry policy is set
+        self.retry_policy = None
+        self.retry_statistics = RetryStatistics()
+
+        # Whether each target supports HDR-DDR, keyed by dynamic address, and the bytes and time of the bulk
+        # transfers done in each mode
+        self.hdr_ddr_support = {}
+        self.bulk_statistics = {}
+
+        # Targets known to the interface, keyed by dynamic address, refreshed by targets() and hot-joins
+        self.target_table = {}
+        # Dynamic addresses to give to targets that hot-join, keyed by PID
+        self.hot_join_address_plan = {}
+        self.hot_join_listeners = []
+        self.hot_join_statistics = {"joins": 0, "address_plan_failures": 0, "last_latency_ns": None, "max_latency_ns": 0}
+
+        # Threaded, as the address plan takes the interface lock and waits for SETNEWDA
+        notification_subscription(name="I3C Hot-Join Notification", filter_func=self.__is_hot_join, handler_func=self.__handle_hot_join,
+                                  threaded=True)
+
+    @property
+    def controller(self):
+        """
+        The transfer controller, initializing the Supernova in controller mode first if needed.
+
+        Raises:
+        BackendError: If the Supernova could not be initialized in controller mode.
+        """
+        if not self.initialized:
+            (success, result) = self.controller_init()
+            if not success:
+                raise BackendError(f"I3C controller initialization failed: {result}")
+        return self.__controller
+
+    @property
+    def bus_voltage(self):
+        return self.device_state.get(DeviceStateShadow.I3C_BUS_VOLTAGE)
+
+    @bus_voltage.setter
+    def bus_voltage(self, voltage):
+        self.device_state.set(DeviceStateShadow.I3C_BUS_VOLTAGE, voltage)
     
+    def set_retry_policy(self, policy: RetryPolicy):
+        """
+        Sets the policy used to repeat transfers and CCCs that fail with a transient error, like a NACK.
+
+        The failed transfer is repeated by the interface before its result is returned, and only the failed
+        transfers of a batch are repeated. The retries done are counted in retry_statistics.
+
+        Args:
+        policy (RetryPolicy): The retry policy, or None to report every failure to the caller right away.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the retry policy.
+        """
+        self.retry_policy = policy
+        return (True, policy)
+
+    def _sync_submit(self, sequence):
+        return submit_with_retry(self.controller.sync_submit, sequence, _transfer_error, self.retry_policy, self.retry_statistics)
+
     @staticmethod
     def __get_error_from_response(response : dict):
         errors = []
@@ -78,6 +370,139 @@ class SupernovaI3CBlockingInterface:
         """
         return (True, (self.push_pull_clock_freq_mhz, self.open_drain_clock_freq_mhz))
 
+    def set_target_parameters(self, target_address, push_pull_clock_freq_mhz: I3cPushPullTransferRate, open_drain_clock_freq_mhz: I3cOpenDrainTransferRate = None):
+        """
+        Sets the clock frequencies used for the transfers directed to a specific target.
+
+        Reads, writes and directed CCCs sent to target_address use these frequencies instead of the ones set with
+        set_parameters(), so a slow target does not force the whole bus to its rate. Broadcast CCCs keep using the
+        frequencies of the interface.
+
+        Args:
+        target_address: The dynamic address of the target.
+        push_pull_clock_freq_mhz (I3cPushPullTransferRate): The clock frequency for the push-pull configuration.
+        open_drain_clock_freq_mhz (I3cOpenDrainTransferRate, optional): The clock frequency for the open-drain
+                                configuration. Defaults to the open-drain frequency of the interface.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is a tuple with the push-pull and open-drain frequencies of the target.
+        """
+        if open_drain_clock_freq_mhz is None:
+            open_drain_clock_freq_mhz = self.open_drain_clock_freq_mhz
+
+        self.clock_profiles[target_address] = (push_pull_clock_freq_mhz, open_drain_clock_freq_mhz)
+
+        return (True, self.clock_profiles[target_address])
+
+    def get_target_parameters(self, target_address):
+        """
+        Retrieves the clock frequencies used for the transfers directed to a specific target.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is a tuple with the push-pull and open-drain frequencies of the target, which
+                are the ones of the interface if no profile was set for it.
+        """
+        return (True, self._target_clock_rates(target_address))
+
+    def clear_target_parameters(self, target_address=None):
+        """
+        Removes the clock profile of a target, or of every target if target_address is None, so the frequencies
+        of the interface are used again.
+        """
+        if target_address is None:
+            self.clock_profiles.clear()
+        else:
+            self.clock_profiles.pop(target_address, None)
+
+        return (True, None)
+
+    def _target_clock_rates(self, target_address):
+        profile = self.clock_profiles.get(target_address)
+        if profile is None:
+            return (self.push_pull_clock_freq_mhz, self.open_drain_clock_freq_mhz)
+        return profile
+
+    def __move_target_settings(self, current_address, new_address):
+        for settings in (self.clock_profiles, self.hdr_ddr_support):
+            if current_address in settings:
+                settings[new_address] = settings.pop(current_address)
+        if current_address in self.target_table:
+            self.target_table[new_address] = self.target_table.pop(current_address)._replace(dynamic_address=new_address)
+
+    def tune_target_clock(self, target_address, subaddress: list, length: int, iterations: int = 32, mode: TransferMode = TransferMode.I3C_SDR):
+        """
+        Finds the fastest push-pull frequency a target works reliably at, and stores it in its clock profile.
+
+        The limits the target reports through GETMXDS rule out the frequencies it does not support. A reference
+        read is done at the current frequency of the target, then every remaining frequency is tried from the
+        fastest down: the same read is repeated the given number of times, submitted as one sequence, and the
+        frequency is accepted if every read succeeds and returns the reference data.
+
+        Args:
+        target_address: The dynamic address of the target.
+        subaddress (list): The subaddress of the register read during the test. It must hold a value that
+                           does not change by itself, like an identification register.
+        length (int): The number of bytes read from the register.
+        iterations (int, optional): The number of reads done at each frequency.
+        mode (TransferMode, optional): The transfer mode of the test reads.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is either a dictionary with the selected 'push_pull' and 'open_drain'
+                frequencies, the 'limit_mhz' reported by GETMXDS (None if the target has no limitation) and the
+                'results' of the test at every frequency tried, or an error message detailing the failure.
+
+        Note:
+        - If no frequency passes the test the clock profile of the target is left unchanged.
+        """
+        (success, mxds) = self.ccc_getmxds(target_address)
+        # Targets without limitations are allowed to NACK GETMXDS
+        limit_mhz = _mxds_limit_mhz(mxds) if success else None
+
+        (success, reference) = self.read(target_address, mode, subaddress, length)
+        if not success:
+            return (False, reference)
+
+        (_, open_drain_clock_freq_mhz) = self._target_clock_rates(target_address)
+        candidates = [rate for rate, mhz in _PUSH_PULL_RATES_MHZ.items() if limit_mhz is None or mhz <= limit_mhz]
+        # A limit below the slowest rate leaves nothing better than the slowest rate
+        candidates = candidates or [I3cPushPullTransferRate.PUSH_PULL_3_75_MHZ]
+
+        results = {}
+        selected = None
+        for rate in reversed(candidates):
+            sequence = [
+                lambda id, rate=rate: self.driver.i3cRead(id, target_address, mode, rate, open_drain_clock_freq_mhz, subaddress, length)
+            ] * iterations
+
+            # Retries would hide the errors the test looks for
+            try:
+                responses = self.controller.sync_submit(sequence)
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
+
+            results[rate] = all(self._process_response("read", [response]) == (True, reference) for response in responses)
+            if results[rate]:
+                selected = rate
+                break
+
+        if selected is None:
+            return (False, "No push-pull frequency passed the read-back test")
+
+        self.set_target_parameters(target_address, selected, open_drain_clock_freq_mhz)
+
+        return (True, {
+            "push_pull": selected,
+            "open_drain": open_drain_clock_freq_mhz,
+            "limit_mhz": limit_mhz,
+            "results": results,
+        })
+
     def set_bus_voltage(self, voltage: int):
         """
         Sets the bus voltage to a specified value.
@@ -95,44 +520,63 @@ class SupernovaI3CBlockingInterface:
         Note:
         - The method assumes that the input voltage value is valid and does not perform any validation.
         Users of this method should ensure that the provided voltage value is within acceptable limits.
-        """
-        try:
-            responses = self.controller.sync_submit([
-                lambda id: self.driver.setI3cBusVoltage(id, voltage)
-            ])
-        except Exception as e:
-            raise BackendError(original_exception=e) from e
-
-        response_ok = responses[0]["name"] == "SET I3C BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
-        if response_ok:
-            result = (True, voltage)
-            # We want to set the bus_voltage when we know the operation was successful
-            self.bus_voltage = voltage
-        else:
-            result = (False, "Set bus voltage failed")
-            self.bus_voltage = None
-
-        return result
+        - No command is sent if the voltage is already applied to the device.
+        """
+        # The rail is shared with the GPIO pins of Rev. B, which may set it from other threads
+        with self.device_state.key_lock(DeviceStateShadow.I3C_BUS_VOLTAGE):
+            if self.device_state.matches(DeviceStateShadow.I3C_BUS_VOLTAGE, voltage):
+                return (True, voltage)
+
+            try:
+                responses = self._sync_submit([
+                    lambda id: self.driver.setI3cBusVoltage(id, voltage)
+                ])
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
+
+            response_ok = responses[0]["name"] == "SET I3C BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+            if response_ok:
+                result = (True, voltage)
+                # We want to set the bus_voltage when we know the operation was successful
+                self.bus_voltage = voltage
+            else:
+                result = (False, "Set bus voltage failed")
+                self.bus_voltage = None
+
+            return result
 
     def controller_init(self):
         """
         Initialize the Supernova in controller mode.
+
+        It is called automatically before the first command sent through this interface, so it only needs to be
+        called explicitly to initialize the Supernova ahead of time. No command is sent if the Supernova was
+        already initialized in controller mode through this device.
+
         Returns:
         tuple: A tuple containing two elements:
             - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
             - The second element is the result coming from the SDK, or an error message
                 detailing the failure, obtained from the device's response.
         """
+        if self.device_state.matches(self.I3C_MODE, "controller"):
+            self.initialized = True
+            return (True, "I3C_CONTROLLER_INIT_SUCCESS")
+
         try:
-            responses = self.controller.sync_submit([
+            responses = self.__controller.sync_submit([
                 lambda id: self.driver.i3cControllerInit(id)
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
         status = responses[0]["result"]
+        success = status == "I3C_CONTROLLER_INIT_SUCCESS"
+        self.device_state.set(self.I3C_MODE, "controller" if success else None)
+        # A failed initialization is attempted again on the next command
+        self.initialized = success
 
-        return (status == "I3C_CONTROLLER_INIT_SUCCESS", status)
+        return (success, status)
 
     def init_bus(self, voltage: int=None, targets=None):
         """
@@ -177,7 +621,7 @@ class SupernovaI3CBlockingInterface:
                 return (False, set_bus_voltage_result)
 
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cInitBus(id, targets)
             ])
         except Exception as e:
@@ -207,7 +651,7 @@ class SupernovaI3CBlockingInterface:
                 detailing the failure, obtained from the device's response.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cClearFeature(id, I3cClearFeatureSelector.I3C_BUS, self.BROADCAST_ADDRESS)
             ])
         except Exception as e:
@@ -221,15 +665,19 @@ class SupernovaI3CBlockingInterface:
 
         return result
 
-    def targets(self):
+    def targets(self, typed: bool = False):
         """
         Retrieves the target device table from the I3C bus.
 
+        Args:
+        typed (bool, optional): If True, each entry is returned as an I3CTarget, with the BCR, DCR and PID
+                                decoded to integers. Otherwise each entry is a dictionary.
+
         Returns:
         tuple: A tuple containing two elements:
             - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
-            - The second element is either a list of dictionaries, or an error message detailing the failure,
-                obtained from the device's response.
+            - The second element is either a list of dictionaries (or I3CTarget if typed is True), or an error
+                message detailing the failure, obtained from the device's response.
                 Each dictionary entry contains formatted information about the device, including:
                 - 'static_address': The static address in hexadecimal format.
                 - 'dynamic_address': The dynamic address in hexadecimal format.
@@ -238,44 +686,34 @@ class SupernovaI3CBlockingInterface:
                 - 'pid': Unique ID (Provisional ID) containing a manufacturer ID, a part ID and an instance ID.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGetTargetDeviceTable(id)
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
         # Note: Borrowed from MissionControlBridge's Supernova Adaptor
-        targets = []
-        for target_info in responses[0]["table"]:
-            static_address = target_info["staticAddress"]
-            dynamic_address = target_info["dynamicAddress"]
-            bcr = int(target_info["bcr"]["value"][2][2:4], 16)
-            dcr = target_info["dcr"]
-            pid = target_info["pid"]
-            formatted_target_info = {
-                "static_address" : static_address,
-                "dynamic_address" : dynamic_address,
-                "bcr" : bcr,
-                "dcr" : dcr,
-                "pid" : pid
-            }
-
-            targets.append(formatted_target_info)
+        targets = [_decode_target(target_info) for target_info in responses[0]["table"]]
+        self.target_table = {target.dynamic_address: target for target in targets}
 
         # TODO: Error cases
-        result = (True, targets)
+        result = (True, targets if typed else [target.to_dict() for target in targets])
 
         return result
 
-    def find_target_device_by_pid(self, pid):
+    def find_target_device_by_pid(self, pid, typed: bool = False):
         """
         Retrieves the target device from the I3C bus with the specified PID.
 
+        Args:
+        pid: The PID, as the list of hexadecimal strings reported by the SDK, as an integer or as 6 bytes.
+        typed (bool, optional): If True, the entry is returned as an I3CTarget.
+
         Returns:
         tuple: A tuple containing two elements:
             - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
-            - The second element is either a dictionary, or an error message detailing the failure,
-                obtained from the device's response.
+            - The second element is either a dictionary (or an I3CTarget if typed is True), or an error
+                message detailing the failure, obtained from the device's response.
                 The dictionary entry contains formatted information about the device, including:
                 - 'static_address': The static address in hexadecimal format.
                 - 'dynamic_address': The dynamic address in hexadecimal format.
@@ -284,30 +722,206 @@ class SupernovaI3CBlockingInterface:
                 - 'pid': Unique ID (Provisional ID) containing a manufacturer ID, a part ID and an instance ID.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGetTargetDeviceTable(id)
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        filtered_devices = list(filter(lambda device: device["pid"] == pid, responses[0]["table"]))
-
-        if (len(filtered_devices) == 0):
-            return (False, None)
-        
-        target_info = filtered_devices[0]
-        static_address = target_info["staticAddress"]
-        dynamic_address = target_info["dynamicAddress"]
-        bcr = int(target_info["bcr"]["value"][2][2:4], 16)
-        dcr = target_info["dcr"]
-        pid = target_info["pid"]
-        return (True, {
-            "static_address" : static_address,
-            "dynamic_address" : dynamic_address,
-            "bcr" : bcr,
-            "dcr" : dcr,
-            "pid" : pid
-        })
+        pid = _pid_to_int(pid)
+        for target_info in responses[0]["table"]:
+            if _pid_to_int(target_info["pid"]) == pid:
+                target = _decode_target(target_info)
+                return (True, target if typed else target.to_dict())
+
+        return (False, None)
+
+    def cached_targets(self, typed: bool = False):
+        """
+        Retrieves the target device table as last known by the interface, without any bus traffic.
+
+        The table is refreshed by targets() and updated in place when a target hot-joins the bus or its dynamic
+        address is changed through this interface.
+
+        Args:
+        typed (bool, optional): If True, each entry is returned as an I3CTarget. Otherwise each entry is a
+                                dictionary, as returned by targets().
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the list of targets, sorted by dynamic address.
+        """
+        targets = [self.target_table[address] for address in sorted(self.target_table)]
+        return (True, targets if typed else [target.to_dict() for target in targets])
+
+    def set_hot_join_address_plan(self, address_plan: dict):
+        """
+        Sets the dynamic addresses given to targets when they hot-join the bus.
+
+        When a target whose PID is in the plan hot-joins with another dynamic address, the interface moves it
+        to the planned address with SETNEWDA before reporting the join.
+
+        Args:
+        address_plan (dict): The planned dynamic address of each target, keyed by PID. PIDs are given as
+                             integers, as 6 bytes or as the SDK list of hexadecimal strings. None or an empty
+                             dictionary keeps the addresses assigned by the Supernova.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the address plan, keyed by PID as an integer.
+        """
+        self.hot_join_address_plan = {_pid_to_int(pid): address for pid, address in (address_plan or {}).items()}
+        return (True, dict(self.hot_join_address_plan))
+
+    def on_hot_join(self, callback):
+        """
+        Registers a function called when a target hot-joins the bus, once the target is in the table and has its
+        planned dynamic address, if any.
+
+        Args:
+        callback (function): Called with the I3CTarget of the joined target and the time, in nanoseconds, taken
+                             from the reception of its hot-join IBI until it was usable.
+
+        Note:
+        - Callbacks run on the worker thread of the hot-join subscription, so a slow callback delays the next
+          hot-joins but not the other notifications. Exceptions they raise are logged.
+        """
+        self.hot_join_listeners.append(callback)
+
+    def remove_hot_join_listener(self, callback):
+        if callback in self.hot_join_listeners:
+            self.hot_join_listeners.remove(callback)
+
+    def get_hot_join_statistics(self):
+        """
+        Retrieves the number of hot-joins handled and their join-to-usable latency.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is a dictionary with the number of 'joins', the number of
+                'address_plan_failures', and the 'last_latency_ns' and 'max_latency_ns' of the joins.
+        """
+        return (True, dict(self.hot_join_statistics))
+
+    @staticmethod
+    def __is_hot_join(name, message):
+        return message["name"].strip() == "I3C IBI NOTIFICATION" and message["header"]["type"] == "IBI_HOT_JOIN"
+
+    def __handle_hot_join(self, name, message):
+        received_ns = time.perf_counter_ns()
+        target = _decode_hot_join(message)
+
+        with self.lock:
+            # A target that joins again, e.g. after a reset, is not listed twice
+            for address in [address for address, known in self.target_table.items() if known.pid == target.pid]:
+                del self.target_table[address]
+            self.target_table[target.dynamic_address] = target
+
+            planned_address = self.hot_join_address_plan.get(target.pid)
+            if planned_address is not None and planned_address != target.dynamic_address:
+                try:
+                    (success, _) = self.target_update_address(target.dynamic_address, planned_address)
+                except BackendError:
+                    success = False
+                if success:
+                    target = self.target_table[planned_address]
+                else:
+                    self.hot_join_statistics["address_plan_failures"] += 1
+
+            latency_ns = time.perf_counter_ns() - received_ns
+            statistics = self.hot_join_statistics
+            statistics["joins"] += 1
+            statistics["last_latency_ns"] = latency_ns
+            statistics["max_latency_ns"] = max(statistics["max_latency_ns"], latency_ns)
+            listeners = list(self.hot_join_listeners)
+
+        for listener in listeners:
+            try:
+                listener(target, latency_ns)
+            except Exception:
+                logger.exception("Exception in a hot-join listener")
+
+    def characterize(self, cache_path: str = None, persist: bool = True, refresh: bool = False):
+        """
+        Collects the capabilities of every target on the bus in a single pass.
+
+        GETPID, GETBCR, GETDCR, GETMRL, GETMWL, GETMXDS, GETCAPS and GETXTIME are sent to every target whose PID
+        is not in the capability cache yet, all of them submitted as one sequence. The resulting records are
+        stored in the cache, keyed by PID, and saved to the cache file so later sessions do not query the same
+        targets again. A record with errors is returned but not cached, so the target is queried again by the
+        next call. Failing to save the cache file is logged as a warning.
+
+        Args:
+        cache_path (str, optional): The capability cache file. Defaults to default_cache_path().
+        persist (bool, optional): If False, records are only cached in memory for the life of the interface.
+        refresh (bool, optional): If True, every target is queried again and its cached record is replaced.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is a dictionary with the capability record of every target, keyed by dynamic
+                address. See I3CCapabilityCache for the fields of a record. Each record also contains the
+                static and dynamic addresses of the target and 'cached', which tells whether the record came
+                from the cache.
+        """
+        path = (cache_path or default_cache_path()) if persist else None
+        if self.capability_cache is None or self.capability_cache.path != path:
+            self.capability_cache = I3CCapabilityCache(path)
+        cache = self.capability_cache
+
+        (success, targets) = self.targets(typed=True)
+        if not success:
+            return (False, targets)
+
+        pending = [target for target in targets if refresh or cache.get(target.pid) is None]
+
+        queried = {}
+        if pending:
+            sequence = [
+                lambda id, address=target.dynamic_address, driver_method=driver_method: getattr(self.driver, driver_method)(
+                    id,
+                    address,
+                    *self._target_clock_rates(address),
+                )
+                for target in pending
+                for (_, _, driver_method) in _CHARACTERIZATION_CCCS
+            ]
+
+            try:
+                responses = self._sync_submit(sequence)
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
+
+            for index, target in enumerate(pending):
+                record = {"errors": {}}
+                for offset, (field, command_name, _) in enumerate(_CHARACTERIZATION_CCCS):
+                    (ccc_success, data) = self._process_response(command_name, [responses[index * len(_CHARACTERIZATION_CCCS) + offset]])
+                    record[field] = data if ccc_success else None
+                    if not ccc_success:
+                        record["errors"][command_name] = data
+                queried[target.pid] = record
+                # An incomplete record is not cached, so the target is queried again by the next call
+                if not record["errors"]:
+                    cache.set(target.pid, record)
+
+            if any(not record["errors"] for record in queried.values()):
+                try:
+                    cache.save()
+                except OSError as e:
+                    logger.warning("Could not save the I3C capability cache to %s: %s", cache.path, e)
+
+        capabilities = {}
+        for target in targets:
+            record = dict(queried[target.pid] if target.pid in queried else cache.get(target.pid))
+            record["static_address"] = target.static_address
+            record["dynamic_address"] = target.dynamic_address
+            record["cached"] = target.pid not in queried
+            capabilities[target.dynamic_address] = record
+
+        return (True, capabilities)
 
     def toggle_ibi(self, target_address, enable: bool):
         """
@@ -334,7 +948,7 @@ class SupernovaI3CBlockingInterface:
             seq = [ lambda id: self.driver.i3cClearFeature(id, I3cClearFeatureSelector.REGULAR_IBI, target_address) ]
 
         try:
-            responses = self.controller.sync_submit(seq)
+            responses = self._sync_submit(seq)
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
@@ -367,7 +981,7 @@ class SupernovaI3CBlockingInterface:
                 detailing the failure, obtained from the controller's response.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cChangeDynamicAddress(id, current_address, new_address)
             ])
         except Exception as e:
@@ -376,6 +990,7 @@ class SupernovaI3CBlockingInterface:
         status = responses[0]["result"]
 
         if status == I3cChangeDynAddrError.I3C_CHANGE_DYNAMIC_ADDRESS_SUCCESS:
+            self.__move_target_settings(current_address, new_address)
             result = (True, "OK")
         else:
             result = (False, status)
@@ -395,7 +1010,7 @@ class SupernovaI3CBlockingInterface:
                 detailing the failure, obtained from the device's response.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cTriggerTargetResetPattern(id)
             ])
         except Exception as e:
@@ -422,7 +1037,7 @@ class SupernovaI3CBlockingInterface:
                 detailing the failure, obtained from the device's response.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cTriggerExitPattern(id)
             ])
         except Exception as e:
@@ -436,69 +1051,19 @@ class SupernovaI3CBlockingInterface:
 
         return (True, None)
 
-    def _process_response(self, command_name, responses, extra_data=None):
-        def format_successful_response_payload(command_name, response):
-            if command_name == "write":
-                return None
-            elif command_name == "read":
-                return response["data"]
-            elif command_name == "ccc_getpid":
-                return [int(item[2:], 16) for item in response["pid"]]
-            elif command_name == "ccc_getbcr":
-                return response["bcr"]["value"][2][2:].upper()
-            elif command_name == "ccc_getdcr":
-                return response["dcr"][2:].upper()
-            elif command_name == "ccc_getmrl":
-                return response["maxReadLength"]
-            elif command_name == "ccc_getmwl":
-                return response["maxWriteLength"]
-            elif command_name == "ccc_getxtime":
-                return {
-                 "supportedModes": response["supportedModes"]["value"][1],
-                 "currentState": response["state"]["value"][1],
-                 "frequency": response["frequency"]["value"],
-                 "inaccuracy": response["inaccuracy"]["value"],
-                }
-            elif command_name == "ccc_getmxds":
-                return {
-                 "maxWrite": response["maxWr"]["value"][1],
-                 "maxRead": response["maxRd"]["value"][1],
-                 "maxReadTurnaround": float(response["maxRdTurn"][1].split(" ")[0]),
-                }
-            elif command_name == "ccc_getcaps":
-                return [
-                    response["caps1"]["value"][1],
-                    response["caps2"]["value"][1],
-                    response["caps3"]["value"][1],
-                    response["caps4"]["value"]
-                ]
-            elif command_name == "ccc_get_status":
-                return response["data"]
-            elif command_name in ["ccc_setnewda", "ccc_rstdaa"]:
-                return None
-            elif command_name == "ccc_direct_rstact":
-                return response["data"] if response["descriptor"] and response["descriptor"]["dataLength"] > 0 else None
-            elif command_name in ["ccc_unicast_setmrl", "ccc_unicast_setmwl", "ccc_broadcast_setmwl", "ccc_broadcast_setmrl"]:
-                return response["data"]
-            return None
-        def format_error_response_payload(command_name, response):
-            error_data = None
-            if command_name in ["ccc_setaasa", "ccc_setdasa", "ccc_entdaa"]:
-                if (response['invalidAddresses']):
-                    error_data = response['invalidAddresses']
-                result = {"error": response["header"]["result"]}
-                if error_data: result["error_data"] = error_data
-                return result
-
-            return response["descriptor"]["errors"][0]
-
+    def _process_response(self, command_name, responses, extra_data=None, typed=False):
         response = responses[0]
-        success = response["header"]["result"] == "I3C_TRANSFER_SUCCESS" or response["header"]["result"] == "DAA_SUCCESS"
 
-        if success:
-            data = format_successful_response_payload(command_name, response)
+        if response["header"]["result"] in _SUCCESSFUL_RESULTS:
+            decoder = _SUCCESS_DECODERS.get(command_name, _decode_none)
+            if typed:
+                decoder = _TYPED_SUCCESS_DECODERS.get(command_name, decoder)
+            success = True
         else:
-            data = format_error_response_payload(command_name, response)
+            decoder = _ERROR_DECODERS.get(command_name, _decode_first_error)
+            success = False
+
+        data = decoder(response)
 
         if extra_data:
             data.update(extra_data)
@@ -527,13 +1092,12 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cWrite(
                     id,
                     target_address,
                     mode,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     subaddress,
                     buffer,
                 )
@@ -565,13 +1129,12 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cRead(
                     id,
                     target_address,
                     mode,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     subaddress,
                     length,
                 )
@@ -581,22 +1144,278 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("read", responses)
 
-    def ccc_getbcr(self, target_address):
+    def prepare_read(self, target_address, mode: TransferMode, subaddress: [], length):
+        """
+        Prepares a read to be executed many times, e.g. in a polling loop.
+
+        The arguments are validated and bound once. The clock rates in effect when the read is prepared are used
+        for every execution.
+
+        Args:
+        target_address: The address of the target device on the I3C bus from which data is to be read.
+        mode (TransferMode): The transfer mode to be used for the read operation.
+        subaddress (list): A list of integers representing the subaddress to be used in the read operation.
+        length (int): The expected length of data to be read from the device.
+
+        Returns:
+        PreparedTransfer: The read. Its execute() method returns the same tuple as read().
+
+        Raises:
+        ValueError: If an argument is out of range.
+        """
+        check_range("target_address", target_address, 0, 0x7F)
+        check_byte_list("subaddress", subaddress)
+        check_range("length", length, 1, 0xFFFF)
+        if not isinstance(mode, TransferMode):
+            raise ValueError("mode must be a TransferMode")
+
+        return PreparedTransfer(self.controller, *i3c_read_request(self, target_address, subaddress, length, mode), submit=self._sync_submit)
+
+    def prepare_write(self, target_address, mode: TransferMode, subaddress: [], buffer: list):
+        """
+        Prepares a write to be executed many times, like prepare_read().
+
+        Args:
+        target_address: The address of the target device on the I3C bus to which data is to be written.
+        mode (TransferMode): The transfer mode to be used for the write operation.
+        subaddress (list): A list of integers representing the subaddress to be used in the write operation.
+        buffer (list): A list of data bytes to be written to the target device.
+
+        Returns:
+        PreparedTransfer: The write. Its execute() method returns the same tuple as write().
+
+        Raises:
+        ValueError: If an argument is out of range.
+        """
+        check_range("target_address", target_address, 0, 0x7F)
+        check_byte_list("subaddress", subaddress)
+        check_byte_list("buffer", buffer)
+        if not isinstance(mode, TransferMode):
+            raise ValueError("mode must be a TransferMode")
+
+        return PreparedTransfer(self.controller, *i3c_write_request(self, target_address, subaddress, list(buffer), mode), submit=self._sync_submit)
+
+    def supports_hdr_ddr(self, target_address):
+        """
+        Tells whether a target supports HDR-DDR transfers, according to its GETCAPS response.
+
+        The result is cached per dynamic address, so GETCAPS is only sent the first time a target is checked.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is True if the target supports HDR-DDR. Targets that do not answer GETCAPS
+                are reported as not supporting it.
+        """
+        supported = self.hdr_ddr_support.get(target_address)
+        if supported is None:
+            (success, caps) = self.ccc_getcaps(target_address)
+            # Bit 0 of GETCAPS byte 1 is HDR mode 0, i.e. HDR-DDR
+            supported = success and bool(caps[0] & 0x01)
+            self.hdr_ddr_support[target_address] = supported
+
+        return (True, supported)
+
+    def bulk_read(self, target_address, subaddress: list, length: int, chunk_size: int = None, increment_subaddress: bool = True, mode: TransferMode = None):
+        """
+        Reads a large block of data from a target, in HDR-DDR if the target supports it and in SDR otherwise.
+
+        The block is split into chunks that are submitted together as one sequence. If a chunk fails in HDR-DDR,
+        the transfer goes on in SDR from that chunk. HDR-DDR is not used for that target anymore if the chunk
+        failed with a DDR CRC or parity error, while a transient error like a NACK leaves it enabled.
+
+        The sequence is submitted with Priority.BULK in a flow of its own per target, unless an enclosing
+        scheduling() block of the controller sets them, so other transfers are served first.
+
+        Args:
+        target_address: The dynamic address of the target.
+        subaddress (list): The subaddress of the first chunk.
+        length (int): The number of bytes to read.
+        chunk_size (int, optional): The maximum length of each read. Defaults to BULK_CHUNK_SIZE.
+        increment_subaddress (bool, optional): If True, the subaddress of every chunk is the one of the previous
+                                               chunk plus its length, taking subaddress as a big-endian number.
+                                               If False, every chunk is read from the same subaddress, e.g. a FIFO.
+                                               In HDR-DDR the subaddress is the HDR command code, so it is never
+                                               incremented and the target is expected to go on where the
+                                               previous chunk ended.
+        mode (TransferMode, optional): Forces a transfer mode instead of selecting it automatically.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is either a dictionary with the 'data' read, the 'mode' used, whether it
+                'fell_back' to SDR, the 'elapsed_ns' and the achieved 'bytes_per_second', or an error message
+                detailing the failure.
+        """
+        def request(mode, chunk_subaddress, start, end):
+            return lambda id: self.driver.i3cRead(id, target_address, mode, *self._target_clock_rates(target_address), chunk_subaddress, end - start)
+
+        return self.__bulk_transfer("read", target_address, subaddress, length, chunk_size, increment_subaddress, mode, request)
+
+    def bulk_write(self, target_address, subaddress: list, buffer: list, chunk_size: int = None, increment_subaddress: bool = True, mode: TransferMode = None):
+        """
+        Writes a large block of data to a target, in HDR-DDR if the target supports it and in SDR otherwise,
+        like bulk_read().
+
+        Args:
+        target_address: The dynamic address of the target.
+        subaddress (list): The subaddress of the first chunk.
+        buffer (list): The data bytes to write.
+        chunk_size (int, optional): The maximum length of each write. Defaults to BULK_CHUNK_SIZE.
+        increment_subaddress (bool, optional): If True, the subaddress of every chunk is the one of the previous
+                                               chunk plus its length. If False, every chunk is written to the
+                                               same subaddress. It is never incremented in HDR-DDR.
+        mode (TransferMode, optional): Forces a transfer mode instead of selecting it automatically.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is either a dictionary with the 'length' written, the 'mode' used, whether
+                it 'fell_back' to SDR, the 'elapsed_ns' and the achieved 'bytes_per_second', or an error
+                message detailing the failure.
+        """
+        def request(mode, chunk_subaddress, start, end):
+            return lambda id: self.driver.i3cWrite(id, target_address, mode, *self._target_clock_rates(target_address), chunk_subaddress, buffer[start:end])
+
+        return self.__bulk_transfer("write", target_address, subaddress, len(buffer), chunk_size, increment_subaddress, mode, request)
+
+    def get_bulk_throughput(self):
+        """
+        Retrieves the throughput achieved by the bulk transfers done so far, per transfer mode.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is a dictionary keyed by transfer mode name, e.g. 'I3C_HDR_DDR', with the
+                'bytes', 'elapsed_ns' and 'bytes_per_second' of the bulk transfers done in that mode.
+        """
+        return (True, {
+            mode: dict(statistics, bytes_per_second=self.__throughput(statistics["bytes"], statistics["elapsed_ns"]))
+            for mode, statistics in self.bulk_statistics.items()
+        })
+
+    @staticmethod
+    def __throughput(length, elapsed_ns):
+        return length * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+
+    def __bulk_transfer(self, command_name, target_address, subaddress, length, chunk_size, increment_subaddress, mode, build_request):
+        if length <= 0:
+            return (False, "Nothing to transfer")
+
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+
+        if mode is None:
+            use_hdr = length >= self.HDR_DDR_MIN_LENGTH and self.supports_hdr_ddr(target_address)[1]
+            mode = TransferMode.I3C_HDR_DDR if use_hdr else TransferMode.I3C_SDR
+            automatic = True
+        else:
+            automatic = False
+
+        chunks = self.__bulk_chunks(mode, subaddress, length, chunk_size, increment_subaddress)
+        (data, elapsed_ns, failure) = self.__submit_chunks(command_name, target_address, mode, chunks, build_request)
+        fell_back = False
+        if failure is not None and automatic and mode == TransferMode.I3C_HDR_DDR:
+            (failed_index, response) = failure
+            errors = _transfer_error(response) or []
+            if _HDR_DDR_ERRORS.intersection([errors] if isinstance(errors, str) else errors):
+                self.hdr_ddr_support[target_address] = False
+            mode = TransferMode.I3C_SDR
+            fell_back = True
+            # The chunks done before the failure are kept
+            chunks = self.__bulk_chunks(mode, subaddress, length, chunk_size, increment_subaddress)[failed_index:]
+            (sdr_data, sdr_elapsed_ns, failure) = self.__submit_chunks(command_name, target_address, mode, chunks, build_request)
+            data += sdr_data
+            elapsed_ns += sdr_elapsed_ns
+
+        if failure is not None:
+            return (False, self._process_response(command_name, [failure[1]])[1])
+
+        statistics = self.bulk_statistics.setdefault(mode.name, {"bytes": 0, "elapsed_ns": 0, "transfers": 0})
+        statistics["bytes"] += length
+        statistics["elapsed_ns"] += elapsed_ns
+        statistics["transfers"] += 1
+
+        result = {"data": data} if command_name == "read" else {"length": length}
+        result.update({
+            "mode": mode,
+            "fell_back": fell_back,
+            "elapsed_ns": elapsed_ns,
+            "bytes_per_second": self.__throughput(length, elapsed_ns),
+        })
+        return (True, result)
+
+    @staticmethod
+    def __bulk_chunks(mode, subaddress, length, chunk_size, increment_subaddress):
+        """
+        Splits a bulk transfer into the subaddress, start and end offsets of each chunk.
+        """
+        # In HDR-DDR the subaddress is the command code, which is the same for every chunk
+        increment_subaddress = increment_subaddress and subaddress and mode != TransferMode.I3C_HDR_DDR
+        chunks = []
+        for start in range(0, length, chunk_size):
+            chunk_subaddress = subaddress
+            if increment_subaddress:
+                address = int.from_bytes(bytes(subaddress), "big") + start
+                chunk_subaddress = list((address % (1 << (8 * len(subaddress)))).to_bytes(len(subaddress), "big"))
+            chunks.append((chunk_subaddress, start, min(start + chunk_size, length)))
+        return chunks
+
+    def __submit_chunks(self, command_name, target_address, mode, chunks, build_request):
+        """
+        Submits the chunks of a bulk transfer as one sequence.
+
+        Returns:
+        tuple: The data read until the first failed chunk, the time taken, and None if every chunk succeeded or
+               the index and the response of the first failed chunk otherwise.
+        """
+        sequence = [build_request(mode, subaddress, start, end) for (subaddress, start, end) in chunks]
+
+        started_ns = time.perf_counter_ns()
         try:
-            responses = self.controller.sync_submit([
+            # Bulk traffic yields to other transfers, unless the caller set its own priority
+            with self.controller.scheduling(Priority.BULK, flow=("i3c", target_address), override=False):
+                responses = self._sync_submit(sequence)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+        elapsed_ns = time.perf_counter_ns() - started_ns
+
+        data = []
+        for (index, response) in enumerate(responses):
+            (success, chunk_data) = self._process_response(command_name, [response])
+            if not success:
+                return (data, elapsed_ns, (index, response))
+            if command_name == "read":
+                data.extend(chunk_data)
+
+        return (data, elapsed_ns, None)
+
+    def ccc_getbcr(self, target_address, typed: bool = False):
+        """
+        Performs a GETBCR (Get Bus Characteristics Register) operation on a target device on the I3C bus.
+
+        Args:
+        target_address: The address of the target device on the I3C bus from which the BCR is requested.
+        typed (bool, optional): If True, the BCR is returned as an integer instead of a hexadecimal string.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is either the BCR, indicating success, or an error message detailing the failure.
+        """
+        try:
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETBCR(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("ccc_getbcr", responses)
+        return self._process_response("ccc_getbcr", responses, typed=typed)
 
-    def ccc_getdcr(self, target_address):
+    def ccc_getdcr(self, target_address, typed: bool = False):
         """
         Performs a GETDCR (Get Device Characteristics Register) operation on a target device on the I3C bus.
 
@@ -606,6 +1425,7 @@ class SupernovaI3CBlockingInterface:
 
         Args:
         target_address: The address of the target device on the I3C bus from which the DCR data is requested.
+        typed (bool, optional): If True, the DCR is returned as an integer instead of a hexadecimal string.
 
         Returns:
         tuple: A tuple containing two elements:
@@ -614,20 +1434,19 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETDCR(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("ccc_getdcr", responses)
+        return self._process_response("ccc_getdcr", responses, typed=typed)
 
-    def ccc_getpid(self, target_address):
+    def ccc_getpid(self, target_address, typed: bool = False):
         """
         Performs a GETPID (Get Provisional ID) operation on a target device on the I3C bus.
 
@@ -637,6 +1456,8 @@ class SupernovaI3CBlockingInterface:
 
         Args:
         target_address: The address of the target device on the I3C bus from which the PID data is requested.
+        typed (bool, optional): If True, the PID is returned as a 48-bit integer, like I3CTarget.pid, instead of
+                                a list of bytes.
 
         Returns:
         tuple: A tuple containing two elements:
@@ -645,18 +1466,17 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETPID(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("ccc_getpid", responses)
+        return self._process_response("ccc_getpid", responses, typed=typed)
 
     def ccc_getacccr(self, target_address):
         """
@@ -676,12 +1496,11 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETACCCR(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -714,14 +1533,13 @@ class SupernovaI3CBlockingInterface:
                     or an error message detailing the failure obtained from the controller's response. 
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectRSTACT(
                     id,
                     target_address,
                     defining_byte,
                     read_or_write_reset_action,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -745,7 +1563,7 @@ class SupernovaI3CBlockingInterface:
             - The second element is None if the operation was succesful, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastRSTACT(
                     id,
                     defining_byte,
@@ -776,12 +1594,11 @@ class SupernovaI3CBlockingInterface:
                 or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETMXDS(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -807,12 +1624,11 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETMRL(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -838,12 +1654,11 @@ class SupernovaI3CBlockingInterface:
                 success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETMWL(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -869,12 +1684,11 @@ class SupernovaI3CBlockingInterface:
                     success, or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETXTIME(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -900,12 +1714,11 @@ class SupernovaI3CBlockingInterface:
                 or an error message detailing the failure.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETCAPS(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -928,7 +1741,7 @@ class SupernovaI3CBlockingInterface:
               Since RSTDAA does not typically return data, only success or failure is indicated.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cRSTDAA(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -966,7 +1779,7 @@ class SupernovaI3CBlockingInterface:
                 Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cENTDAA(
                     id,
                     device_table
@@ -1000,7 +1813,7 @@ class SupernovaI3CBlockingInterface:
               Since this is a broadcast command, no specific data is expected in return.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENEC(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1037,7 +1850,7 @@ class SupernovaI3CBlockingInterface:
               Since this is a broadcast command, no specific data is expected in return.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastDISEC(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1075,12 +1888,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectENEC(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     events
                 )
             ])
@@ -1113,12 +1925,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectDISEC(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     events
                 )
             ])
@@ -1146,7 +1957,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cSETDASA(
                     id,
                     static_address,
@@ -1179,19 +1990,22 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cSETNEWDA(
                     id,
                     current_address,
                     new_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(current_address),
                 )
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("ccc_setnewda", responses)
+        result = self._process_response("ccc_setnewda", responses)
+        if result[0]:
+            self.__move_target_settings(current_address, new_address)
+
+        return result
 
     def ccc_unicast_setgrpa(self, target_address):
         """
@@ -1211,12 +2025,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectSETGRPA(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -1242,12 +2055,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectRSTGRPA(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -1274,12 +2086,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectSETMRL(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     max_read_length,
                 )
             ])
@@ -1307,12 +2118,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectSETMWL(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                     max_write_length,
                 )
             ])
@@ -1339,7 +2149,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastSETMWL(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1370,7 +2180,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastSETMWL(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1401,7 +2211,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cSETAASA(
                     id,
                     static_addresses,
@@ -1429,7 +2239,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENDXFED(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1459,12 +2269,11 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cDirectENDXFER(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -1491,7 +2300,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastSETXTIME(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1528,7 +2337,7 @@ class SupernovaI3CBlockingInterface:
               Specific data is usually not returned in this operation, only the success or failure status.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastSETBUSCON(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1561,7 +2370,7 @@ class SupernovaI3CBlockingInterface:
               reflecting the broadcast command's attempt to set the bus to the specified idle time.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENTAS0(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1586,7 +2395,7 @@ class SupernovaI3CBlockingInterface:
               reflecting the broadcast command's attempt to set the bus to the specified idle time.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENTAS1(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1611,7 +2420,7 @@ class SupernovaI3CBlockingInterface:
               reflecting the broadcast command's attempt to set the bus to the specified idle time.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENTAS2(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1636,7 +2445,7 @@ class SupernovaI3CBlockingInterface:
               reflecting the broadcast command's attempt to set the bus to the specified idle time.
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cBroadcastENTAS3(
                     id,
                     self.push_pull_clock_freq_mhz,
@@ -1659,12 +2468,11 @@ class SupernovaI3CBlockingInterface:
 
         """
         try:
-            responses = self.controller.sync_submit([
+            responses = self._sync_submit([
                 lambda id: self.driver.i3cGETSTATUS(
                     id,
                     target_address,
-                    self.push_pull_clock_freq_mhz,
-                    self.open_drain_clock_freq_mhz,
+                    *self._target_clock_rates(target_address),
                 )
             ])
         except Exception as e:
@@ -0,0 +1,89 @@
+import json
+import os
+from threading import Lock
+
+
+def default_cache_path():
+    """
+    Returns the default location of the capability cache: supernovacontroller/i3c_capabilities.json inside
+    $XDG_CACHE_HOME, or ~/.cache if it is not set.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "supernovacontroller", "i3c_capabilities.json")
+
+
+class I3CCapabilityCache:
+    """
+    Capability records of I3C targets, keyed by PID and optionally persisted to a JSON file.
+
+    The properties a target reports through GETPID, GETBCR, GETDCR, GETMRL, GETMWL, GETMXDS, GETCAPS and
+    GETXTIME do not change between sessions, so once a target has been characterized its record is reused
+    instead of querying the target again.
+
+    Each record is a dictionary with the keys pid (list of bytes), bcr, dcr, mrl, mwl, mxds, caps and xtime,
+    holding the payload returned by the corresponding ccc_* method, or None if the target did not answer it.
+    The errors key maps the name of every failed CCC to the error reported by the Supernova.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        """
+        Args:
+        path (str, optional): The JSON file the records are loaded from and saved to. If None, the records
+                              are only kept in memory.
+        """
+        self.path = path
+        self.lock = Lock()
+        self.records = {}
+
+        if path is not None:
+            self.load()
+
+    @staticmethod
+    def key(pid: int):
+        return f"{pid:012X}"
+
+    def load(self):
+        """
+        Loads the records from the cache file. A missing or unreadable file leaves the cache empty.
+        """
+        try:
+            with open(self.path) as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(content, dict) and content.get("version") == self.VERSION:
+            with self.lock:
+                self.records = dict(content.get("targets", {}))
+
+    def save(self):
+        """
+        Writes the records to the cache file. The file is replaced atomically.
+        """
+        if self.path is None:
+            return
+
+        with self.lock:
+            content = {"version": self.VERSION, "targets": dict(self.records)}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(content, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def get(self, pid: int):
+        with self.lock:
+            return self.records.get(self.key(pid))
+
+    def set(self, pid: int, record: dict):
+        with self.lock:
+            self.records[self.key(pid)] = record
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
@@ -5,10 +5,18 @@ from BinhoSupernova.commands.definitions import (I3cTargetMemoryLayout_t, I3cTar
 from supernovacontroller.errors import BusVoltageError
 from supernovacontroller.errors import BusNotInitializedError
 from supernovacontroller.errors import BackendError
-from threading import Event
-import queue
+from threading import Event, RLock
+from collections import deque
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
+from .i3c_target_stream import I3CTargetStream
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
 
 class I3CTargetNotificationHandler:
+    # Notifications kept until wait_for_notification() is called. The oldest ones are dropped beyond it.
+    MAX_PENDING_NOTIFICATIONS = 256
 
     def __init__(self,notification_subscription):
         """
@@ -27,7 +35,10 @@ class I3CTargetNotificationHandler:
         self.modified = False
         notification_subscription("I3C TARGET NOTIFICATION", filter_func=self.is_i3c_target_notification, handler_func=self.handle_i3c_target_notification)
         # High level notification handling queue to pass message from handle_i3c_target_notification to wait_for_notification
-        self.high_notification_queue = queue.SimpleQueue()
+        self.high_notification_queue = deque(maxlen=self.MAX_PENDING_NOTIFICATIONS)
+        self.dropped_notifications = 0
+        # Functions called with every notification as it is received, e.g. by an I3CTargetPersonality
+        self.listeners = []
 
     def wait_for_notification(self, timeout):
         """
@@ -50,16 +61,15 @@ class I3CTargetNotificationHandler:
         """
 
         data_has_been_received = False
-        if self.high_notification_queue.empty():
+        if not self.high_notification_queue:
             data_has_been_received = self.notification.wait(timeout)
             self.notification.clear()
-            if (data_has_been_received is False):
-                self.notification_message = None
-            else:
-                self.notification_message = self.high_notification_queue.get()
-        else:
+        try:
+            self.notification_message = self.high_notification_queue.popleft()
             data_has_been_received = True
-            self.notification_message = self.high_notification_queue.get()
+        except IndexError:
+            data_has_been_received = False
+            self.notification_message = None
 
         return data_has_been_received, self.notification_message
     
@@ -95,14 +105,31 @@ class I3CTargetNotificationHandler:
         wait_for_notification function that an event was raised before it was called.
         """
         self.notification_message = message
-        self.high_notification_queue.put(message)
+        if len(self.high_notification_queue) == self.MAX_PENDING_NOTIFICATIONS:
+            self.dropped_notifications += 1
+        self.high_notification_queue.append(message)
         self.notification.set()
+
+        for listener in list(self.listeners):
+            try:
+                listener(message)
+            except Exception:
+                logger.exception("Exception in an I3C target notification listener")
         
+@thread_safe
 class SupernovaI3CTargetBlockingInterface:
     
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
+    I3C_MODE = "i3c.mode"
+    # Waiting for notifications does not block the other users of the interface
+    UNLOCKED_METHODS = ("wait_for_notification",)
+
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, device_state: DeviceStateShadow = None):
         self.driver = driver
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
         self.controller = controller
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
         self.mem_layout = I3cTargetMemoryLayout_t.MEM_2_BYTES
         # I3C target notification handler
         self.i3c_notification = I3CTargetNotificationHandler(notification_subscription)
@@ -139,7 +166,11 @@ class SupernovaI3CTargetBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         status = responses[0]["result"]
-        return (status == "I3C_TARGET_INIT_SUCCESS", status)
+        success = status == "I3C_TARGET_INIT_SUCCESS"
+        # The I3C peripheral is no longer in controller mode
+        self.device_state.set(self.I3C_MODE, "target" if success else None)
+
+        return (success, status)
 
     def set_pid(self, pid: list):
         """
@@ -320,6 +351,69 @@ class SupernovaI3CTargetBlockingInterface:
 
         return((True, None) if (status == "I3C_TARGET_WRITE_MEM_SUCCESS") else (False, responses[0]["error"]))
         
+    def write_memory_blocks(self, blocks: list):
+        """
+        Writes several blocks of the memory the Supernova as an I3C target represents via USB, in a single sequence.
+
+        Args:
+        blocks (list): The (subaddress, buffer) of each block to write.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the error of the first block that failed or None if all of them were successful
+        """
+        if not blocks:
+            return (True, None)
+
+        try:
+            responses = self.controller.sync_submit([
+                lambda id, subaddress=subaddress, buffer=buffer: self.driver.i3cTargetWriteMemory(id, subaddress, buffer)
+                for (subaddress, buffer) in blocks
+            ])
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        for response in responses:
+            if response["result"] != "I3C_TARGET_WRITE_MEM_SUCCESS":
+                return (False, response["error"])
+        return (True, None)
+
+    def add_notification_listener(self, callback):
+        """
+        Registers a function called with every I3C target notification as soon as it is received, on the
+        notification thread of the device. Notifications are still returned by wait_for_notification() as well.
+        Exceptions raised by the function are logged.
+
+        Args:
+        callback (function): Called with the notification, as received from the SDK.
+        """
+        self.i3c_notification.listeners.append(callback)
+
+    def remove_notification_listener(self, callback):
+        if callback in self.i3c_notification.listeners:
+            self.i3c_notification.listeners.remove(callback)
+
+    def start_streaming(self, source=None, memory_size: int = 1024):
+        """
+        Starts using the target memory as a double buffer to stream data to the controller, see I3CTargetStream.
+
+        Args:
+        source (function, optional): Called with a length, returns that many bytes to stream. Defaults to a
+                                     counter pattern.
+        memory_size (int, optional): The size of the target memory, in bytes.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the I3CTargetStream, whose stop() ends the streaming and whose
+                get_statistics() reports the bytes per second and underruns, or the error if the memory could
+                not be filled.
+        """
+        stream = I3CTargetStream(self, source, memory_size)
+        (success, error) = stream.start()
+        return (True, stream) if success else (False, error)
+
     def read_memory(self, subaddress: [], length):
         """
         Reads the memory the Supernova as an I3C target represents via USB.
@@ -0,0 +1,331 @@
+import threading
+import time
+from collections import deque
+
+from supernovacontroller.errors import BackendError
+
+from ..utils.logging import logging
+from .notification_worker import NotificationWorker
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class Register:
+    """
+    Register of a target personality, occupying width consecutive addresses of the target memory. Multi-byte
+    values are stored least significant byte first.
+
+    Access types:
+    - READ_WRITE: The controller writes the value.
+    - READ_ONLY: Writes of the controller are undone.
+    - WRITE_1_TO_CLEAR: The bits written as 1 by the controller are cleared, the others are kept.
+
+    Side effects are given as functions:
+    - on_write(personality, register, value): Called after the controller wrote the register, with its new value.
+    - on_read(personality, register): Called after the controller read the register, e.g. to clear it on read.
+
+    They can change any register through personality.set(), and the changes reach the target memory before the
+    personality handles the next notification.
+    """
+
+    READ_WRITE = "rw"
+    READ_ONLY = "ro"
+    WRITE_1_TO_CLEAR = "w1c"
+
+    def __init__(self, name: str, address: int, value: int = 0, width: int = 1, access: str = READ_WRITE,
+                 on_write=None, on_read=None):
+        if access not in (self.READ_WRITE, self.READ_ONLY, self.WRITE_1_TO_CLEAR):
+            raise ValueError(f"Unknown register access {access}")
+        self.name = name
+        self.address = address
+        self.width = width
+        self.access = access
+        self.on_write = on_write
+        self.on_read = on_read
+        self.value = value
+
+    @property
+    def end(self):
+        return self.address + self.width
+
+    def contents(self):
+        """
+        Returns the bytes of the register as the controller reads them.
+        """
+        return list(self.value.to_bytes(self.width, "little"))
+
+    def written(self, value: int):
+        """
+        Returns the value of the register after the controller wrote value to it.
+        """
+        if self.access == self.READ_ONLY:
+            return self.value
+        if self.access == self.WRITE_1_TO_CLEAR:
+            return self.value & ~value
+        return value
+
+    def read(self, length: int):
+        """
+        Accounts for length bytes of the register read by the controller.
+        """
+
+
+class FifoRegister(Register):
+    """
+    Read-only window of width addresses over a queue of bytes, e.g. the data FIFO of a sensor.
+
+    The window holds the next width bytes of the queue, padded with fill. A read of the controller consumes the
+    bytes it returned, so a burst read starting at the window returns consecutive bytes of the queue, and the
+    window is refilled with the following ones.
+    """
+
+    def __init__(self, name: str, address: int, width: int = 1, fill: int = 0x00, on_read=None):
+        super().__init__(name, address, width=width, access=Register.READ_ONLY, on_read=on_read)
+        self.fill = fill
+        self.queue = deque()
+
+    def contents(self):
+        window = [self.queue[index] for index in range(min(self.width, len(self.queue)))]
+        return window + [self.fill] * (self.width - len(window))
+
+    def push(self, data: list):
+        self.queue.extend(data)
+
+    def read(self, length: int):
+        for _ in range(min(length, len(self.queue))):
+            self.queue.popleft()
+
+
+class I3CTargetPersonality:
+    """
+    Emulates a device on top of the memory of a Supernova in I3C target mode.
+
+    The personality keeps a model of the register map of the device. When the controller writes or reads the
+    target, the notification of the transfer is applied to the model, e.g. a write-1-to-clear register clears the
+    written bits or a FIFO register drops the bytes that were read, and every register that changed is written
+    back to the target memory right away, in a single sequence. The contents the next read returns are thus in
+    memory before the controller issues it, without any work from the user.
+
+    Notifications are handled in order on a NotificationWorker, so the memory writes never hold up the notification
+    thread of the device.
+
+    Example:
+        personality = I3CTargetPersonality(i3c_target, [
+            Register("WHO_AM_I", 0x00, 0x42, access=Register.READ_ONLY),
+            Register("STATUS", 0x01, 0x03, access=Register.WRITE_1_TO_CLEAR),
+            FifoRegister("FIFO_DATA", 0x10, width=4),
+        ])
+        personality.attach()
+        personality.push("FIFO_DATA", [0x01, 0x02, 0x03])
+
+    Note:
+    - Addresses are byte addresses of the target memory, so the target is expected to use the 1 byte memory layout.
+    """
+
+    def __init__(self, target, registers: list):
+        """
+        Args:
+        target (SupernovaI3CTargetBlockingInterface): The interface of the Supernova in target mode.
+        registers (list): The Register instances of the register map. They must not overlap.
+        """
+        self.target = target
+        self.registers = sorted(registers, key=lambda register: register.address)
+        self.by_name = {register.name: register for register in self.registers}
+        for previous, register in zip(self.registers, self.registers[1:]):
+            if register.address < previous.end:
+                raise ValueError(f"Registers {previous.name} and {register.name} overlap")
+
+        self.lock = threading.RLock()
+        self.dirty = set()
+        # Set while a notification is handled, so that the changes of side effects are written once at the end
+        self.handling = False
+        self.attached = False
+        self.worker = None
+        self.statistics = {"notifications": 0, "memory_writes": 0, "memory_write_errors": 0, "last_reaction_ns": None,
+                           "max_reaction_ns": 0}
+
+    def attach(self):
+        """
+        Writes the whole register map to the target memory and starts following the transfers of the controller.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the error if the memory could not be written or None if it was successful
+        """
+        with self.lock:
+            self.dirty.update(self.registers)
+            result = self.flush()
+            if not self.attached:
+                self.worker = NotificationWorker("i3c-target-personality", self.__handle)
+                self.target.add_notification_listener(self.handle_notification)
+                self.attached = True
+        return result
+
+    def detach(self):
+        with self.lock:
+            if not self.attached:
+                return
+            self.target.remove_notification_listener(self.handle_notification)
+            self.attached = False
+            worker = self.worker
+            self.worker = None
+        # Not under the lock, the worker may be waiting for it
+        worker.stop()
+
+    def get(self, name: str):
+        return self.by_name[name].value
+
+    def set(self, name: str, value: int, flush: bool = True):
+        """
+        Changes the value of a register, as the emulated device would.
+
+        Args:
+        name (str): The name of the register.
+        value (int): The new value.
+        flush (bool, optional): If False, the change is only written to the target memory with the next flush,
+                                e.g. to batch several changes. Changes done by side effects are always batched.
+        """
+        with self.lock:
+            register = self.by_name[name]
+            register.value = value
+            self.dirty.add(register)
+            if flush and not self.handling:
+                return self.flush()
+        return (True, None)
+
+    def push(self, name: str, data: list, flush: bool = True):
+        """
+        Queues bytes in a FIFO register.
+        """
+        with self.lock:
+            register = self.by_name[name]
+            register.push(data)
+            self.dirty.add(register)
+            if flush and not self.handling:
+                return self.flush()
+        return (True, None)
+
+    def flush(self):
+        """
+        Writes the registers changed since the last flush to the target memory, merging adjacent registers into a
+        single block. If the write fails, the registers are written again with the next flush.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the error if the memory could not be written or None if it was successful
+        """
+        with self.lock:
+            if not self.dirty:
+                return (True, None)
+            blocks = []
+            for register in sorted(self.dirty, key=lambda register: register.address):
+                if blocks and blocks[-1][0] + len(blocks[-1][1]) == register.address:
+                    blocks[-1][1].extend(register.contents())
+                else:
+                    blocks.append((register.address, register.contents()))
+
+            try:
+                (success, error) = self.target.write_memory_blocks(blocks)
+            except BackendError as e:
+                (success, error) = (False, e)
+
+            if success:
+                self.dirty.clear()
+                self.statistics["memory_writes"] += len(blocks)
+            else:
+                self.statistics["memory_write_errors"] += 1
+            return (success, error)
+
+    def handle_notification(self, notification):
+        """
+        Queues a transfer of the controller, given as the I3C target notification, to be applied to the register map
+        by the worker.
+        """
+        # Named transfer_type by some SDK releases
+        notification_type = notification.get("notification_type", notification.get("transfer_type"))
+        if notification_type not in ("I3C_TARGET_WRITE", "I3C_TARGET_READ"):
+            return
+
+        worker = self.worker
+        if worker is not None:
+            worker.submit((time.perf_counter_ns(), notification_type, notification))
+
+    def get_statistics(self):
+        """
+        Returns the number of notifications handled, of memory blocks written and of failed writes, the time taken
+        from a notification until the memory is updated, and the notifications dropped because the worker fell
+        behind.
+        """
+        with self.lock:
+            statistics = dict(self.statistics)
+            worker = self.worker
+        statistics["dropped_notifications"] = worker.get_statistics()["dropped"] if worker is not None else 0
+        return statistics
+
+    def __handle(self, queued):
+        """
+        Applies a transfer of the controller to the register map and writes the resulting changes to the target
+        memory. Runs on the worker.
+        """
+        (received_ns, notification_type, notification) = queued
+        address = notification["memory_address"]
+        length = notification["transfer_length"]
+
+        with self.lock:
+            self.handling = True
+            try:
+                if notification_type == "I3C_TARGET_WRITE":
+                    self.__apply_write(address, notification["data"][:length])
+                else:
+                    self.__apply_read(address, length)
+            finally:
+                self.handling = False
+
+            (success, error) = self.flush()
+            if not success:
+                logger.warning("Unable to update the memory of the I3C target: %s", error)
+
+            reaction_ns = time.perf_counter_ns() - received_ns
+            self.statistics["notifications"] += 1
+            self.statistics["last_reaction_ns"] = reaction_ns
+            self.statistics["max_reaction_ns"] = max(self.statistics["max_reaction_ns"], reaction_ns)
+
+    def __touched(self, address, length):
+        """
+        Returns the registers overlapping the given addresses, with the offsets of the first and last address
+        within each register.
+        """
+        end = address + length
+        for register in self.registers:
+            if register.address >= end:
+                break
+            if register.end > address:
+                yield (register, max(address, register.address) - register.address, min(end, register.end) - register.address)
+
+    def __apply_write(self, address, data):
+        for (register, first, last) in self.__touched(address, len(data)):
+            # Bytes of the register that were not written keep their value. For a write-1-to-clear register they
+            # are taken as written with 0, which keeps them as well, whereas their current value would clear them.
+            if register.access == Register.WRITE_1_TO_CLEAR:
+                contents = [0] * register.width
+            else:
+                contents = list(register.value.to_bytes(register.width, "little"))
+            start = register.address + first - address
+            contents[first:last] = data[start:start + last - first]
+            value = register.written(int.from_bytes(bytes(contents), "little"))
+
+            # The memory now holds what the controller wrote, so the register is rewritten even if it did not change
+            register.value = value
+            self.dirty.add(register)
+            if register.on_write is not None:
+                register.on_write(self, register, value)
+
+    def __apply_read(self, address, length):
+        for (register, first, last) in self.__touched(address, length):
+            register.read(last - first)
+            if isinstance(register, FifoRegister):
+                self.dirty.add(register)
+            if register.on_read is not None:
+                register.on_read(self, register)
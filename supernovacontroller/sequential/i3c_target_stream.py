@@ -0,0 +1,141 @@
+import threading
+import time
+
+from supernovacontroller.errors import BackendError
+
+from .notification_worker import NotificationWorker
+
+
+def counter_pattern():
+    """
+    Returns a source of bytes counting up from 0 and wrapping around, so that the controller can check that no
+    data was lost or repeated.
+    """
+    state = {"next": 0}
+
+    def source(length):
+        start = state["next"]
+        state["next"] = (start + length) % 256
+        return [(start + offset) % 256 for offset in range(length)]
+
+    return source
+
+
+class I3CTargetStream:
+    """
+    Turns a Supernova in I3C target mode into a continuous data source, for measuring the read throughput of an
+    I3C controller.
+
+    The target memory is split in two halves. While the controller reads one half, the host refills the other
+    one with the next bytes of the source. A half is refilled as soon as a read notification shows that the
+    controller read up to its end, so the controller is expected to read the memory from start to end, in as
+    many reads as it needs, and to start over at address 0.
+
+    A read of a half that was not refilled yet returned stale data and is counted as an underrun.
+    """
+
+    HALVES = 2
+
+    def __init__(self, target, source=None, memory_size: int = 1024):
+        """
+        Args:
+        target (SupernovaI3CTargetBlockingInterface): The interface of the Supernova in target mode.
+        source (function, optional): Called with a length, returns that many bytes to stream. Defaults to
+                                     counter_pattern().
+        memory_size (int, optional): The size of the target memory, in bytes. It must be even.
+        """
+        if memory_size % self.HALVES:
+            raise ValueError("The memory size must be even")
+        self.target = target
+        self.source = source if source is not None else counter_pattern()
+        self.memory_size = memory_size
+        self.half_size = memory_size // self.HALVES
+
+        self.lock = threading.Lock()
+        # Whether each half holds data the controller did not read yet
+        self.ready = [False] * self.HALVES
+        self.worker = None
+        self.statistics = {"bytes_read": 0, "refills": 0, "underruns": 0, "refill_errors": 0}
+        self.first_read_ns = None
+        self.last_read_ns = None
+
+    def start(self):
+        """
+        Fills the whole target memory and starts refilling it as the controller reads it.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the error if the memory could not be written or None if it was successful
+        """
+        for half in range(self.HALVES):
+            (success, error) = self.__refill(half)
+            if not success:
+                return (False, error)
+
+        # Refills are done on a thread of their own, so that the notification thread never waits for the USB
+        self.worker = NotificationWorker("i3c-target-stream", self.__refill, max_pending=self.HALVES)
+        self.target.add_notification_listener(self.handle_notification)
+        return (True, None)
+
+    def stop(self):
+        self.target.remove_notification_listener(self.handle_notification)
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def handle_notification(self, notification):
+        """
+        Accounts for a read of the controller and schedules the refill of the halves it finished.
+        """
+        notification_type = notification.get("notification_type", notification.get("transfer_type"))
+        if notification_type != "I3C_TARGET_READ":
+            return
+
+        now_ns = time.perf_counter_ns()
+        start = notification["memory_address"]
+        end = min(start + notification["transfer_length"], self.memory_size)
+
+        finished = []
+        with self.lock:
+            if self.first_read_ns is None:
+                self.first_read_ns = now_ns
+            self.last_read_ns = now_ns
+            self.statistics["bytes_read"] += max(end - start, 0)
+
+            if end > start:
+                for half in range(start // self.half_size, (end - 1) // self.half_size + 1):
+                    if not self.ready[half]:
+                        self.statistics["underruns"] += 1
+                    if end >= (half + 1) * self.half_size:
+                        self.ready[half] = False
+                        finished.append(half)
+
+        worker = self.worker
+        if worker is not None:
+            for half in finished:
+                worker.submit(half)
+
+    def get_statistics(self):
+        """
+        Returns the bytes read by the controller, their rate, and the number of refills, underruns and failed refills.
+        """
+        with self.lock:
+            statistics = dict(self.statistics)
+            elapsed_ns = (self.last_read_ns - self.first_read_ns) if self.first_read_ns is not None else 0
+        statistics["elapsed_ns"] = elapsed_ns
+        statistics["bytes_per_second"] = statistics["bytes_read"] * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+        return statistics
+
+    def __refill(self, half):
+        try:
+            (success, error) = self.target.write_memory(half * self.half_size, self.source(self.half_size))
+        except BackendError as e:
+            (success, error) = (False, e)
+        with self.lock:
+            if success:
+                self.ready[half] = True
+                self.statistics["refills"] += 1
+            else:
+                self.statistics["refill_errors"] += 1
+        return (success, error)
@@ -0,0 +1,37 @@
+import inspect
+from functools import wraps
+
+
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def thread_safe(cls):
+    """
+    Class decorator making an interface safe to use from several threads.
+
+    Every public method of the class runs holding the lock of the instance, self.lock, which must be a
+    threading.RLock created in __init__. A method therefore sees a consistent configuration of the interface,
+    e.g. the SPI mode and chip select are not changed by another thread while a transfer is built, and the
+    transfers of different threads on the same interface do not interleave within a method.
+
+    Each interface has its own lock, so different interfaces of a device, e.g. I2C and I3C, are driven in
+    parallel. The lock is reentrant, so a caller can hold it to make a sequence of calls atomic:
+
+        with spi.lock:
+            spi.set_parameters(mode=SpiControllerMode.MODE_3)
+            spi.transfer(data, len(data))
+
+    Methods named in the UNLOCKED_METHODS attribute of the class, like those waiting for a notification, are not
+    wrapped, so waiting does not block the other threads using the interface.
+    """
+    unlocked = getattr(cls, "UNLOCKED_METHODS", ())
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or name in unlocked or not inspect.isfunction(member):
+            continue
+        setattr(cls, name, _locked(member))
+    return cls
@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class NotificationWorker:
+    """
+    Runs the handler of a notification subscription on a thread of its own, so that a slow handler does not
+    delay the dispatch of the notifications of other subscriptions.
+
+    Notifications are handled one at a time, in the order they were received. At most max_pending notifications
+    wait for the handler: when the queue is full the oldest one is dropped and counted.
+    """
+
+    DEFAULT_MAX_PENDING = 256
+
+    def __init__(self, name, run, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+        name (str): The name of the subscription.
+        run (function): Called with each notification, on the thread of the worker.
+        max_pending (int, optional): The number of notifications that can wait for the handler.
+        """
+        self.name = name
+        self.run = run
+        self.max_pending = max_pending
+        self.pending = deque(maxlen=max_pending)
+        self.condition = threading.Condition()
+        self.running = True
+        self.dispatched = 0
+        self.dropped = 0
+        self.peak_pending = 0
+        self.thread = threading.Thread(target=self.__work, name=f"notification-{name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, message):
+        """
+        Queues a notification for the handler. Never blocks.
+        """
+        with self.condition:
+            if len(self.pending) == self.max_pending:
+                self.dropped += 1
+            self.pending.append(message)
+            self.peak_pending = max(self.peak_pending, len(self.pending))
+            self.condition.notify()
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Stops the worker after the notification being handled, if any. Pending notifications are discarded.
+        """
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify()
+        # A handler may remove its own subscription
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def get_statistics(self):
+        with self.condition:
+            return {
+                "pending": len(self.pending),
+                "peak_pending": self.peak_pending,
+                "max_pending": self.max_pending,
+                "dispatched": self.dispatched,
+                "dropped": self.dropped,
+            }
+
+    def __work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                message = self.pending.popleft()
+
+            try:
+                self.run(message)
+            except Exception:
+                logger.exception("Exception in the handler of the %s notifications", self.name)
+
+            with self.condition:
+                self.dispatched += 1
@@ -0,0 +1,198 @@
+from BinhoSupernova.commands.definitions import TransferMode, COMMANDS_DICTIONARY, SPI_CONTROLLER_TRANSFER
+from supernovacontroller.errors import BackendError
+
+
+def i3c_read_request(i3c, target_address, subaddress: list, length, mode: TransferMode = TransferMode.I3C_SDR):
+    """
+    Builds the request and decoder of an I3C read.
+
+    The clock rates of the target are captured when the request is built, and the Supernova is
+    initialized in controller mode if no command was sent through the interface yet.
+
+    Returns:
+    tuple: The request function, which takes a transfer id, and the decoder, which turns the response
+           into the same (success, data) tuple returned by SupernovaI3CBlockingInterface.read.
+    """
+    if not i3c.initialized:
+        i3c.controller_init()
+
+    driver = i3c.driver
+    (push_pull_clock_freq_mhz, open_drain_clock_freq_mhz) = i3c._target_clock_rates(target_address)
+
+    def request(id):
+        driver.i3cRead(id, target_address, mode, push_pull_clock_freq_mhz, open_drain_clock_freq_mhz, subaddress, length)
+
+    # Decoded by the interface itself, so the results are the same as the ones of read
+    def decode(response):
+        return i3c._process_response("read", [response])
+
+    return (request, decode)
+
+
+def i3c_write_request(i3c, target_address, subaddress: list, buffer: list, mode: TransferMode = TransferMode.I3C_SDR):
+    """
+    Builds the request and decoder of an I3C write, like i3c_read_request.
+
+    Returns:
+    tuple: The request function and the decoder, which returns the same (success, data) tuple as
+           SupernovaI3CBlockingInterface.write.
+    """
+    if not i3c.initialized:
+        i3c.controller_init()
+
+    driver = i3c.driver
+    (push_pull_clock_freq_mhz, open_drain_clock_freq_mhz) = i3c._target_clock_rates(target_address)
+
+    def request(id):
+        driver.i3cWrite(id, target_address, mode, push_pull_clock_freq_mhz, open_drain_clock_freq_mhz, subaddress, buffer)
+
+    def decode(response):
+        return i3c._process_response("write", [response])
+
+    return (request, decode)
+
+
+def i2c_read_request(i2c, address, register: list, length):
+    """
+    Builds the request and decoder of an I2C read.
+
+    If register is empty a plain read is issued, otherwise a read from the given register.
+
+    Returns:
+    tuple: The request function and the decoder, which returns the same (success, data) tuple as
+           SupernovaI2CBlockingInterface.read_from.
+    """
+    driver = i2c.driver
+
+    if register:
+        expected_name = "I2C READ FROM"
+
+        def request(id):
+            driver.i2cReadFrom(id, address, register, length)
+    else:
+        expected_name = "I2C READ"
+
+        def request(id):
+            driver.i2cRead(id, address, length)
+
+    def decode(response):
+        if response["name"] == expected_name and response["status"] == "NO_TRANSFER_ERROR":
+            return (True, response["data"])
+        return (False, response["status"])
+
+    return (request, decode)
+
+
+def i2c_write_request(i2c, address, register: list, data: list):
+    """
+    Builds the request and decoder of an I2C write.
+
+    Returns:
+    tuple: The request function and the decoder, which returns the same (success, None) tuple as
+           SupernovaI2CBlockingInterface.write.
+    """
+    driver = i2c.driver
+
+    def request(id):
+        driver.i2cWrite(id, address, register, data)
+
+    def decode(response):
+        if response["name"] == "I2C WRITE" and response["status"] == "NO_TRANSFER_ERROR":
+            return (True, None)
+        return (False, response["status"])
+
+    return (request, decode)
+
+
+def spi_transfer_request(spi, data: list, transfer_length):
+    """
+    Builds the request and decoder of an SPI transfer.
+
+    Returns:
+    tuple: The request function and the decoder, which returns the same (success, payload) tuple as
+           SupernovaSPIControllerBlockingInterface.transfer.
+    """
+    driver = spi.driver
+    expected_name = COMMANDS_DICTIONARY[SPI_CONTROLLER_TRANSFER]["name"]
+
+    def request(id):
+        driver.spiControllerTransfer(id=id, payload=data, transferLength=transfer_length)
+
+    def decode(response):
+        success = response["name"] == expected_name and response["usb_error"] == "CMD_SUCCESSFUL" \
+            and response["manager_error"] == "SPI_NO_ERROR" and response["driver_error"] == "SPI_DRIVER_NO_TRANSFER_ERROR"
+        return (success, response["payload"] if success else None)
+
+    return (request, decode)
+
+
+def check_byte_list(name, values):
+    if not isinstance(values, (list, bytes, bytearray)) or not all(isinstance(value, int) and 0 <= value <= 0xFF for value in values):
+        raise ValueError(f"{name} must be a list of bytes")
+
+
+def check_range(name, value, minimum, maximum):
+    if not isinstance(value, int) or not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be an integer in [{minimum}, {maximum}]")
+
+
+class PreparedTransfer:
+    """
+    A transfer whose arguments were bound and validated once, to be executed many times.
+
+    Prepared transfers are created with the prepare_read()/prepare_write() methods of the I3C, I2C and SPI
+    interfaces. The request is built when the transfer is prepared, so executing it only submits the request
+    and decodes the response.
+
+    Example:
+        prepared = i3c.prepare_read(target_address, i3c.TransferMode.I3C_SDR, [0x1D], 14)
+        while polling:
+            (success, data) = prepared.execute()
+
+    Note:
+    - The clock rates and other interface settings in effect when the transfer is prepared are used for every
+      execution. Prepare the transfer again after changing them.
+    - The retry policy of the interface applies to every execution, including each one of execute_many().
+    """
+
+    __slots__ = ("controller", "request", "decode", "sequence", "submit")
+
+    def __init__(self, controller, request, decode, submit=None):
+        self.controller = controller
+        self.request = request
+        self.decode = decode
+        self.sequence = [request]
+        # Function submitting a sequence and returning its responses, e.g. applying a retry policy
+        self.submit = submit if submit is not None else controller.sync_submit
+
+    def execute(self):
+        """
+        Executes the transfer once.
+
+        Returns:
+        tuple: The (success, data) tuple returned by the equivalent interface method.
+        """
+        try:
+            responses = self.submit(self.sequence)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        return self.decode(responses[0])
+
+    def execute_many(self, count: int):
+        """
+        Executes the transfer count times back to back, submitted as a single sequence.
+
+        Returns:
+        list: The (success, data) tuple of each execution, in order.
+        """
+        if count <= 0:
+            return []
+
+        try:
+            responses = self.submit([self.request] * count)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        decode = self.decode
+        return [decode(response) for response in responses]
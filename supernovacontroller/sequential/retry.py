@@ -0,0 +1,203 @@
+import time
+from threading import Lock
+
+
+# Errors caused by noise or contention on the bus, which usually go away when the transfer is repeated
+DEFAULT_RETRYABLE_ERRORS = frozenset([
+    # I3C
+    "NACK_ERROR",
+    "TIMEOUT_ERROR",
+    "WRITE_ABORT_ERROR",
+    "DDR_CRC_ERROR",
+    "DDR_PARITY_ERROR",
+    "I3C_TRANSFER_DRIVER_TIMEOUT",
+    "I3C_TRANSFER_SOFTWARE_TIMEOUT",
+    # I2C
+    "I2C_NACK_ADDRESS",
+    "I2C_NACK_BYTE",
+    "I2C_BUSY",
+    "I2C_BIT_ERROR",
+    "I2C_ARBITRATION_LOST",
+    "I2C_TIMEOUT_WAITING_BUS_EVENT",
+    "I2C_TIMEOUT_SCL_LOW",
+])
+
+
+class RetryPolicy:
+    """
+    Describes which failed transfers are repeated, how many times and how long to wait between attempts.
+
+    Example:
+        # Retry NACKs up to 5 times and every other transient error up to 3 times
+        policy = RetryPolicy(max_attempts=3, errors={"NACK_ERROR": 5})
+        i3c.set_retry_policy(policy)
+
+    Note:
+    - Attempts are counted including the first one, so max_attempts=1 disables retries.
+    - Errors that are not retryable, like invalid arguments, are reported to the caller right away.
+    """
+
+    def __init__(self, max_attempts: int = 3, errors=None, backoff_s: float = 0.0005, backoff_factor: float = 2.0, max_backoff_s: float = 0.05):
+        """
+        Args:
+        max_attempts (int, optional): The maximum number of attempts of a transfer failing with a retryable error.
+        errors (optional): The retryable errors. Either an iterable of error names, retried up to max_attempts
+                           times, or a dictionary mapping error names to their own maximum number of attempts.
+                           Defaults to DEFAULT_RETRYABLE_ERRORS.
+        backoff_s (float, optional): The time waited before the first retry, in seconds.
+        backoff_factor (float, optional): The factor the waiting time is multiplied by after every retry.
+        max_backoff_s (float, optional): The maximum time waited before a retry, in seconds.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.backoff_factor = backoff_factor
+        self.max_backoff_s = max_backoff_s
+
+        if errors is None:
+            errors = DEFAULT_RETRYABLE_ERRORS
+        if isinstance(errors, dict):
+            self.errors = dict(errors)
+        else:
+            self.errors = {error: max_attempts for error in errors}
+
+    def attempts_for(self, errors):
+        """
+        Returns the maximum number of attempts of a transfer that failed with the given error or list of errors.
+        """
+        if isinstance(errors, str):
+            errors = [errors]
+        return max([self.errors.get(error, 1) for error in errors], default=1)
+
+    def delay(self, retry: int):
+        """
+        Returns the time to wait before the given retry, counted from 1, in seconds.
+        """
+        return min(self.backoff_s * self.backoff_factor ** (retry - 1), self.max_backoff_s)
+
+
+class RetryStatistics:
+    """
+    Counters of the retries done by an interface.
+
+    Counters:
+    - transfers: Transfers submitted, not counting retries.
+    - retries: Transfers submitted again after a retryable error.
+    - recovered: Transfers that succeeded after one or more retries.
+    - exhausted: Transfers that still failed with a retryable error after their last attempt.
+    - errors: Number of retries per error name.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.transfers = 0
+            self.retries = 0
+            self.recovered = 0
+            self.exhausted = 0
+            self.errors = {}
+
+    def snapshot(self):
+        """
+        Returns the counters as a dictionary.
+        """
+        with self.lock:
+            return {
+                "transfers": self.transfers,
+                "retries": self.retries,
+                "recovered": self.recovered,
+                "exhausted": self.exhausted,
+                "errors": dict(self.errors),
+            }
+
+
+def retry_failures(submit, sequence, responses, classify, policy: RetryPolicy, statistics: RetryStatistics = None):
+    """
+    Repeats the requests of a submitted sequence whose responses report a retryable error.
+
+    The failed requests are submitted again together, as a new sequence, until they succeed, fail with an error
+    that is not retryable or run out of attempts. The responses list is updated in place.
+
+    Args:
+    submit: The function submitting a sequence and returning its responses, e.g. TransferController.sync_submit.
+    sequence (list): The requests that were submitted.
+    responses (list): Their responses.
+    classify: The function returning the error name, or list of error names, of the response at an index of the
+              sequence, or None if it succeeded. Called as classify(index, response).
+    policy (RetryPolicy): The retry policy. If None, nothing is retried.
+    statistics (RetryStatistics, optional): The counters to update.
+
+    Returns:
+    list: The number of retries of each request.
+
+    Note:
+    - Retried requests are issued after the rest of the sequence, so a sequence that relies on the order of its
+      transfers, like a write followed by a read of the written value, can observe them out of order.
+    """
+    retries = [0] * len(responses)
+    if statistics is not None:
+        with statistics.lock:
+            statistics.transfers += len(responses)
+
+    if policy is None:
+        return retries
+
+    pending = range(len(responses))
+    retry_round = 0
+    while True:
+        failed = []
+        for index in pending:
+            errors = classify(index, responses[index])
+            if errors is None:
+                if retries[index] and statistics is not None:
+                    with statistics.lock:
+                        statistics.recovered += 1
+                continue
+
+            if isinstance(errors, str):
+                errors = [errors]
+            attempts = policy.attempts_for(errors)
+            if retries[index] + 1 < attempts:
+                failed.append(index)
+                if statistics is not None:
+                    with statistics.lock:
+                        statistics.retries += 1
+                        for error in errors:
+                            statistics.errors[error] = statistics.errors.get(error, 0) + 1
+            elif attempts > 1 and statistics is not None:
+                with statistics.lock:
+                    statistics.exhausted += 1
+
+        if not failed:
+            return retries
+
+        retry_round += 1
+        delay = policy.delay(retry_round)
+        if delay > 0:
+            time.sleep(delay)
+
+        for index, response in zip(failed, submit([sequence[index] for index in failed])):
+            responses[index] = response
+            retries[index] += 1
+        pending = failed
+
+
+def submit_with_retry(submit, sequence, classify, policy: RetryPolicy, statistics: RetryStatistics = None):
+    """
+    Submits a sequence and repeats the requests that fail with a retryable error, see retry_failures.
+
+    Args:
+    classify: The function returning the error name, or list of error names, of a response, or None if it
+              succeeded.
+
+    Returns:
+    list: The responses of the sequence, with the response of the last attempt of every retried request.
+    """
+    responses = list(submit(sequence))
+    retry_failures(submit, sequence, responses, lambda index, response: classify(response), policy, statistics)
+    return responses
@@ -0,0 +1,67 @@
+from collections import OrderedDict, deque
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """
+    Priority classes of submissions. Lower values are served first.
+    """
+    INTERRUPT = 0
+    CONTROL = 1
+    NORMAL = 2
+    BULK = 3
+
+
+class FairQueue:
+    """
+    Submissions waiting for a slot of the flow control window, by priority class and flow.
+
+    The highest priority class with waiting submissions is always served first. Within a class, flows are served
+    round robin, one submission each, so a flow queueing many submissions does not delay the other flows of its
+    class by more than one submission each.
+
+    A flow is any hashable value, e.g. an interface name or an (interface, target address) tuple.
+    """
+
+    def __init__(self):
+        # Priority class -> OrderedDict of flow -> deque of items, in service order
+        self.classes = {}
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def push(self, priority, flow, item):
+        flows = self.classes.setdefault(priority, OrderedDict())
+        flows.setdefault(flow, deque()).append(item)
+        self.length += 1
+
+    def pop(self):
+        """
+        Removes and returns the next item to be served.
+        """
+        priority = min(self.classes)
+        flows = self.classes[priority]
+        (flow, items) = next(iter(flows.items()))
+        item = items.popleft()
+        if items:
+            flows.move_to_end(flow)
+        else:
+            del flows[flow]
+            if not flows:
+                del self.classes[priority]
+        self.length -= 1
+        return item
+
+    def remove(self, priority, flow, item):
+        """
+        Removes an item that is no longer waiting, e.g. because its deadline expired.
+        """
+        flows = self.classes[priority]
+        items = flows[flow]
+        items.remove(item)
+        if not items:
+            del flows[flow]
+            if not flows:
+                del self.classes[priority]
+        self.length -= 1
@@ -1,3 +1,4 @@
+from threading import RLock
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from supernovacontroller.errors import BackendError, BusVoltageError
@@ -6,10 +7,17 @@ from BinhoSupernova.commands.definitions import (
     SpiControllerChipSelect, SpiControllerChipSelectPolarity, COMMANDS_DICTIONARY,
     SPI_CONTROLLER_INIT, SPI_CONTROLLER_SET_PARAMETERS, SPI_CONTROLLER_TRANSFER
 )
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
+from .prepared import PreparedTransfer, check_byte_list, check_range, spi_transfer_request
 
+@thread_safe
 class SupernovaSPIControllerBlockingInterface:
+    INITIALIZED = "spi.initialized"
+    PARAMETERS = "spi.parameters"
+
     # Private Methods
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, device_state: DeviceStateShadow = None):
         """
         Initializes a new instance of the SupernovaSPIControllerBlockingInterface class. This interface is used for
         blocking SPI controller communication with the Supernova.
@@ -24,6 +32,8 @@ class SupernovaSPIControllerBlockingInterface:
 
         # Supernova driver instance
         self.driver = driver
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
         # Transfer controller instance
         self.controller = controller
         # SPI controller communication parameters
@@ -33,7 +43,8 @@ class SupernovaSPIControllerBlockingInterface:
         self.chip_select = SpiControllerChipSelect.CHIP_SELECT_0          # Chip select 0
         self.chip_select_pol = SpiControllerChipSelectPolarity.ACTIVE_LOW  # Active low
         self.frequency = 10000000                                        # 10 MHz
-        self.bus_voltage = None
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
     
     def __store_parameters(self, bit_order: SpiControllerBitOrder=None, mode: SpiControllerMode=None, chip_select: SpiControllerChipSelect=None,
                            chip_select_pol: SpiControllerChipSelectPolarity=None, frequency: int=None):
@@ -98,6 +109,21 @@ class SupernovaSPIControllerBlockingInterface:
             response["driver_error"] == "SPI_DRIVER_NO_TRANSFER_ERROR"
         ])
     
+    @property
+    def bus_voltage(self):
+        # I2C, SPI and UART share the same bus voltage rail
+        return self.device_state.get(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE)
+
+    @bus_voltage.setter
+    def bus_voltage(self, voltage_mv):
+        self.device_state.set(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv)
+
+    def __current_parameters(self):
+        """
+        Returns the SPI communication parameters of the instance as the tuple recorded in the device state shadow.
+        """
+        return (self.bit_order, self.mode, self.data_width, self.chip_select, self.chip_select_pol, self.frequency)
+
     def set_bus_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the SPI controller interface to a specified value.
@@ -119,33 +145,40 @@ class SupernovaSPIControllerBlockingInterface:
           method should ensure that the provided voltage value is within acceptable limits
           for their specific hardware configuration.
         - The bus voltage is updated in the interface instance only if the operation is successful.
+        - The bus voltage is shared with the other I2C, SPI and UART interfaces. No command is sent if
+          the voltage is already applied to the device.
 
         Raises:
         BackendError: If an exception occurs setting the bus voltage process.
         """
-
-        # Set the SPI bus voltage accordingly
-        responses = None
-        try:
-            responses = self.controller.sync_submit([
-                lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
-            ])
-        except Exception as e:
-            raise BackendError(original_exception=e) from e
+        # The rail is shared with the other interfaces, which may set it from other threads
+        with self.device_state.key_lock(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE):
+
+            if self.device_state.matches(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv):
+                return (True, voltage_mv)
+
+            # Set the SPI bus voltage accordingly
+            responses = None
+            try:
+                responses = self.controller.sync_submit([
+                    lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
+                ])
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
-
-        # If successful, update the bus voltage
-        if response_success:
-            result = (True, voltage_mv)
-            self.bus_voltage = voltage_mv
-        # If not successful update method response
-        else:
-            result = (False, responses[0]["result"])
-            self.bus_voltage = None
-
-        return result
+            # Check if the response is of the expected type (by name) and it was successful 
+            response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+
+            # If successful, update the bus voltage
+            if response_success:
+                result = (True, voltage_mv)
+                self.bus_voltage = voltage_mv
+            # If not successful update method response
+            else:
+                result = (False, responses[0]["result"])
+                self.bus_voltage = None
+
+            return result
     
     def init_bus(self, bit_order: SpiControllerBitOrder=None, mode: SpiControllerMode=None,
                  chip_select: SpiControllerChipSelect=None, chip_select_pol: SpiControllerChipSelectPolarity=None, frequency: int=None):
@@ -174,6 +207,7 @@ class SupernovaSPIControllerBlockingInterface:
         Note:
         - The method does not perform validation on any of the SPI communication parameters. Users of this
           method should ensure that the provided configuration is valid.
+        - No command is sent if the same parameters are already applied to the device.
         """
 
         # Update the SPI class attributes with the provided data
@@ -183,6 +217,10 @@ class SupernovaSPIControllerBlockingInterface:
         # Return failure if data is incomplete
         if not is_data_complete: 
             return (False, "Init failed, incomplete parameters to initialize bus")
+
+        # Skip the request if the bus is already initialized with the same parameters
+        if self.device_state.get(self.INITIALIZED) and self.device_state.matches(self.PARAMETERS, self.__current_parameters()):
+            return (True, "Success")
         
         # Request SPI controller initialization 
         responses = None
@@ -196,6 +234,9 @@ class SupernovaSPIControllerBlockingInterface:
         # Check if the response is of the expected type (by name) and it was successful 
         response_success = responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_INIT]["name"] and self.__check_if_response_is_correct(responses[0])
 
+        self.device_state.set(self.INITIALIZED, response_success or None)
+        self.device_state.set(self.PARAMETERS, self.__current_parameters() if response_success else None)
+
         return (response_success, "Success" if response_success else "Init failed, error from the Supernova")
      
     def set_parameters(self, bit_order: SpiControllerBitOrder=None, mode: SpiControllerMode=None,
@@ -225,6 +266,7 @@ class SupernovaSPIControllerBlockingInterface:
         Note:
         - The method does not perform validation on any of the SPI communication parameters. Users of this
           method should ensure that the provided configuration is valid.
+        - No command is sent if the same parameters are already applied to the device.
         """
 
         # Update the SPI class attributes with the provided data
@@ -235,6 +277,10 @@ class SupernovaSPIControllerBlockingInterface:
         if not is_data_complete: 
             return (False, "Set parameters failed, incomplete parameters to do set parameters")
 
+        # Skip the request if the same parameters are already applied
+        if self.device_state.matches(self.PARAMETERS, self.__current_parameters()):
+            return (True, "Success")
+
         responses = None
         # Request SPI controller set parameters 
         try:
@@ -247,6 +293,8 @@ class SupernovaSPIControllerBlockingInterface:
         # Check if the response is of the expected type (by name) and it was successful 
         response_success = responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_SET_PARAMETERS]["name"] and self.__check_if_response_is_correct(responses[0])
 
+        self.device_state.set(self.PARAMETERS, self.__current_parameters() if response_success else None)
+
         return (response_success, "Success" if response_success else "Set Parameters failed, error from the Supernova")
 
     def get_parameters(self):
@@ -297,4 +345,38 @@ class SupernovaSPIControllerBlockingInterface:
         # Check if the response is of the expected type (by name) and it was successful 
         response_success =  responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_TRANSFER]["name"] and self.__check_if_response_is_correct(responses[0])
             
-        return (response_success, responses[0]["payload"] if response_success else None)
\ No newline at end of file
+        return (response_success, responses[0]["payload"] if response_success else None)
+
+    def prepare_transfer(self, data, transfer_length):
+        """
+        Prepares a transfer to be executed many times, e.g. in a polling loop.
+
+        The arguments are validated and bound once.
+
+        Args:
+        data: The data to be transmitted over the SPI bus.
+        transfer_length: 2-bytes integer that represents the transfer length. The range allowed is [1, 1024].
+
+        Returns:
+        PreparedTransfer: The transfer. Its execute() method returns the same tuple as transfer().
+
+        Raises:
+        ValueError: If an argument is out of range.
+        """
+        check_byte_list("data", data)
+        check_range("transfer_length", transfer_length, 1, 1024)
+
+        return PreparedTransfer(self.controller, *spi_transfer_request(self, list(data), transfer_length))
+
+    def prepare_write(self, data):
+        """
+        Prepares a transfer that sends data, with a transfer length equal to the length of data.
+        """
+        return self.prepare_transfer(data, len(data))
+
+    def prepare_read(self, length, fill: int = 0x00):
+        """
+        Prepares a transfer that clocks in length bytes, sending the fill byte on MOSI.
+        """
+        check_range("fill", fill, 0, 0xFF)
+        return self.prepare_transfer([fill] * length, length)
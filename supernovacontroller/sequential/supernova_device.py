@@ -1,13 +1,13 @@
-import inspect
+import importlib
 import os
 import queue
 import threading
+import time
+from collections.abc import Mapping
+from contextlib import nullcontext
 
 from BinhoSupernova import getConnectedSupernovaDevicesList
-from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
-from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.utils.system_message import SystemOpcode
-from transfer_controller import TransferController
 
 from supernovacontroller.errors import (BackendError,
                                         DeviceAlreadyMountedError,
@@ -15,27 +15,105 @@ from supernovacontroller.errors import (BackendError,
                                         UnknownInterfaceError)
 
 from ..utils.logging import log_instance_method_calls, logging
-from .gpio import SupernovaGPIOInterface
-from .i2c import SupernovaI2CBlockingInterface
-from .i3c import SupernovaI3CBlockingInterface
-from .i3c_target import SupernovaI3CTargetBlockingInterface
-from .spi_controller import SupernovaSPIControllerBlockingInterface
-from .uart import SupernovaUARTBlockingInterface
+from .controller import SupernovaTransferController, TransferIdAllocator
+from .flow_control import FlowControl
+from .hooks import TransferHooks
+from .notification_worker import NotificationWorker
+from .scheduler import Priority
+from .device_state import DeviceStateShadow
 
 logger = logging.getLogger("supernovacontroller")
 
-def id_gen(start=0):
-    i = start
-    while True:
-        i += 1
-        yield i
+# Marks the flow_control argument of SupernovaDevice as not given, since None disables flow control
+_DEFAULT_FLOW_CONTROL = object()
+
+# USB strings of the devices opened by this process, keyed by USB path. The identity of a device does not
+# change while it is connected, so reopening it does not need to query it again.
+_usb_strings_cache = {}
+_usb_strings_cache_lock = threading.Lock()
+
+class SupernovaDeviceInfo(Mapping):
+    """
+    Identity of a Supernova device.
+
+    It behaves as the read-only dictionary returned by SupernovaDevice.open(), with the keys hw_version,
+    fw_version, serial_number, manufacturer and product_name, and exposes the same values as properties.
+    Values that were not fetched when the device was opened are requested from the device on first access.
+    """
+
+    # Field name and GetUsbStringSubCommand member that retrieves it
+    FIELDS = {
+        "hw_version": "HW_VERSION",
+        "fw_version": "FW_VERSION",
+        "serial_number": "SERIAL_NUMBER",
+        "manufacturer": "MANUFACTURER",
+        "product_name": "PRODUCT_NAME",
+    }
+
+    def __init__(self, device):
+        self.__device = device
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        # USB strings are prefixed with their sub command, e.g. "HW-C"
+        return self.__device._get_usb_strings([key])[key][3:]
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    @property
+    def hw_version(self):
+        return self["hw_version"]
+
+    @property
+    def fw_version(self):
+        return self["fw_version"]
+
+    @property
+    def serial_number(self):
+        return self["serial_number"]
+
+    @property
+    def manufacturer(self):
+        return self["manufacturer"]
+
+    @property
+    def product_name(self):
+        return self["product_name"]
 
 class SupernovaDevice:
-    def __init__(self, start_id=0):
-        self.controller = TransferController(id_gen(start_id))
+    def __init__(self, start_id=0, default_timeout=None, flow_control=_DEFAULT_FLOW_CONTROL):
+        """
+        Args:
+        start_id (int, optional): The id after which transfer ids are handed out.
+        default_timeout (float, optional): The time in seconds a blocking transfer may take before it is
+                                           cancelled. None waits forever. See SupernovaTransferController.
+        flow_control (FlowControl, optional): The adaptive window capping the transfers outstanding at the
+                                              adapter. Defaults to a FlowControl with its default settings.
+                                              None disables the cap.
+        """
+        if flow_control is _DEFAULT_FLOW_CONTROL:
+            flow_control = FlowControl()
+        self.controller = SupernovaTransferController(TransferIdAllocator(start_id), default_timeout, flow_control)
         self.response_queue = queue.SimpleQueue()
         self.notification_queue = queue.SimpleQueue()
         self.notification_handlers = {}
+        # Workers of the threaded subscriptions, keyed by name
+        self.notification_workers = {}
+        self.notification_lock = threading.Lock()
+        # Last configuration applied to the device, shared by all its interfaces
+        self.state = DeviceStateShadow()
+        # Counters of transfers and notifications, only collected once enabled
+        self.metrics = None
+        self.hooks = TransferHooks()
+        self.hooks_lock = threading.Lock()
 
         self.process_response_thread = threading.Thread(target=self._pull_sdk_response, daemon=True)
         self.process_notifications_thread = threading.Thread(target=self._pull_sdk_notification, daemon=True)
@@ -45,18 +123,27 @@ class SupernovaDevice:
         self.process_response_thread.start()
         self.process_notifications_thread.start()
 
+        # The SDK and its command definitions are only loaded once a device is created
+        from BinhoSupernova.Supernova import Supernova
+
         self.driver = Supernova()
 
+        # Interface instance and class. The class is given as "module:ClassName" and its module is only
+        # imported when the interface is created for the first time.
+        # Interfaces may be requested from several threads, but only one instance of each is created
+        self.interfaces_lock = threading.Lock()
         self.interfaces = {
-            "i2c": [None, SupernovaI2CBlockingInterface],
-            "i3c.controller": [None, SupernovaI3CBlockingInterface],
-            "uart": [None, SupernovaUARTBlockingInterface],
-            "i3c.target": [None, SupernovaI3CTargetBlockingInterface],
-            "spi.controller": [None, SupernovaSPIControllerBlockingInterface],
-            "gpio": [None, SupernovaGPIOInterface],
+            "i2c": [None, ".i2c:SupernovaI2CBlockingInterface"],
+            "i3c.controller": [None, ".i3c:SupernovaI3CBlockingInterface"],
+            "uart": [None, ".uart:SupernovaUARTBlockingInterface"],
+            "i3c.target": [None, ".i3c_target:SupernovaI3CTargetBlockingInterface"],
+            "spi.controller": [None, ".spi_controller:SupernovaSPIControllerBlockingInterface"],
+            "gpio": [None, ".gpio:SupernovaGPIOInterface"],
         }
 
         self.mounted = False
+        self.usb_address = None
+        self.usb_strings = {}
 
     @property
     def driver(self):
@@ -67,7 +154,24 @@ class SupernovaDevice:
     def driver(self, newDriver):
         self.__driver = log_instance_method_calls(newDriver, os.environ.get('PYTHON_LOG_PATH') is not None)
 
-    def open(self, usb_address=None):
+    def open(self, usb_address=None, lazy=False):
+        """
+        Opens the connection with the Supernova.
+
+        Args:
+        usb_address (str, optional): USB HID path of the device to open. If None, the first Supernova found is opened.
+        lazy (bool, optional): If True, no identity information is requested while opening. The returned
+                               SupernovaDeviceInfo fetches each value on first access instead.
+
+        Returns:
+        dict: The device identity (hw_version, fw_version, serial_number, manufacturer and product_name). If lazy
+              is True, a SupernovaDeviceInfo that fetches the values on demand is returned instead.
+
+        Note:
+        - When usb_address is provided, the identity of the device is cached for the life of the process, so
+          reopening the same device does not query it again.
+        - In non-lazy mode, the identity strings missing from the cache are requested concurrently.
+        """
         if self.mounted:
             raise DeviceAlreadyMountedError
 
@@ -76,36 +180,98 @@ class SupernovaDevice:
             raise DeviceOpenError(result["message"])
 
         self.driver.onEvent(self._push_sdk_response)
+        self.state.invalidate()
 
-        try:
-            responses = self.controller.sync_submit([
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'HW_VERSION')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'FW_VERSION')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'SERIAL_NUMBER')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'MANUFACTURER')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'PRODUCT_NAME')),
+        self.usb_address = usb_address
+        with _usb_strings_cache_lock:
+            self.usb_strings = dict(_usb_strings_cache.get(usb_address, {})) if usb_address else {}
+
+        self.info = SupernovaDeviceInfo(self)
+
+        if not lazy:
+            self._get_usb_strings(SupernovaDeviceInfo.FIELDS)
+
+        self.mounted = True
+
+        return self.info if lazy else dict(self.info)
+
+    def _get_usb_strings(self, names):
+        """
+        Returns the raw USB strings of the device identity, requesting the missing ones concurrently.
+
+        Args:
+        names: Iterable of SupernovaDeviceInfo field names.
+
+        Returns:
+        dict: The raw USB string of every field known so far, keyed by field name.
+        """
+        missing = [name for name in names if name not in self.usb_strings]
+
+        if missing:
+            from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
+
+            responses = self.__submit_concurrently([
+                lambda id, sub_command=GetUsbStringSubCommand[SupernovaDeviceInfo.FIELDS[name]]: self.driver.getUsbString(id, sub_command)
+                for name in missing
             ])
+
+            for name, response in zip(missing, responses):
+                if response["name"] != "GET USB STRING" or "message" not in response:
+                    raise BackendError(f"Unable to retrieve {name}.")
+                self.usb_strings[name] = response["message"]
+
+            if self.usb_address:
+                with _usb_strings_cache_lock:
+                    _usb_strings_cache.setdefault(self.usb_address, {}).update(self.usb_strings)
+
+        return self.usb_strings
+
+    def __submit_concurrently(self, requests):
+        """
+        Submits every request as an independent transfer and waits until all of them are answered.
+
+        Returns:
+        list: The response of each request, in the order of the requests.
+        """
+        responses = [None] * len(requests)
+        errors = []
+        sequence_ids = []
+
+        # The deadline is shared by all the requests
+        remaining_time = self.controller.remaining_time()
+        deadline = None if remaining_time is None else time.monotonic() + remaining_time
+
+        try:
+            # Submitting blocks while the window of the flow control is full, until the shared deadline
+            with self.controller.deadline(remaining_time) if deadline is not None else nullcontext():
+                for index, request in enumerate(requests):
+                    def on_ready(request_responses, index=index):
+                        responses[index] = request_responses[0]
+
+                    def on_error(request_responses, error):
+                        errors.append(error)
+
+                    sequence_ids.append(self.controller.submit(request, on_ready=on_ready, on_error=on_error))
+
+            for sequence_id in sequence_ids:
+                self.controller.wait(sequence_id, None if deadline is None else max(deadline - time.monotonic(), 0))
         except Exception as e:
+            for sequence_id in sequence_ids:
+                self.controller.cancel(sequence_id)
             raise BackendError(original_exception=e) from e
 
-        def _process_device_info(responses):
-            hw_version = responses[0]['message'][3:]
-            fw_version = responses[1]['message'][3:]
-            serial_number = responses[2]['message'][3:]
-            manufacturer = responses[3]['message'][3:]
-            product_name = responses[4]['message'][3:]
-
-            return {
-                "hw_version": hw_version,
-                "fw_version": fw_version,
-                "serial_number": serial_number,
-                "manufacturer": manufacturer,
-                "product_name": product_name,
-            }
+        if errors:
+            raise BackendError(original_exception=errors[0]) from errors[0]
 
-        self.mounted = True
+        return responses
 
-        return _process_device_info(responses)
+    @staticmethod
+    def clear_identity_cache():
+        """
+        Forgets the identity of every device opened by this process.
+        """
+        with _usb_strings_cache_lock:
+            _usb_strings_cache.clear()
 
     @staticmethod
     def getAllConnectedSupernovaDevices():
@@ -132,22 +298,56 @@ class SupernovaDevice:
 
         Returns:
         str: The hardware version of the Supernova device.
+
+        Note:
+        - The device is only queried the first time; later calls return the cached value.
         """
         try:
-            response = self.controller.sync_submit([
-                lambda transfer_id: self.driver.getUsbString(transfer_id, GetUsbStringSubCommand.HW_VERSION)
-            ])
-            if response[0]["name"] == "GET USB STRING" and "message" in response[0]:
-                return response[0]["message"]
+            return self._get_usb_strings(["hw_version"])["hw_version"]
+        except BackendError:
+            raise
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        raise BackendError("Unable to retrieve hardware version.")
-
-    def on_notification(self, name, filter_func, handler_func):
-        if name not in self.notification_handlers:
+    def on_notification(self, name, filter_func, handler_func, threaded=False,
+                        max_pending=NotificationWorker.DEFAULT_MAX_PENDING):
+        """
+        Subscribes to the notifications of the device.
+
+        Args:
+        name (str): The name of the subscription. A name already subscribed is ignored.
+        filter_func (function): Called with (name, notification), returns True for the notifications to handle.
+        handler_func (function): Called with (name, notification). Every subscription whose filter matches
+                                 is called, in the order of subscription. An exception raised by the handler
+                                 is logged.
+        threaded (bool, optional): If True, the handler runs on a thread of its own, see NotificationWorker, so
+                                   that it does not delay the other subscriptions. Notifications are still
+                                   handled in order.
+        max_pending (int, optional): For a threaded subscription, the number of notifications that can wait for
+                                     the handler before the oldest ones are dropped.
+        """
+        with self.notification_lock:
+            if name in self.notification_handlers:
+                return
+            if threaded:
+                self.notification_workers[name] = NotificationWorker(
+                    name, lambda message: self.__run_notification_handler(name, handler_func, message), max_pending)
             self.notification_handlers[name] = (filter_func, handler_func)
 
+    def remove_notification(self, name):
+        with self.notification_lock:
+            self.notification_handlers.pop(name, None)
+            worker = self.notification_workers.pop(name, None)
+        if worker is not None:
+            worker.stop()
+
+    def get_notification_statistics(self):
+        """
+        Returns the statistics of the threaded subscriptions, keyed by name: the notifications waiting for the
+        handler, their peak and limit, and the number of notifications handled and dropped.
+        """
+        return {name: worker.get_statistics() for name, worker in list(self.notification_workers.items())}
+
     def _push_sdk_response(self, supernova_response, system_message):
         logger.debug("SDK RESPONSE: supernova_response == %s, system_message == %s", supernova_response, system_message)
 
@@ -186,11 +386,140 @@ class SupernovaDevice:
         if is_handled:
             return
 
+        # Responses of cancelled transfers arrive after their deadline. They are dropped and their ids released.
+        if self.controller.drop_response(supernova_response['id']):
+            logger.debug("Dropped late response of cancelled transfer %s", supernova_response['id'])
+        else:
+            logger.debug("Dropped response of unknown transfer %s", supernova_response['id'])
+
+    def deadline(self, timeout):
+        """
+        Returns a context manager that cancels the blocking transfers done inside it by the current thread once
+        timeout seconds have passed, raising TransferTimeoutError, reported as a BackendError by the interfaces.
+
+        Example:
+            with device.deadline(0.5):
+                success, data = i3c.read(0x08, i3c.TransferMode.I3C_SDR, [0x00], 2)
+        """
+        return self.controller.deadline(timeout)
+
+    def scheduling(self, priority=None, flow=None):
+        """
+        Returns a context manager that sets the priority class and the flow of the transfers done inside it by
+        the current thread. When the flow control window is full, waiting transfers are served by priority
+        class, and round robin across the flows of a class. See SupernovaTransferController.scheduling.
+
+        Transfers done by notification handlers have Priority.INTERRUPT by default.
+
+        Example:
+            with device.scheduling(Priority.BULK, flow=("spi", "flash")):
+                for address in range(0, size, 256):
+                    spi.transfer(read_command(address), 260)
+        """
+        return self.controller.scheduling(priority, flow)
+
+    def enable_metrics(self):
+        """
+        Starts counting the transfers, their errors and latency, and the notifications of the device, for the
+        exporters of the supernovacontroller.metrics package.
+
+        Returns:
+        TransferMetrics: The collector of the device.
+        """
+        if self.metrics is None:
+            from ..metrics import TransferMetrics
+
+            self.metrics = TransferMetrics()
+            self.controller.metrics = self.metrics
+        return self.metrics
+
+    def on_submit(self, callback):
+        """
+        Registers a callback called with (timestamp_ns, transfer_id, sequence_id) right before each transfer is
+        handed to the driver. See TransferHooks for the other hooks.
+        """
+        self.__add_hook("submit", callback)
+
+    def on_response(self, callback):
+        """
+        Registers a callback called with (timestamp_ns, transfer_id, command, latency_ns) when the response of
+        a transfer is received.
+        """
+        self.__add_hook("response", callback)
+
+    def on_notification_dispatched(self, callback):
+        """
+        Registers a callback called with (timestamp_ns, command, handler_name, duration_ns) after each
+        notification handler returns.
+        """
+        self.__add_hook("notification_dispatched", callback)
+
+    def on_error(self, callback):
+        """
+        Registers a callback called with (timestamp_ns, transfer_id, command, error) when a transfer could not
+        be issued or was cancelled at its deadline.
+        """
+        self.__add_hook("error", callback)
+
+    def remove_hook(self, callback):
+        """
+        Unregisters a callback from every hook.
+
+        Returns:
+        bool: True if the callback was registered.
+        """
+        with self.hooks_lock:
+            removed = self.hooks.remove(callback)
+            if not self.hooks:
+                self.controller.hooks = None
+        return removed
+
+    def __add_hook(self, event, callback):
+        with self.hooks_lock:
+            self.hooks.add(event, callback)
+            self.controller.hooks = self.hooks
+
+    def get_transfer_statistics(self):
+        """
+        Returns the number of transfer ids in flight and its peak, the number of ids handed out and of
+        wraparounds of the id space, and the number of transfers cancelled after their deadline, of late
+        responses of cancelled transfers that were dropped and of responses that matched no transfer.
+
+        With flow control, the current window, the sequences holding a slot of it, the smoothed and maximum
+        queueing delay of submissions, the smoothed and base round-trip time, the rejected submissions and the
+        number of window decreases are returned as well.
+        """
+        return self.controller.get_statistics()
+
     def _process_sdk_notification(self, supernova_response, system_message):
-        for name, (filter_func, handler_func) in self.notification_handlers.items():
+        if self.metrics is not None:
+            self.metrics.record_notification(supernova_response)
+
+        # Every matching subscription is notified, so built-in interface handlers (e.g. GPIO interrupts)
+        # do not hide notifications from handlers registered by the user
+        for name, (filter_func, handler_func) in list(self.notification_handlers.items()):
             if filter_func(name, supernova_response):
+                worker = self.notification_workers.get(name)
+                if worker is not None:
+                    worker.submit(supernova_response)
+                else:
+                    self.__run_notification_handler(name, handler_func, supernova_response)
+
+    def __run_notification_handler(self, name, handler_func, supernova_response):
+        # Same reference as the one of the controller, None while no hook is registered
+        hooks = self.controller.hooks
+        started_ns = time.perf_counter_ns() if hooks is not None else 0
+        # Transfers done by handlers, e.g. to service an IBI, jump ahead of the other waiting transfers
+        with self.controller.scheduling(Priority.INTERRUPT, flow=("notification", name), override=False):
+            # A failing handler must not stop the notification thread, nor hide the notification from the others
+            try:
                 handler_func(name, supernova_response)
-                break
+            except Exception:
+                logger.exception("Exception in the handler of the %s notifications", name)
+        if hooks is not None:
+            dispatched_ns = time.perf_counter_ns()
+            hooks.emit("notification_dispatched", dispatched_ns, supernova_response.get("name"), name,
+                       dispatched_ns - started_ns)
 
     def create_interface(self, interface_name):
         if not self.mounted:
@@ -199,18 +528,31 @@ class SupernovaDevice:
         if not interface_name in self.interfaces:
             raise UnknownInterfaceError()
 
-        [interface, interface_class] = self.interfaces[interface_name]
+        with self.interfaces_lock:
+            [interface, interface_class] = self.interfaces[interface_name]
 
-        if interface is None:
-            if interface_name == "gpio":
-                hardware_version = self.get_hardware_version()
-                self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification, hardware_version)
-            else:
-                self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification)
-            interface = self.interfaces[interface_name][0]
+            if interface is None:
+                if isinstance(interface_class, str):
+                    interface_class = self.__load_interface_class(interface_class)
+                    self.interfaces[interface_name][1] = interface_class
+                if interface_name == "gpio":
+                    hardware_version = self.get_hardware_version()
+                    self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification, hardware_version, device_state=self.state)
+                else:
+                    self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification, device_state=self.state)
+                interface = self.interfaces[interface_name][0]
 
         return interface
 
+    @staticmethod
+    def __load_interface_class(path):
+        (module_name, class_name) = path.split(":")
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, class_name)
+
     def close(self):
         self.driver.close()
         self.running = False
+        for name in list(self.notification_workers):
+            self.remove_notification(name)
+        self.state.invalidate()
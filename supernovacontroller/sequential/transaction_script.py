@@ -0,0 +1,558 @@
+import ast
+import json
+import operator
+import time
+
+from BinhoSupernova.commands.definitions import (
+    TransferMode, GpioPinNumber, GpioLogicLevel, COMMANDS_DICTIONARY, UART_CONTROLLER_SEND
+)
+from supernovacontroller.errors import BackendError, ScriptValidationError
+
+from .prepared import (i2c_read_request, i2c_write_request, i3c_read_request, i3c_write_request,
+                       spi_transfer_request)
+from .retry import RetryPolicy, retry_failures
+
+
+_BINARY_OPERATORS = {
+    ast.BitOr: operator.or_,
+    ast.BitAnd: operator.and_,
+    ast.BitXor: operator.xor,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+_UNARY_OPERATORS = {
+    ast.Invert: operator.invert,
+    ast.USub: operator.neg,
+}
+
+
+class _Expression:
+    """
+    Integer expression of a script, e.g. "pwr_mgmt0[0] | 0x0F".
+
+    Expressions support integer literals, names of constants and of previous reads, indexing and the arithmetic
+    and bitwise operators. They are parsed and checked once, when the script is validated.
+    """
+
+    def __init__(self, text, location):
+        try:
+            self.tree = ast.parse(text, mode="eval").body
+        except SyntaxError as e:
+            raise ScriptValidationError(f"{location}: invalid expression '{text}'") from e
+
+        self.text = text
+        self.names = set()
+        self.__check(self.tree, location)
+
+    def __check(self, node, location):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return
+        if isinstance(node, ast.Name):
+            self.names.add(node.id)
+            return
+        if isinstance(node, ast.Subscript):
+            self.__check(node.value, location)
+            self.__check(node.slice, location)
+            return
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            self.__check(node.left, location)
+            self.__check(node.right, location)
+            return
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            self.__check(node.operand, location)
+            return
+        raise ScriptValidationError(f"{location}: unsupported element in expression '{self.text}'")
+
+    def evaluate(self, values):
+        return self.__evaluate(self.tree, values)
+
+    def __evaluate(self, node, values):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return values[node.id]
+        if isinstance(node, ast.Subscript):
+            return self.__evaluate(node.value, values)[self.__evaluate(node.slice, values)]
+        if isinstance(node, ast.BinOp):
+            return _BINARY_OPERATORS[type(node.op)](self.__evaluate(node.left, values), self.__evaluate(node.right, values))
+        return _UNARY_OPERATORS[type(node.op)](self.__evaluate(node.operand, values))
+
+
+def _response_errors(response, manager_ok, driver_ok):
+    errors = []
+    if response["usb_error"] != "CMD_SUCCESSFUL": errors.append(response["usb_error"])
+    if response["manager_error"] != manager_ok: errors.append(response["manager_error"])
+    if response["driver_error"] != driver_ok: errors.append(response["driver_error"])
+    return errors
+
+
+def _i3c_write(device, address, register, data, mode):
+    return i3c_write_request(device.create_interface("i3c.controller"), address, register, data, mode)
+
+
+def _i3c_read(device, address, register, length, mode):
+    return i3c_read_request(device.create_interface("i3c.controller"), address, register, length, mode)
+
+
+def _i2c_write(device, address, register, data):
+    return i2c_write_request(device.create_interface("i2c"), address, register, data)
+
+
+def _i2c_read(device, address, register, length):
+    return i2c_read_request(device.create_interface("i2c"), address, register, length)
+
+
+def _spi_transfer(device, data, length):
+    return spi_transfer_request(device.create_interface("spi.controller"), data, length)
+
+
+def _uart_send(device, data):
+    uart = device.create_interface("uart")
+    expected_name = COMMANDS_DICTIONARY[UART_CONTROLLER_SEND]["name"].strip()
+
+    def request(id):
+        uart.driver.uartControllerSendMessage(id=id, data=data)
+
+    def decode(response):
+        errors = _response_errors(response, "UART_NO_ERROR", "NO_TRANSFER_ERROR")
+        if response["name"].strip() == expected_name and not errors:
+            return (True, None)
+        return (False, errors)
+
+    return (request, decode)
+
+
+def _gpio_write(device, pin, level):
+    gpio = device.create_interface("gpio")
+
+    def request(id):
+        gpio.driver.gpioDigitalWrite(id, pin, level)
+
+    def decode(response):
+        if response["name"] == "GPIO DIGITAL WRITE" and not _response_errors(response, "GPIO_NO_ERROR", "GPIO_DRIVER_NO_ERROR"):
+            return (True, None)
+        return (False, "Digital write failed, error from the Supernova")
+
+    return (request, decode)
+
+
+def _gpio_read(device, pin):
+    gpio = device.create_interface("gpio")
+
+    def request(id):
+        gpio.driver.gpioDigitalRead(id, pin)
+
+    def decode(response):
+        if response["name"] == "GPIO DIGITAL READ" and not _response_errors(response, "GPIO_NO_ERROR", "GPIO_DRIVER_NO_ERROR"):
+            return (True, response["logic_level"])
+        return (False, "Digital read failed, error from the Supernova")
+
+    return (request, decode)
+
+
+def _enum_field(enum_class):
+    def convert(value, location):
+        try:
+            return enum_class[value]
+        except (KeyError, TypeError):
+            raise ScriptValidationError(f"{location}: unknown {enum_class.__name__} '{value}'") from None
+    return convert
+
+
+# Fields of each transfer step: name, kind ("int", "list" of ints or an enum converter) and default value.
+# Fields without a default are required. The builder receives the field values in the same order.
+_TRANSFER_STEPS = {
+    "i3c.write": (_i3c_write, [("address", "int", None), ("register", "list", []), ("data", "list", None),
+                               ("mode", _enum_field(TransferMode), "I3C_SDR")]),
+    "i3c.read": (_i3c_read, [("address", "int", None), ("register", "list", []), ("length", "int", None),
+                             ("mode", _enum_field(TransferMode), "I3C_SDR")]),
+    "i2c.write": (_i2c_write, [("address", "int", None), ("register", "list", []), ("data", "list", None)]),
+    "i2c.read": (_i2c_read, [("address", "int", None), ("register", "list", []), ("length", "int", None)]),
+    "spi.transfer": (_spi_transfer, [("data", "list", None), ("length", "int", None)]),
+    "uart.send": (_uart_send, [("data", "list", None)]),
+    "gpio.write": (_gpio_write, [("pin", _enum_field(GpioPinNumber), None), ("level", _enum_field(GpioLogicLevel), None)]),
+    "gpio.read": (_gpio_read, [("pin", _enum_field(GpioPinNumber), None)]),
+}
+
+
+class _Step:
+    def __init__(self, index, op, result_id, fields, names):
+        self.index = index
+        self.op = op
+        self.id = result_id
+        # Field values in builder order. Expressions are _Expression instances, lists are lists of them.
+        self.fields = fields
+        # Names of constants and previous results the step refers to
+        self.names = names
+
+
+class TransactionScript:
+    """
+    Declarative sequence of bus transactions.
+
+    A script is a dictionary (usually loaded from a JSON or YAML file) with optional "constants" and a list
+    of "steps". Each step has an "op" and its fields:
+
+    - i3c.write: address, register (optional), data, mode (optional, TransferMode name, I3C_SDR by default)
+    - i3c.read: address, register (optional), length, mode (optional)
+    - i2c.write: address, register (optional), data
+    - i2c.read: address, register (optional), length
+    - spi.transfer: data, length
+    - uart.send: data
+    - gpio.write: pin (GpioPinNumber name), level (GpioLogicLevel name)
+    - gpio.read: pin
+    - wait: ms
+    - call: interface, method, args (optional). Calls a method of an interface, e.g. init_bus.
+
+    Integer fields accept a number or an expression such as "pwr_mgmt0[0] | 0x0F", where names refer to
+    constants or to the "id" given to a previous step, which holds the data that step read. This is how
+    read-modify-write sequences are written.
+
+    The script is validated once, when it is created. When it runs, consecutive transfers that do not use the
+    result of one another are submitted together as a single sequence, and the script only waits for the
+    device when a step needs the result of a pending read, before a wait or call step, and at the end.
+
+    Example:
+        script = TransactionScript.load("icm42605_bringup.json")
+        (success, report) = script.run(device)
+    """
+
+    def __init__(self, script: dict):
+        """
+        Args:
+        script (dict): The script, with optional "constants" and a list of "steps".
+
+        Raises:
+        ScriptValidationError: If the script is not valid.
+        """
+        if not isinstance(script, dict) or not isinstance(script.get("steps"), list):
+            raise ScriptValidationError("A script must be a dictionary with a list of steps")
+
+        self.constants = dict(script.get("constants", {}))
+        for name, value in self.constants.items():
+            if not isinstance(name, str) or not name.isidentifier():
+                raise ScriptValidationError(f"Invalid constant name '{name}'")
+            if not isinstance(value, int) and not (isinstance(value, list) and all(isinstance(item, int) for item in value)):
+                raise ScriptValidationError(f"Constant '{name}' must be an integer or a list of integers")
+
+        self.steps = []
+        defined = set(self.constants)
+        for index, step in enumerate(script["steps"]):
+            compiled = self.__compile_step(index, step, defined)
+            if compiled.id is not None:
+                defined.add(compiled.id)
+            self.steps.append(compiled)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a script from a JSON file, or from a YAML file if the path ends in .yaml or .yml.
+
+        Note:
+        - YAML files require PyYAML to be installed.
+        """
+        with open(path) as file:
+            text = file.read()
+        return cls.from_string(text, "yaml" if path.endswith((".yaml", ".yml")) else "json")
+
+    @classmethod
+    def from_string(cls, text, format="json"):
+        if format == "yaml":
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Loading YAML scripts requires PyYAML (pip install pyyaml)") from e
+            return cls(yaml.safe_load(text))
+        return cls(json.loads(text))
+
+    @staticmethod
+    def __compile_step(index, step, defined):
+        location = f"Step {index}"
+        if not isinstance(step, dict) or "op" not in step:
+            raise ScriptValidationError(f"{location}: a step must be a dictionary with an 'op'")
+
+        op = step["op"]
+        location = f"Step {index} ({op})"
+        result_id = step.get("id")
+        if result_id is not None:
+            if not isinstance(result_id, str) or not result_id.isidentifier():
+                raise ScriptValidationError(f"{location}: invalid id '{result_id}'")
+            if result_id in defined:
+                raise ScriptValidationError(f"{location}: id '{result_id}' is already defined")
+
+        names = set()
+
+        def expression(value, field):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                parsed = _Expression(value, f"{location}, field '{field}'")
+                undefined = parsed.names - defined
+                if undefined:
+                    raise ScriptValidationError(f"{location}, field '{field}': undefined name '{sorted(undefined)[0]}'")
+                names.update(parsed.names)
+                return parsed
+            raise ScriptValidationError(f"{location}, field '{field}': expected an integer or an expression")
+
+        if op == "wait":
+            if not isinstance(step.get("ms"), (int, float)) or step["ms"] < 0:
+                raise ScriptValidationError(f"{location}: 'ms' must be a non-negative number")
+            return _Step(index, op, None, [step["ms"]], names)
+
+        if op == "call":
+            if not isinstance(step.get("interface"), str) or not isinstance(step.get("method"), str) \
+                    or step["method"].startswith("_"):
+                raise ScriptValidationError(f"{location}: 'interface' and a public 'method' are required")
+            return _Step(index, op, result_id, [step["interface"], step["method"], list(step.get("args", []))], names)
+
+        if op not in _TRANSFER_STEPS:
+            raise ScriptValidationError(f"{location}: unknown op")
+
+        (_, field_specs) = _TRANSFER_STEPS[op]
+        known_fields = {"op", "id"} | {name for (name, _, _) in field_specs}
+        unknown_fields = set(step) - known_fields
+        if unknown_fields:
+            raise ScriptValidationError(f"{location}: unknown field '{sorted(unknown_fields)[0]}'")
+
+        fields = []
+        for (name, kind, default) in field_specs:
+            value = step.get(name, default)
+            if value is None:
+                raise ScriptValidationError(f"{location}: field '{name}' is required")
+            if kind == "int":
+                fields.append(expression(value, name))
+            elif kind == "list":
+                if isinstance(value, str):
+                    # A whole list taken from a constant or a previous read
+                    fields.append(expression(value, name))
+                elif isinstance(value, list):
+                    fields.append([expression(item, name) for item in value])
+                else:
+                    raise ScriptValidationError(f"{location}, field '{name}': expected a list")
+            else:
+                fields.append(kind(value, f"{location}, field '{name}'"))
+
+        return _Step(index, op, result_id, fields, names)
+
+    def run(self, device, constants: dict = None, retry_policy: RetryPolicy = None, timeout: float = None):
+        """
+        Runs the script on a device.
+
+        Args:
+        device (SupernovaDevice): The opened device. Interfaces are created as needed.
+        constants (dict, optional): New values for constants of the script, e.g. a target address found at
+                                    run time.
+        retry_policy (RetryPolicy, optional): The policy used to repeat the transfers of a batch that fail with
+                                              a transient error. Only the failed transfers are submitted again.
+        timeout (float, optional): The time in seconds the whole script may take. When it expires, the pending
+                                   batch is cancelled and a BackendError is raised.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating whether every step succeeded. The script stops at the
+              first batch with a failed step.
+            - The second element is a report dictionary with:
+                - "results": the data of every step with an id, keyed by id.
+                - "steps": one dictionary per executed step with its index, op, id, success, result,
+                  start_ns (relative to the start of the script), duration_ns and retries.
+                - "batches": the number of submissions sent to the device, including retries.
+                - "retries": the total number of transfers submitted again.
+                - "elapsed_ns": the duration of the whole script.
+        """
+        values = dict(self.constants)
+        for name, value in (constants or {}).items():
+            if name not in values:
+                raise ScriptValidationError(f"Unknown constant '{name}'")
+            values[name] = value
+
+        run = _ScriptRun(self, device, values, retry_policy)
+        if timeout is None:
+            return run.execute()
+
+        with device.controller.deadline(timeout):
+            return run.execute()
+
+
+class _ScriptRun:
+    def __init__(self, script: TransactionScript, device, values, retry_policy=None):
+        self.script = script
+        self.device = device
+        self.values = values
+        self.retry_policy = retry_policy
+        self.results = {}
+        self.steps = []
+        self.batches = 0
+        self.retries = 0
+        self.start_ns = None
+        # Steps submitted together, and the ids they will produce
+        self.pending = []
+        self.pending_ids = set()
+
+    def execute(self):
+        self.start_ns = time.perf_counter_ns()
+        success = True
+
+        for step in self.script.steps:
+            if step.op in ("wait", "call") or step.names & self.pending_ids:
+                success = self.flush()
+                if not success:
+                    break
+
+            if step.op == "wait":
+                started_ns = time.perf_counter_ns()
+                time.sleep(step.fields[0] / 1000)
+                self.record(step, True, None, started_ns, time.perf_counter_ns())
+            elif step.op == "call":
+                success = self.call(step)
+                if not success:
+                    break
+            else:
+                (builder, _) = _TRANSFER_STEPS[step.op]
+                arguments = [self.evaluate(field) for field in step.fields]
+                (request, decode) = builder(self.device, *arguments)
+                self.pending.append((step, request, decode))
+                if step.id is not None:
+                    self.pending_ids.add(step.id)
+
+        if success:
+            success = self.flush()
+
+        return (success, {
+            "results": self.results,
+            "steps": self.steps,
+            "batches": self.batches,
+            "retries": self.retries,
+            "elapsed_ns": time.perf_counter_ns() - self.start_ns,
+        })
+
+    def evaluate(self, field):
+        if isinstance(field, _Expression):
+            return field.evaluate(self.values)
+        if isinstance(field, list):
+            return [self.evaluate(item) for item in field]
+        return field
+
+    def call(self, step):
+        (interface_name, method_name, args) = step.fields
+        started_ns = time.perf_counter_ns()
+        interface = self.device.create_interface(interface_name)
+        method = getattr(interface, method_name, None)
+        if not callable(method):
+            raise BackendError(f"Unknown method {interface_name}.{method_name}")
+
+        result = method(*args)
+        (success, data) = result if isinstance(result, tuple) and len(result) == 2 else (True, result)
+        self.record(step, success, data, started_ns, time.perf_counter_ns())
+        self.batches += 1
+        return success
+
+    def flush(self):
+        """
+        Submits the pending transfers as one sequence and waits for all of them.
+
+        Returns:
+        bool: True if every transfer succeeded.
+        """
+        if not self.pending:
+            return True
+
+        pending = self.pending
+        self.pending = []
+        self.pending_ids = set()
+
+        issued_ns = [None] * len(pending)
+        outcome = {}
+
+        def timed(index, request):
+            def issue(id):
+                issued_ns[index] = time.perf_counter_ns()
+                request(id)
+            return issue
+
+        def on_ready(responses):
+            outcome["responses"] = responses
+            outcome["finished_ns"] = time.perf_counter_ns()
+
+        def on_error(responses, error):
+            outcome["responses"] = responses
+            outcome["error"] = error
+            outcome["finished_ns"] = time.perf_counter_ns()
+
+        sequence_id = self.device.controller.submit(
+            sequence=[timed(index, request) for index, (_, request, _) in enumerate(pending)],
+            on_ready=on_ready,
+            on_error=on_error,
+        )
+        self.batches += 1
+        try:
+            self.device.controller.wait(sequence_id)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        responses = outcome["responses"]
+        retries = [0] * len(pending)
+        if self.retry_policy is not None and "error" not in outcome:
+            responses = list(responses)
+            retries = self.retry(pending, responses)
+            retried_ns = time.perf_counter_ns()
+
+        success = True
+        for index, (step, _, decode) in enumerate(pending):
+            if index >= len(responses):
+                break
+            (step_success, data) = decode(responses[index])
+            # A transfer is issued as soon as the response of the previous one arrives
+            finished_ns = issued_ns[index + 1] if index + 1 < len(pending) and issued_ns[index + 1] is not None \
+                else outcome["finished_ns"]
+            if retries[index]:
+                finished_ns = retried_ns
+            self.record(step, step_success, data, issued_ns[index], finished_ns, retries[index])
+            success = success and step_success
+
+        if "error" in outcome:
+            raise BackendError(original_exception=outcome["error"]) from outcome["error"]
+
+        return success
+
+    def retry(self, pending, responses):
+        """
+        Submits again the transfers of a batch that failed with a retryable error, see retry_failures.
+
+        Returns:
+        list: The number of retries of every transfer.
+        """
+        def classify(index, response):
+            (step_success, data) = pending[index][2](response)
+            return None if step_success else data
+
+        try:
+            retries = retry_failures(self.device.controller.sync_submit, [request for (_, request, _) in pending],
+                                     responses, classify, self.retry_policy)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        # Every round of retries is one more submission
+        self.batches += max(retries, default=0)
+        self.retries += sum(retries)
+        return retries
+
+    def record(self, step, success, data, started_ns, finished_ns, retries=0):
+        if step.id is not None:
+            self.results[step.id] = data
+            self.values[step.id] = data
+        self.steps.append({
+            "index": step.index,
+            "op": step.op,
+            "id": step.id,
+            "success": success,
+            "result": data,
+            "start_ns": started_ns - self.start_ns,
+            "duration_ns": finished_ns - started_ns,
+            "retries": retries,
+        })
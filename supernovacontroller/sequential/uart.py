@@ -7,7 +7,9 @@ from BinhoSupernova.commands.definitions import (
     UART_CONTROLLER_INIT, UART_CONTROLLER_SET_PARAMETERS, UART_CONTROLLER_SEND
 )
 from supernovacontroller.errors import BackendError
-from threading import Event
+from threading import Event, RLock
+from .device_state import DeviceStateShadow
+from .locking import thread_safe
 
 class UARTNotificationHandler:
 
@@ -78,9 +80,15 @@ class UARTNotificationHandler:
         self.last_notification_message = message
         self.last_notification.set()
         
+@thread_safe
 class SupernovaUARTBlockingInterface:
+    INITIALIZED = "uart.initialized"
+    PARAMETERS = "uart.parameters"
+    # Waiting for notifications does not block the other users of the interface
+    UNLOCKED_METHODS = ("wait_for_notification",)
+
     # Private Methods
-    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
+    def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, device_state: DeviceStateShadow = None):
         """
         Initializes a new instance of the SupernovaUARTBlockingInterface class. This interface is used for blocking UART communication with the Supernova.
         By default the UART peripheral is configured with the following parameters:
@@ -93,6 +101,8 @@ class SupernovaUARTBlockingInterface:
 
         # Supernova driver instance
         self.driver = driver
+        # Held by every public method, see thread_safe
+        self.lock = RLock()
         # Transfer controller instance
         self.controller = controller
         # UART communication parameters
@@ -101,7 +111,8 @@ class SupernovaUARTBlockingInterface:
         self.data_size = UartControllerDataSize.UART_8BIT_BYTE
         self.stop_bit = UartControllerStopBit.UART_ONE_STOP_BIT
         self.hardware_handshake = False
-        self.bus_voltage = None
+        # Configuration shared with the other interfaces of the device
+        self.device_state = device_state if device_state is not None else DeviceStateShadow()
         # UART receive notification handler
         self.uart_notification = UARTNotificationHandler(notification_subscription)
 
@@ -178,6 +189,21 @@ class SupernovaUARTBlockingInterface:
         if response["driver_error"] != "NO_TRANSFER_ERROR": result.append(response["driver_error"])
         return result
     
+    @property
+    def bus_voltage(self):
+        # I2C, SPI and UART share the same bus voltage rail
+        return self.device_state.get(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE)
+
+    @bus_voltage.setter
+    def bus_voltage(self, voltage_mv):
+        self.device_state.set(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv)
+
+    def __current_parameters(self):
+        """
+        Returns the UART communication parameters of the instance as the tuple recorded in the device state shadow.
+        """
+        return (self.baudrate, self.hardware_handshake, self.parity, self.data_size, self.stop_bit)
+
     def set_bus_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the UART interface to a specified value.
@@ -199,33 +225,40 @@ class SupernovaUARTBlockingInterface:
           method should ensure that the provided voltage value is within acceptable limits
           for their specific hardware configuration.
         - The bus voltage is updated in the interface instance only if the operation is successful.
+        - The bus voltage is shared with the other I2C, SPI and UART interfaces. No command is sent if
+          the voltage is already applied to the device.
 
         Raises:
         BackendError: If an exception occurs setting the bus voltage process.
         """
-
-        # Set the UART bus voltage accordingly
-        responses = None
-        try:
-            responses = self.controller.sync_submit([
-                lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
-            ])
-        except Exception as e:
-            raise BackendError(original_exception=e) from e
+        # The rail is shared with the other interfaces, which may set it from other threads
+        with self.device_state.key_lock(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE):
+
+            if self.device_state.matches(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE, voltage_mv):
+                return (True, voltage_mv)
+
+            # Set the UART bus voltage accordingly
+            responses = None
+            try:
+                responses = self.controller.sync_submit([
+                    lambda transfer_id: self.driver.setI2cSpiUartBusVoltage(transfer_id, voltage_mv),
+                ])
+            except Exception as e:
+                raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
-
-        # If successful, update the bus voltage
-        if response_success:
-            result = (True, voltage_mv)
-            self.bus_voltage = voltage_mv
-        # If not successful update method response
-        else:
-            result = (False, responses[0]["result"])
-            self.bus_voltage = None
-
-        return result
+            # Check if the response is of the expected type (by name) and it was successful 
+            response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+
+            # If successful, update the bus voltage
+            if response_success:
+                result = (True, voltage_mv)
+                self.bus_voltage = voltage_mv
+            # If not successful update method response
+            else:
+                result = (False, responses[0]["result"])
+                self.bus_voltage = None
+
+            return result
     
     def init_bus(self, baudrate: UartControllerBaudRate=None, hardware_handshake: bool=None , parity: UartControllerParity=None, data_size: UartControllerDataSize=None, stop_bit: UartControllerStopBit=None):
         """
@@ -253,6 +286,7 @@ class SupernovaUARTBlockingInterface:
         Note:
         - The method does not perform validation on any of the UART communication parameters. Users of this
           method should ensure that the provided configuration is valid.
+        - No command is sent if the same parameters are already applied to the device.
         """
 
         # Update the UART class attributes with the provided data
@@ -262,6 +296,10 @@ class SupernovaUARTBlockingInterface:
         # Return failure if data is incomplete
         if not is_data_complete: 
             return (False, "Init failed, incomplete parameters to initialize bus")
+
+        # Skip the request if the bus is already initialized with the same parameters
+        if self.device_state.get(self.INITIALIZED) and self.device_state.matches(self.PARAMETERS, self.__current_parameters()):
+            return (True, "Success")
         
         # Request UART bus initialization 
         responses = None
@@ -275,6 +313,9 @@ class SupernovaUARTBlockingInterface:
         # Check if the response is of the expected type (by name) and it was successful 
         response_success = responses[0]["name"].strip() == COMMANDS_DICTIONARY[UART_CONTROLLER_INIT]["name"].strip() and self.__check_if_response_is_correct(responses[0])
 
+        self.device_state.set(self.INITIALIZED, response_success or None)
+        self.device_state.set(self.PARAMETERS, self.__current_parameters() if response_success else None)
+
         return (response_success, "Success" if response_success else self.__get_response_errors(responses[0]))
 
     def set_parameters(self, baudrate: UartControllerBaudRate=None, hardware_handshake: bool=None , parity: UartControllerParity=None, data_size: UartControllerDataSize=None, stop_bit: UartControllerStopBit=None):
@@ -303,6 +344,7 @@ class SupernovaUARTBlockingInterface:
         Note:
         - The method does not perform validation on any of the UART communication parameters. Users of this
           method should ensure that the provided configuration is valid.
+        - No command is sent if the same parameters are already applied to the device.
         """
 
         # Update the UART class attributes with the provided data
@@ -313,6 +355,10 @@ class SupernovaUARTBlockingInterface:
         if not is_data_complete: 
             return (False, "Set parameters failed, incomplete parameters to do set parameters")
 
+        # Skip the request if the same parameters are already applied
+        if self.device_state.matches(self.PARAMETERS, self.__current_parameters()):
+            return (True, "Success")
+
         responses = None
         # Request UART set parameters 
         try:
@@ -325,6 +371,8 @@ class SupernovaUARTBlockingInterface:
         # Check if the response is of the expected type (by name) and it was successful 
         response_success = responses[0]["name"].strip() == COMMANDS_DICTIONARY[UART_CONTROLLER_SET_PARAMETERS]["name"].strip() and self.__check_if_response_is_correct(responses[0])
 
+        self.device_state.set(self.PARAMETERS, self.__current_parameters() if response_success else None)
+
         return (response_success, "Success" if response_success else self.__get_response_errors(responses[0]))
 
     def get_parameters(self):
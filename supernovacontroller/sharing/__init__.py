@@ -0,0 +1,4 @@
+from .client import RemoteInterface, SupernovaDaemonBatch, SupernovaDaemonClient
+from .daemon import SupernovaDaemon
+
+__all__ = ['SupernovaDaemon', 'SupernovaDaemonClient', 'SupernovaDaemonBatch', 'RemoteInterface']
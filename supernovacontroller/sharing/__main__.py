@@ -0,0 +1,31 @@
+import argparse
+
+from supernovacontroller.sequential import SupernovaDevice
+
+from .daemon import SupernovaDaemon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shares the connected Supernova devices over a Unix domain socket.")
+    parser.add_argument("--socket", default="/tmp/supernova.sock", help="Path of the Unix domain socket")
+    parser.add_argument("--workers", type=int, default=SupernovaDaemon.DEFAULT_MAX_WORKERS,
+                        help="Number of threads executing calls")
+    arguments = parser.parse_args()
+
+    devices = SupernovaDevice.openAllConnectedSupernovaDevices()
+    if not devices:
+        parser.exit(1, "No Supernova device found\n")
+
+    daemon = SupernovaDaemon(arguments.socket, devices, max_workers=arguments.workers)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        for device in devices:
+            device.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import itertools
+import socket
+import threading
+
+from supernovacontroller.errors import BackendError
+
+from ..utils.logging import logging
+from . import protocol
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class _PendingRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SupernovaDaemonClient:
+    """
+    Connection to a SupernovaDaemon.
+
+    Calls can be issued from several threads at once; each one waits only for its own response.
+
+    Example:
+        client = SupernovaDaemonClient("/tmp/supernova.sock")
+        i3c = client.create_interface("i3c.controller")
+        success, targets = i3c.targets()
+
+        with client.batch() as batch:
+            for register in range(0x10, 0x20):
+                batch.call("i2c", "read_from", 0x50, [register], 1)
+        results = batch.results
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        """
+        Args:
+        socket_path (str): Path of the Unix domain socket the daemon listens on.
+        timeout: The duration in seconds to wait for each response. None waits forever.
+
+        Raises:
+        BackendError: If the daemon can not be reached.
+        """
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(socket_path)
+        except OSError as e:
+            self.sock.close()
+            raise BackendError("Unable to connect to the Supernova daemon", original_exception=e) from e
+
+        self.write_lock = threading.Lock()
+        self.pending_lock = threading.Lock()
+        self.pending = {}
+        self.request_ids = itertools.count(1)
+        self.notification_handlers = {}
+        # Set by close() or when the connection is lost, after which requests fail right away
+        self.closed = False
+
+        self.reader = threading.Thread(target=self._read_frames, daemon=True)
+        self.reader.start()
+
+    def _request(self, frame_type, value=None, on_sent=None):
+        request = _PendingRequest()
+        with self.pending_lock:
+            if self.closed:
+                raise BackendError("Connection with the Supernova daemon lost")
+            request_id = next(self.request_ids) & 0xFFFFFFFF
+            self.pending[request_id] = request
+        if on_sent is not None:
+            on_sent(request_id)
+
+        frame = protocol.encode_frame(frame_type, request_id, value)
+        try:
+            with self.write_lock:
+                self.sock.sendall(frame)
+        except OSError as e:
+            with self.pending_lock:
+                self.pending.pop(request_id, None)
+            raise BackendError("Connection with the Supernova daemon lost", original_exception=e) from e
+
+        if not request.done.wait(self.timeout):
+            with self.pending_lock:
+                self.pending.pop(request_id, None)
+            raise BackendError("Timeout occurred while waiting for the Supernova daemon")
+
+        if request.result is None:
+            raise BackendError("Connection with the Supernova daemon lost")
+
+        return request.result
+
+    def _read_frames(self):
+        try:
+            while True:
+                frame = protocol.receive_frame(self.sock)
+                if frame is None:
+                    break
+                (frame_type, request_id, payload) = frame
+
+                if frame_type == protocol.NOTIFICATION:
+                    handler = self.notification_handlers.get(request_id)
+                    if handler is not None:
+                        (device_index, message) = payload
+                        try:
+                            handler(device_index, message)
+                        except Exception:
+                            logger.exception("Exception in a Supernova daemon notification handler")
+                    continue
+
+                with self.pending_lock:
+                    request = self.pending.pop(request_id, None)
+                if request is not None:
+                    request.result = payload
+                    request.done.set()
+        except (OSError, protocol.ProtocolError):
+            pass
+        finally:
+            # Wake up every caller still waiting for a response, later requests fail right away
+            with self.pending_lock:
+                self.closed = True
+                pending = list(self.pending.values())
+                self.pending.clear()
+            for request in pending:
+                request.done.set()
+
+    def call(self, interface_name, method_name, *args, device=0, **kwargs):
+        """
+        Calls a method of an interface of a shared device.
+
+        Args:
+        interface_name (str): Name of the interface, as passed to SupernovaDevice.create_interface.
+        method_name (str): Name of the method.
+        device (int, optional): Index of the device in the daemon.
+
+        Returns:
+        The value returned by the method, usually a (success, result) tuple.
+
+        Raises:
+        BackendError: If the daemon could not call the method.
+        """
+        (success, result) = self._request(protocol.CALL, (device, interface_name, method_name, list(args), kwargs))
+        if not success:
+            raise BackendError(result)
+        return result
+
+    def create_interface(self, interface_name, device=0):
+        """
+        Returns a proxy whose methods call the methods of an interface of a shared device.
+        """
+        return RemoteInterface(self, interface_name, device)
+
+    def batch(self, device=0):
+        """
+        Returns a batch of calls to send with a single request. See SupernovaDaemonBatch.
+        """
+        return SupernovaDaemonBatch(self, device)
+
+    def devices(self):
+        """
+        Returns the identity of every device shared by the daemon.
+        """
+        return self._request(protocol.DEVICES)[1]
+
+    def on_notification(self, handler_func, name=None):
+        """
+        Subscribes to the notifications of the shared devices.
+
+        Args:
+        handler_func: Function called with the device index and the notification. It runs on the thread that
+                      reads responses, so it should return quickly.
+        name (str, optional): Only notifications with this name (e.g. "I3C IBI NOTIFICATION") are received.
+                              If None, every notification is received.
+
+        Returns:
+        int: Identifier of the subscription, used to unsubscribe.
+        """
+        def register(request_id):
+            self.notification_handlers[request_id] = handler_func
+
+        return self._request(protocol.SUBSCRIBE, name, on_sent=register)[1]
+
+    def remove_notification(self, subscription_id):
+        self._request(protocol.UNSUBSCRIBE, subscription_id)
+        self.notification_handlers.pop(subscription_id, None)
+
+    def close(self):
+        with self.pending_lock:
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        # A notification handler may close the client
+        if self.reader is not threading.current_thread():
+            self.reader.join()
+
+
+class RemoteInterface:
+    """
+    Proxy of an interface of a device shared by a SupernovaDaemon. Every public method of the interface is
+    available with the same arguments and return value.
+    """
+
+    def __init__(self, client: SupernovaDaemonClient, interface_name, device=0):
+        self._client = client
+        self._interface_name = interface_name
+        self._device = device
+
+    def __getattr__(self, method_name):
+        if method_name.startswith("_"):
+            raise AttributeError(method_name)
+
+        def remote_method(*args, **kwargs):
+            return self._client.call(self._interface_name, method_name, *args, device=self._device, **kwargs)
+
+        remote_method.__name__ = method_name
+        return remote_method
+
+
+class SupernovaDaemonBatch:
+    """
+    Calls sent to the daemon with a single request and executed in order.
+
+    The batch is sent when the with block exits, or when send() is called. Afterwards, results holds one
+    (success, value) tuple per call, where value is the value returned by the method, or the error that
+    prevented the call.
+    """
+
+    def __init__(self, client: SupernovaDaemonClient, device=0):
+        self.client = client
+        self.device = device
+        self.calls = []
+        self.results = None
+
+    def call(self, interface_name, method_name, *args, device=None, **kwargs):
+        """
+        Adds a call to the batch.
+
+        Returns:
+        int: Index of the call's result in results.
+        """
+        device = self.device if device is None else device
+        self.calls.append((device, interface_name, method_name, list(args), kwargs))
+        return len(self.calls) - 1
+
+    def send(self):
+        self.results = self.client._request(protocol.BATCH, self.calls)[1] if self.calls else []
+        self.calls = []
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
@@ -0,0 +1,338 @@
+import errno
+import os
+import queue
+import socket
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.logging import logging
+from . import protocol
+
+logger = logging.getLogger("supernovacontroller")
+
+
+class _ClientConnection:
+    """
+    Connection of one client to the daemon.
+
+    Frames for the client are queued and written by a dedicated thread, which sends every frame waiting in the
+    queue with a single socket write. Notifications are dropped, and counted, when the client does not keep up.
+    """
+
+    def __init__(self, daemon, sock, max_pending_notifications):
+        self.daemon = daemon
+        self.sock = sock
+        self.outgoing = queue.Queue()
+        self.max_pending_notifications = max_pending_notifications
+        self.pending_notifications = 0
+        self.dropped_notifications = 0
+        self.lock = threading.Lock()
+        # Request id of each subscription and its notification name (None for every notification)
+        self.subscriptions = {}
+        self.closed = False
+
+        self.reader = threading.Thread(target=self._read_requests, daemon=True)
+        self.writer = threading.Thread(target=self._write_frames, daemon=True)
+
+    def start(self):
+        self.reader.start()
+        self.writer.start()
+
+    def send(self, frame_type, request_id, value):
+        if not self.closed:
+            self.outgoing.put(protocol.encode_frame(frame_type, request_id, value))
+
+    def notify(self, device_index, message):
+        name = message.get("name", "").strip() if isinstance(message, dict) else None
+
+        for subscription_id, subscription_name in list(self.subscriptions.items()):
+            if subscription_name is not None and subscription_name != name:
+                continue
+
+            with self.lock:
+                if self.pending_notifications >= self.max_pending_notifications:
+                    self.dropped_notifications += 1
+                    continue
+                self.pending_notifications += 1
+
+            self.outgoing.put((protocol.encode_frame(protocol.NOTIFICATION, subscription_id, (device_index, message)),))
+
+    def _write_frames(self):
+        while True:
+            frame = self.outgoing.get()
+            if frame is None:
+                return
+
+            frames = [frame]
+            while True:
+                try:
+                    frames.append(self.outgoing.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks = []
+            stop = False
+            for frame in frames:
+                if frame is None:
+                    stop = True
+                    break
+                if isinstance(frame, tuple):
+                    # Notification frames are wrapped to release their slot once written
+                    with self.lock:
+                        self.pending_notifications -= 1
+                    frame = frame[0]
+                chunks.append(frame)
+
+            try:
+                self.sock.sendall(b"".join(chunks))
+            except OSError:
+                self.close()
+                return
+
+            if stop:
+                return
+
+    def _read_requests(self):
+        try:
+            while True:
+                frame = protocol.receive_frame(self.sock)
+                if frame is None:
+                    break
+                self._handle_frame(*frame)
+        except (OSError, protocol.ProtocolError) as e:
+            logger.debug("Daemon client disconnected: %s", e)
+        finally:
+            self.close()
+
+    def _handle_frame(self, frame_type, request_id, payload):
+        if frame_type == protocol.CALL:
+            self.daemon.executor.submit(self._run_call, request_id, payload)
+        elif frame_type == protocol.BATCH:
+            self.daemon.executor.submit(self._run_batch, request_id, payload)
+        elif frame_type == protocol.SUBSCRIBE:
+            self.subscriptions[request_id] = payload
+            self.send(protocol.RESPONSE, request_id, (True, request_id))
+        elif frame_type == protocol.UNSUBSCRIBE:
+            self.subscriptions.pop(payload, None)
+            self.send(protocol.RESPONSE, request_id, (True, payload))
+        elif frame_type == protocol.DEVICES:
+            self.send(protocol.RESPONSE, request_id, (True, self.daemon.describe_devices()))
+        else:
+            self.send(protocol.RESPONSE, request_id, (False, f"Unknown frame type {frame_type}"))
+
+    def _run_call(self, request_id, call):
+        self.send(protocol.RESPONSE, request_id, self.daemon.execute(call))
+
+    def _run_batch(self, request_id, calls):
+        self.send(protocol.RESPONSE, request_id, (True, [self.daemon.execute(call) for call in calls]))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.outgoing.put(None)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.daemon._remove_client(self)
+
+
+class SupernovaDaemon:
+    """
+    Shares Supernova devices with several processes.
+
+    The daemon owns already-opened SupernovaDevice instances and exposes the methods of their interfaces over a
+    Unix domain socket, so many clients use the same adapters concurrently without paying for open() each time.
+    Each connection can keep several requests in flight, send batches of calls that are executed in order with a
+    single round trip, and subscribe to the notifications of the devices.
+
+    Example:
+        devices = SupernovaDevice.openAllConnectedSupernovaDevices()
+        daemon = SupernovaDaemon("/tmp/supernova.sock", devices)
+        daemon.serve_forever()
+
+    Note:
+    - Calls are executed by a pool of worker threads. Calls sent on different connections, or on the same
+      connection without waiting for the previous response, may run concurrently.
+    - Only public methods of the interfaces can be called.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_MAX_PENDING_NOTIFICATIONS = 1024
+
+    def __init__(self, socket_path, devices: list, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_pending_notifications: int = DEFAULT_MAX_PENDING_NOTIFICATIONS):
+        """
+        Args:
+        socket_path (str): Path of the Unix domain socket to listen on. A stale socket, left by a daemon that is
+                           no longer running, is replaced.
+        devices (list): Opened SupernovaDevice instances. Clients address them by their index in the list.
+        max_workers (int, optional): Number of threads executing calls.
+        max_pending_notifications (int, optional): Notifications queued per client before new ones are dropped.
+        """
+        self.socket_path = socket_path
+        self.devices = list(devices)
+        self.max_pending_notifications = max_pending_notifications
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supernova-daemon")
+        self.clients = []
+        self.clients_lock = threading.Lock()
+        self.running = False
+        self.server = None
+        self.thread = None
+
+        for index, device in enumerate(self.devices):
+            device.on_notification(
+                name=f"Supernova daemon ({id(self):x})",
+                filter_func=lambda name, message: True,
+                handler_func=lambda name, message, index=index: self._fan_out(index, message),
+            )
+
+    def start(self):
+        """
+        Starts listening in a background thread. The socket is only accessible to the user running the daemon.
+
+        Raises:
+        FileExistsError: If socket_path exists and is not a socket.
+        OSError: If another daemon is listening on socket_path.
+        """
+        self._remove_stale_socket()
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The socket is created with mode 0600, so other users can not connect before it is secured
+        umask = os.umask(0o177)
+        try:
+            self.server.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        self.server.listen()
+        self.running = True
+
+        self.thread = threading.Thread(target=self._accept_clients, daemon=True)
+        self.thread.start()
+
+    def _remove_stale_socket(self):
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(errno.EEXIST, "Not a socket", self.socket_path)
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            # Nobody is listening, the socket was left behind by a daemon that did not close
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, "Another daemon is listening", self.socket_path)
+
+    def serve_forever(self):
+        """
+        Starts the daemon and blocks until close() is called.
+        """
+        self.start()
+        self.thread.join()
+
+    def _accept_clients(self):
+        while self.running:
+            try:
+                (sock, _) = self.server.accept()
+            except OSError:
+                break
+
+            client = _ClientConnection(self, sock, self.max_pending_notifications)
+            with self.clients_lock:
+                self.clients.append(client)
+            client.start()
+
+    def _remove_client(self, client):
+        with self.clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def _fan_out(self, device_index, message):
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            if client.subscriptions:
+                client.notify(device_index, message)
+
+    def describe_devices(self):
+        """
+        Returns the identity of the shared devices, as returned by SupernovaDevice.open().
+        """
+        descriptions = []
+        for device in self.devices:
+            info = getattr(device, "info", None)
+            descriptions.append(dict(info) if info is not None else {})
+        return descriptions
+
+    def execute(self, call):
+        """
+        Executes one call received from a client.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating whether the method could be called.
+            - The second element is the value returned by the method, or the error that prevented the call.
+        """
+        try:
+            (device_index, interface_name, method_name, args, kwargs) = call
+
+            if method_name.startswith("_"):
+                return (False, f"Method {method_name} can not be called remotely")
+            if not 0 <= device_index < len(self.devices):
+                return (False, f"Unknown device {device_index}")
+
+            interface = self.devices[device_index].create_interface(interface_name)
+            method = getattr(interface, method_name, None)
+            if not callable(method):
+                return (False, f"Unknown method {interface_name}.{method_name}")
+
+            return (True, method(*args, **kwargs))
+        except Exception as e:
+            return (False, f"{type(e).__name__}: {e}")
+
+    def get_statistics(self):
+        """
+        Returns the number of connected clients and the notifications dropped for each of them.
+        """
+        with self.clients_lock:
+            clients = list(self.clients)
+        return {
+            "clients": len(clients),
+            "dropped_notifications": [client.dropped_notifications for client in clients],
+        }
+
+    def close(self):
+        """
+        Disconnects every client and stops listening. The devices are not closed.
+        """
+        self.running = False
+
+        for device in self.devices:
+            device.remove_notification(f"Supernova daemon ({id(self):x})")
+
+        if self.server is not None:
+            try:
+                # Wakes up the thread blocked in accept()
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.close()
+
+        self.executor.shutdown(wait=False)
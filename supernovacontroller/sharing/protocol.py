@@ -0,0 +1,266 @@
+"""
+Binary protocol spoken between the Supernova daemon and its clients.
+
+Every frame starts with a 9-byte header: payload length (uint32), frame type (uint8) and request id (uint32),
+all little endian. The request id lets a client keep several requests in flight on the same connection and
+match the responses, which may arrive in any order.
+
+Payloads are a single value encoded with a compact tagged format: one tag byte followed by the value.
+Integers and lengths use variable-length encoding, so the typical call (a few small integers and short lists
+of bytes) takes a handful of bytes. Enumerations from the SDK and this package travel by name and are
+restored as the same enumeration on the other side.
+
+A frame longer than MAX_FRAME_SIZE, or a value nested deeper than MAX_DEPTH, is rejected with ProtocolError,
+which closes the connection, so a peer can not make the other side allocate unbounded memory or recurse without
+limit.
+"""
+import enum
+import importlib
+import struct
+
+HEADER = struct.Struct("<IBI")
+DOUBLE = struct.Struct("<d")
+
+# Largest payload accepted, in bytes
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# Deepest nesting of lists, tuples and dictionaries accepted
+MAX_DEPTH = 32
+
+# Frame types
+CALL = 1                # Client -> daemon: (device index, interface name, method name, args, kwargs)
+BATCH = 2               # Client -> daemon: list of calls, executed in order
+SUBSCRIBE = 3           # Client -> daemon: notification name (None for every notification)
+UNSUBSCRIBE = 4         # Client -> daemon: request id of the subscription
+DEVICES = 5             # Client -> daemon: no payload
+RESPONSE = 16           # Daemon -> client: (success, result or error message)
+NOTIFICATION = 17       # Daemon -> client: (device index, notification); request id of the subscription
+
+# Value tags
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_BYTES = 6
+_LIST = 7
+_TUPLE = 8
+_DICT = 9
+_ENUM = 10
+
+# Only enumerations defined in these packages are restored on decoding
+_ENUM_PACKAGES = ("BinhoSupernova.", "supernovacontroller.")
+
+_enum_cache = {}
+
+
+class ProtocolError(Exception):
+    """Exception raised when a frame can not be decoded."""
+
+    def __init__(self, message="Malformed frame"):
+        self.message = message
+        super().__init__(self.message)
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ProtocolError("Truncated value")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, offset)
+        shift += 7
+
+
+def _write_value(buffer: bytearray, value):
+    if value is None:
+        buffer.append(_NONE)
+    elif value is True:
+        buffer.append(_TRUE)
+    elif value is False:
+        buffer.append(_FALSE)
+    elif isinstance(value, enum.Enum):
+        buffer.append(_ENUM)
+        _write_str(buffer, f"{type(value).__module__}:{type(value).__qualname__}")
+        _write_str(buffer, value.name)
+    elif isinstance(value, int):
+        buffer.append(_INT)
+        # Zigzag encoding keeps small negative numbers short
+        _write_varint(buffer, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif isinstance(value, float):
+        buffer.append(_FLOAT)
+        buffer += DOUBLE.pack(value)
+    elif isinstance(value, str):
+        buffer.append(_STR)
+        _write_str(buffer, value)
+    elif isinstance(value, (bytes, bytearray)):
+        buffer.append(_BYTES)
+        _write_varint(buffer, len(value))
+        buffer += value
+    elif isinstance(value, list):
+        buffer.append(_LIST)
+        _write_varint(buffer, len(value))
+        for item in value:
+            _write_value(buffer, item)
+    elif isinstance(value, tuple):
+        # Named tuples travel as plain tuples
+        buffer.append(_TUPLE)
+        _write_varint(buffer, len(value))
+        for item in value:
+            _write_value(buffer, item)
+    elif isinstance(value, dict):
+        buffer.append(_DICT)
+        _write_varint(buffer, len(value))
+        for key, item in value.items():
+            _write_value(buffer, key)
+            _write_value(buffer, item)
+    else:
+        # Values without an encoding (e.g. SDK objects inside a notification) are sent as their text
+        buffer.append(_STR)
+        _write_str(buffer, str(value))
+
+
+def _write_str(buffer: bytearray, value: str):
+    encoded = value.encode("utf-8")
+    _write_varint(buffer, len(encoded))
+    buffer += encoded
+
+
+def _read_str(data, offset):
+    (length, offset) = _read_varint(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise ProtocolError("Truncated string")
+    return (bytes(data[offset:end]).decode("utf-8"), end)
+
+
+def _resolve_enum(path, name):
+    enum_class = _enum_cache.get(path)
+    if enum_class is None:
+        (module_name, class_name) = path.split(":")
+        if not module_name.startswith(_ENUM_PACKAGES):
+            return name
+        try:
+            enum_class = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError):
+            return name
+        _enum_cache[path] = enum_class
+    try:
+        return enum_class[name]
+    except KeyError:
+        return name
+
+
+def _read_value(data, offset, depth=0):
+    if depth > MAX_DEPTH:
+        raise ProtocolError("Value nested too deeply")
+    if offset >= len(data):
+        raise ProtocolError("Truncated value")
+    tag = data[offset]
+    offset += 1
+
+    if tag == _NONE:
+        return (None, offset)
+    if tag == _TRUE:
+        return (True, offset)
+    if tag == _FALSE:
+        return (False, offset)
+    if tag == _INT:
+        (value, offset) = _read_varint(data, offset)
+        return ((value >> 1) if not value & 1 else -((value + 1) >> 1), offset)
+    if tag == _FLOAT:
+        if offset + DOUBLE.size > len(data):
+            raise ProtocolError("Truncated float")
+        return (DOUBLE.unpack_from(data, offset)[0], offset + DOUBLE.size)
+    if tag == _STR:
+        return _read_str(data, offset)
+    if tag == _BYTES:
+        (length, offset) = _read_varint(data, offset)
+        if offset + length > len(data):
+            raise ProtocolError("Truncated bytes")
+        return (bytes(data[offset:offset + length]), offset + length)
+    if tag in (_LIST, _TUPLE):
+        (count, offset) = _read_varint(data, offset)
+        items = []
+        for _ in range(count):
+            (item, offset) = _read_value(data, offset, depth + 1)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items), offset)
+    if tag == _DICT:
+        (count, offset) = _read_varint(data, offset)
+        result = {}
+        for _ in range(count):
+            (key, offset) = _read_value(data, offset, depth + 1)
+            (result[key], offset) = _read_value(data, offset, depth + 1)
+        return (result, offset)
+    if tag == _ENUM:
+        (path, offset) = _read_str(data, offset)
+        (name, offset) = _read_str(data, offset)
+        return (_resolve_enum(path, name), offset)
+
+    raise ProtocolError(f"Unknown value tag {tag}")
+
+
+def encode_value(value) -> bytes:
+    buffer = bytearray()
+    _write_value(buffer, value)
+    return bytes(buffer)
+
+
+def decode_value(data):
+    (value, offset) = _read_value(data, 0)
+    if offset != len(data):
+        raise ProtocolError("Trailing bytes after value")
+    return value
+
+
+def encode_frame(frame_type: int, request_id: int, value=None) -> bytes:
+    buffer = bytearray(HEADER.size)
+    _write_value(buffer, value)
+    HEADER.pack_into(buffer, 0, len(buffer) - HEADER.size, frame_type, request_id)
+    return bytes(buffer)
+
+
+def _receive_exactly(sock, length):
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            return None
+        received += count
+    return buffer
+
+
+def receive_frame(sock):
+    """
+    Reads one frame from a socket.
+
+    Returns:
+    tuple: The frame type, the request id and the decoded payload, or None if the connection was closed.
+
+    Raises:
+    ProtocolError: If the frame is larger than MAX_FRAME_SIZE or can not be decoded.
+    """
+    header = _receive_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length, frame_type, request_id) = HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {length} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes")
+    payload = _receive_exactly(sock, length)
+    if payload is None:
+        return None
+    return (frame_type, request_id, decode_value(payload))
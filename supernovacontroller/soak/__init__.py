@@ -0,0 +1,4 @@
+from .fake_driver import FakeSupernovaDriver
+from .harness import SoakHarness, find_drift
+
+__all__ = ['SoakHarness', 'FakeSupernovaDriver', 'find_drift']
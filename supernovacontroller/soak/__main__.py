@@ -0,0 +1,40 @@
+import argparse
+import json
+import sys
+
+from .fake_driver import FakeSupernovaDriver
+from .harness import SoakHarness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drives mixed traffic through a SupernovaDevice backed by a fake driver "
+                                                 "and reports resource growth and latency drift.")
+    parser.add_argument("--duration", type=float, default=3600, help="Duration of the soak, in seconds")
+    parser.add_argument("--interval", type=float, default=10, help="Time between samples, in seconds")
+    parser.add_argument("--workers", type=int, default=4, help="Number of threads issuing transfers")
+    parser.add_argument("--latency-us", type=float, default=200, help="Latency of the fake driver, in microseconds")
+    parser.add_argument("--loss-rate", type=float, default=0.0, help="Fraction of responses the fake driver loses")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Deadline of every transfer, in seconds")
+    parser.add_argument("--output", help="Path of the JSON report")
+    arguments = parser.parse_args()
+
+    driver = FakeSupernovaDriver(latency_s=arguments.latency_us / 1e6, loss_rate=arguments.loss_rate, notification_interval_s=0.001)
+    harness = SoakHarness(driver=driver, workers=arguments.workers, default_timeout=arguments.timeout)
+    report = harness.run(arguments.duration, arguments.interval)
+    harness.device.close()
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    for sample in report["samples"]:
+        print(f"{sample['elapsed_s']:10.1f}s rss={sample['rss_bytes']} threads={sample['threads']} "
+              f"pending={sample['pending_sequences']} p50={sample['latency_p50_ns']} p99={sample['latency_p99_ns']}")
+    for finding in report["findings"]:
+        print(f"DRIFT {finding['metric']}: {finding['start']} -> {finding['end']} (limit {finding['limit']})")
+
+    sys.exit(1 if report["findings"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import queue
+import random
+import threading
+import time
+
+from BinhoSupernova.commands.definitions import COMMANDS_DICTIONARY, SPI_CONTROLLER_TRANSFER, UART_CONTROLLER_SEND
+from BinhoSupernova.utils.system_message import SystemOpcode
+
+
+class FakeSupernovaDriver:
+    """
+    Stand-in for the Supernova SDK driver that answers the requests used by the soak harness locally.
+
+    Responses are delivered from a thread of the driver, in order, latency_s seconds after their request, as the
+    SDK does. A fraction of the responses, loss_rate, is never delivered, to exercise the deadlines and the
+    bookkeeping of cancelled transfers. Notifications (I3C IBIs, I3C target notifications and UART receptions)
+    are generated every notification_interval_s seconds.
+
+    Only the requests issued by the soak workload and by SupernovaDevice.open() are supported: USB strings, I2C
+    reads and writes, I3C controller initialization, reads and writes, SPI transfers and UART sends.
+    """
+
+    def __init__(self, latency_s: float = 0.0002, loss_rate: float = 0.0, notification_interval_s: float = None, seed: int = 0):
+        """
+        Args:
+        latency_s (float, optional): The time between a request and its response, in seconds.
+        loss_rate (float, optional): The probability of a response not being delivered.
+        notification_interval_s (float, optional): The time between notifications, in seconds. None disables them.
+        seed (int, optional): The seed of the random generator deciding which responses are lost.
+        """
+        self.latency_s = latency_s
+        self.loss_rate = loss_rate
+        self.notification_interval_s = notification_interval_s
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        self.callback = None
+        self.pending = queue.SimpleQueue()
+        self.running = False
+        self.requests = 0
+        self.lost_responses = 0
+        self.notifications = 0
+
+    # Session
+
+    def open(self, path=None):
+        self.running = True
+        threading.Thread(target=self.__deliver_responses, daemon=True).start()
+        if self.notification_interval_s is not None:
+            threading.Thread(target=self.__generate_notifications, daemon=True).start()
+        return {"opcode": SystemOpcode.OK.value, "message": "Fake Supernova opened"}
+
+    def close(self):
+        self.running = False
+        return {"opcode": SystemOpcode.OK.value, "message": "Fake Supernova closed"}
+
+    def onEvent(self, callback):
+        self.callback = callback
+
+    # Requests
+
+    def getUsbString(self, id, sub_command):
+        self.__respond({"id": id, "name": "GET USB STRING", "message": f"FAKE-{getattr(sub_command, 'name', sub_command)}"})
+
+    def i2cReadFrom(self, id, address, register, length):
+        self.__respond({"id": id, "name": "I2C READ FROM", "status": "NO_TRANSFER_ERROR", "data": [address & 0xFF] * length})
+
+    def i2cRead(self, id, address, length):
+        self.__respond({"id": id, "name": "I2C READ", "status": "NO_TRANSFER_ERROR", "data": [address & 0xFF] * length})
+
+    def i2cWrite(self, id, address, register, data):
+        self.__respond({"id": id, "name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"})
+
+    def i3cControllerInit(self, id):
+        self.__respond({"id": id, "name": "I3C CONTROLLER INIT", "result": "I3C_CONTROLLER_INIT_SUCCESS"})
+
+    def i3cRead(self, id, address, mode, push_pull_rate, open_drain_rate, subaddress, length):
+        self.__respond({"id": id, "name": "I3C TRANSFER", "header": {"result": "I3C_TRANSFER_SUCCESS"}, "descriptor": {"errors": []}, "data": [address & 0xFF] * length})
+
+    def i3cWrite(self, id, address, mode, push_pull_rate, open_drain_rate, subaddress, buffer):
+        self.__respond({"id": id, "name": "I3C TRANSFER", "header": {"result": "I3C_TRANSFER_SUCCESS"}, "descriptor": {"errors": []}, "data": []})
+
+    def spiControllerTransfer(self, id, payload, transferLength):
+        self.__respond({"id": id, "name": COMMANDS_DICTIONARY[SPI_CONTROLLER_TRANSFER]["name"], "usb_error": "CMD_SUCCESSFUL",
+                        "manager_error": "SPI_NO_ERROR", "driver_error": "SPI_DRIVER_NO_TRANSFER_ERROR", "payload": list(payload)})
+
+    def uartControllerSendMessage(self, id, data):
+        self.__respond({"id": id, "name": COMMANDS_DICTIONARY[UART_CONTROLLER_SEND]["name"], "usb_error": "CMD_SUCCESSFUL",
+                        "manager_error": "UART_NO_ERROR", "driver_error": "NO_TRANSFER_ERROR"})
+
+    # Delivery
+
+    def __respond(self, response):
+        self.requests += 1
+        with self.random_lock:
+            lost = self.loss_rate > 0 and self.random.random() < self.loss_rate
+        if lost:
+            self.lost_responses += 1
+            return
+        self.pending.put((time.monotonic() + self.latency_s, response))
+
+    def __deliver_responses(self):
+        while self.running:
+            try:
+                (due, response) = self.pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if self.callback is not None:
+                self.callback(response, None)
+
+    def __generate_notifications(self):
+        notifications = [
+            {"id": 0, "name": "I3C IBI NOTIFICATION", "header": {"address": 0x08, "type": "IBI_NORMAL"}, "payload": [0x01]},
+            {"id": 0, "name": "I3C TARGET NOTIFICATION", "notification_type": "I3C_TARGET_WRITE", "memory_address": 0, "transfer_length": 1, "data": [0x00],
+             "usb_result": "CMD_SUCCESSFUL", "manager_result": "I3C_TARGET_TRANSFER_SUCCESS", "driver_result": ["NO_ERROR"]},
+            {"id": 0, "name": "UART CONTROLLER RECEIVE MESSAGE", "usb_error": "CMD_SUCCESSFUL", "manager_error": "UART_NO_ERROR", "driver_error": "NO_TRANSFER_ERROR", "payload": [0x55]},
+        ]
+        index = 0
+        while self.running:
+            time.sleep(self.notification_interval_s)
+            if self.callback is not None:
+                self.callback(dict(notifications[index % len(notifications)]), None)
+                self.notifications += 1
+                index += 1
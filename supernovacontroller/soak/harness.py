@@ -0,0 +1,249 @@
+import os
+import statistics
+import threading
+import time
+
+from supernovacontroller.errors import BackendError
+from supernovacontroller.sequential import SupernovaDevice
+
+from .fake_driver import FakeSupernovaDriver
+
+# Allowed growth of each metric between the start and the end of a soak, see find_drift
+DEFAULT_GROWTH_LIMITS = {
+    "rss_bytes": 32 * 1024 * 1024,
+    "threads": 4,
+    "notification_handlers": 0,
+    "response_queue": 64,
+    "notification_queue": 64,
+    "pending_sequences": 64,
+    "pending_transfers": 64,
+    "ids_in_flight": 64,
+}
+
+# Factor by which the latency percentiles may grow, and the growth below which they are not considered
+DEFAULT_LATENCY_DRIFT_FACTOR = 2.0
+DEFAULT_LATENCY_DRIFT_FLOOR_NS = 1_000_000
+
+
+def rss_bytes():
+    """
+    Returns the resident set size of the process, or None if it cannot be measured.
+
+    The current value is read from /proc on Linux. Elsewhere the peak value reported by getrusage is returned.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def find_drift(samples, growth_limits=None, latency_drift_factor=DEFAULT_LATENCY_DRIFT_FACTOR,
+               latency_drift_floor_ns=DEFAULT_LATENCY_DRIFT_FLOOR_NS, warmup_fraction=0.2):
+    """
+    Compares the start and the end of a soak and reports the metrics that grew.
+
+    The samples taken during the warm-up are ignored. The median of each metric over the first third of the
+    remaining samples is compared to its median over the last third, so a transient peak is not reported.
+
+    Args:
+    samples (list): The samples taken by SoakHarness, in order.
+    growth_limits (dict, optional): The allowed absolute growth of each metric. Defaults to DEFAULT_GROWTH_LIMITS.
+    latency_drift_factor (float, optional): The factor by which the p50 and p99 latencies may grow.
+    latency_drift_floor_ns (int, optional): The latency growth, in nanoseconds, that is always accepted.
+    warmup_fraction (float, optional): The fraction of the samples taken during the warm-up.
+
+    Returns:
+    list: A dictionary for every metric that grew too much, with the 'metric', its 'start' and 'end' values
+          and the 'limit' it exceeded.
+    """
+    growth_limits = DEFAULT_GROWTH_LIMITS if growth_limits is None else growth_limits
+    samples = samples[int(len(samples) * warmup_fraction):]
+    if len(samples) < 3:
+        return []
+
+    third = len(samples) // 3
+    (start, end) = (samples[:third], samples[-third:])
+
+    def median(window, metric):
+        values = [sample[metric] for sample in window if sample.get(metric) is not None]
+        return statistics.median(values) if values else None
+
+    findings = []
+    for metric, limit in growth_limits.items():
+        (first, last) = (median(start, metric), median(end, metric))
+        if first is not None and last is not None and last - first > limit:
+            findings.append({"metric": metric, "start": first, "end": last, "limit": limit})
+
+    for metric in ("latency_p50_ns", "latency_p99_ns"):
+        (first, last) = (median(start, metric), median(end, metric))
+        if first is None or last is None:
+            continue
+        limit = max(first * latency_drift_factor, first + latency_drift_floor_ns)
+        if last > limit:
+            findings.append({"metric": metric, "start": first, "end": last, "limit": limit})
+
+    return findings
+
+
+class SoakHarness:
+    """
+    Drives mixed traffic through a SupernovaDevice for a long time and tracks its resource usage.
+
+    Worker threads loop over I2C, I3C, SPI and UART transfers while a sampler records, every sample_interval_s
+    seconds, the resident set size, the number of threads, the depth of the response and notification queues,
+    the sequences, transfers and ids pending in the transfer controller, the ids of cancelled transfers, the
+    notifications waiting in the notification handlers and the latency percentiles of the interval. At the end,
+    find_drift() reports the metrics that grew.
+
+    By default the device talks to a FakeSupernovaDriver, so the soak runs without hardware.
+
+    Example:
+        harness = SoakHarness(workers=4)
+        report = harness.run(duration_s=4 * 3600, sample_interval_s=30)
+        assert not report["findings"], report["findings"]
+    """
+
+    def __init__(self, device: SupernovaDevice = None, driver=None, workers: int = 4, default_timeout: float = 0.5):
+        """
+        Args:
+        device (SupernovaDevice, optional): The device to soak, already open. If None, a device is created and
+                                            opened with driver.
+        driver (optional): The driver of the created device. Defaults to a FakeSupernovaDriver generating
+                           notifications.
+        workers (int, optional): The number of threads issuing transfers.
+        default_timeout (float, optional): The deadline of every transfer of the created device, in seconds.
+        """
+        if device is None:
+            device = SupernovaDevice(default_timeout=default_timeout)
+            device.driver = driver if driver is not None else FakeSupernovaDriver(notification_interval_s=0.001)
+            device.open()
+        self.device = device
+        self.workers = workers
+
+        self.i2c = device.create_interface("i2c")
+        self.i3c = device.create_interface("i3c.controller")
+        self.spi = device.create_interface("spi.controller")
+        self.uart = device.create_interface("uart")
+        self.i3c_target = device.create_interface("i3c.target")
+
+        self.operations = [
+            ("i2c.read_from", lambda: self.i2c.read_from(0x50, [0x00], 4)),
+            ("i2c.write", lambda: self.i2c.write(0x50, [0x00], [0x01, 0x02])),
+            ("i3c.read", lambda: self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 4)),
+            ("i3c.write", lambda: self.i3c.write(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], [0x01])),
+            ("spi.transfer", lambda: self.spi.transfer([0x9F, 0x00, 0x00], 3)),
+            ("uart.send", lambda: self.uart.send([0x55])),
+        ]
+
+        self.lock = threading.Lock()
+        self.latencies_ns = []
+        self.counts = {name: 0 for (name, _) in self.operations}
+        self.errors = {}
+
+    def run(self, duration_s: float, sample_interval_s: float = 10.0, growth_limits=None):
+        """
+        Runs the soak.
+
+        Args:
+        duration_s (float): The duration of the soak, in seconds.
+        sample_interval_s (float, optional): The time between samples, in seconds.
+        growth_limits (dict, optional): The allowed growth of each metric, see find_drift.
+
+        Returns:
+        dict: The 'samples', the 'findings' of find_drift, the number of completed 'operations' and of 'errors'
+              per operation, and the 'statistics' of the transfer controller at the end.
+        """
+        stop = threading.Event()
+        threads = [threading.Thread(target=self.__work, args=(index, stop), daemon=True) for index in range(self.workers)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        samples = []
+        try:
+            while not stop.wait(sample_interval_s):
+                samples.append(self.sample(time.monotonic() - started))
+                if time.monotonic() - started >= duration_s:
+                    stop.set()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        with self.lock:
+            counts = dict(self.counts)
+            errors = dict(self.errors)
+
+        return {
+            "samples": samples,
+            "findings": find_drift(samples, growth_limits),
+            "operations": counts,
+            "errors": errors,
+            "statistics": self.device.get_transfer_statistics(),
+        }
+
+    def sample(self, elapsed_s: float = None):
+        """
+        Returns the current value of every tracked metric, and the latency percentiles of the transfers completed
+        since the previous sample.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies_ns)
+            self.latencies_ns = []
+
+        controller = self.device.controller
+        statistics = controller.get_statistics()
+        return {
+            "elapsed_s": elapsed_s,
+            "rss_bytes": rss_bytes(),
+            "threads": threading.active_count(),
+            "response_queue": self.device.response_queue.qsize(),
+            "notification_queue": self.device.notification_queue.qsize(),
+            "notification_handlers": len(self.device.notification_handlers),
+            "pending_sequences": len(controller.request_states),
+            "pending_transfers": len(controller.transfer_states),
+            "ids_in_flight": statistics["in_flight"],
+            "cancelled_ids": len(controller.cancelled_ids),
+            "target_notifications": len(self.i3c_target.i3c_notification.high_notification_queue),
+            "transfers": len(latencies),
+            "latency_p50_ns": percentile(latencies, 0.50),
+            "latency_p99_ns": percentile(latencies, 0.99),
+            "latency_max_ns": latencies[-1] if latencies else None,
+        }
+
+    def __work(self, index, stop):
+        operation_index = index
+        while not stop.is_set():
+            (name, operation) = self.operations[operation_index % len(self.operations)]
+            operation_index += 1
+
+            started_ns = time.perf_counter_ns()
+            try:
+                (success, _) = operation()
+                error = None if success else "failed"
+            except BackendError as e:
+                error = type(e.original_exception).__name__ if e.original_exception is not None else "BackendError"
+            elapsed_ns = time.perf_counter_ns() - started_ns
+
+            with self.lock:
+                if error is None:
+                    self.counts[name] += 1
+                    self.latencies_ns.append(elapsed_ns)
+                else:
+                    key = f"{name}: {error}"
+                    self.errors[key] = self.errors.get(key, 0) + 1
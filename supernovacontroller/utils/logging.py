@@ -1,4 +1,3 @@
-import inspect
 import os
 import logging
 from functools import wraps
@@ -45,6 +44,9 @@ logger = logging.getLogger(__name__)
 def log_function_call(func, logger = logger):
     @wraps(func)
     def wrapper(*args, **kwargs):
+        # Imported here to keep it out of the import time of the package
+        import inspect
+
         signature = inspect.signature(func)
         bound_args = signature.bind(*args, **kwargs)
         bound_args.apply_defaults()
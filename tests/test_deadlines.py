@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.errors import BackendError, TransferTimeoutError
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.hooks import TransferHooks
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.supernova_device import SupernovaDevice
+
+
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.controller = SupernovaTransferController()
+        self.issued = []
+
+    def lost_request(self, id):
+        self.issued.append(id)
+
+    def answered_request(self, id):
+        self.issued.append(id)
+        threading.Thread(target=self.controller.handle_response, kwargs={"transfer_id": id, "response": {"id": id}}, daemon=True).start()
+
+    def test_lost_responses_expire(self):
+        started = time.monotonic()
+
+        with self.assertRaises(TransferTimeoutError):
+            self.controller.sync_submit([self.lost_request, self.answered_request], timeout=0.05)
+
+        self.assertLess(time.monotonic() - started, 1)
+        # The rest of the sequence is not issued after the cancellation
+        self.assertEqual(self.issued, [1])
+        self.assertEqual(self.controller.get_statistics()["cancelled_transfers"], 1)
+
+    def test_late_responses_are_dropped_and_counted(self):
+        with self.assertRaises(TransferTimeoutError):
+            self.controller.sync_submit([self.lost_request], timeout=0.01)
+
+        self.assertFalse(self.controller.handle_response(transfer_id=1, response={"id": 1}))
+        self.assertTrue(self.controller.drop_response(1))
+        # The id is released, so a second response is not taken for a late one
+        self.assertFalse(self.controller.drop_response(1))
+        statistics = self.controller.get_statistics()
+        self.assertEqual((statistics["cancelled_transfers"], statistics["late_responses"], statistics["unmatched_responses"]), (1, 1, 1))
+        self.assertEqual(statistics["in_flight"], 0)
+
+    def test_cancel_while_the_response_is_handled_releases_the_id_once(self):
+        sequence_id = self.controller.submit(sequence=[self.lost_request])
+        while not self.issued:
+            time.sleep(0.001)
+
+        # The deadline expires while the response of the transfer in flight is being handled
+        hooks = TransferHooks()
+        hooks.add("response", lambda *args: self.controller.cancel(sequence_id))
+        self.controller.hooks = hooks
+        self.assertTrue(self.controller.handle_response(transfer_id=1, response={"id": 1}))
+
+        # The id was released by the response, so it is not kept for a late response as well
+        self.assertNotIn(1, self.controller.cancelled_ids)
+        self.assertFalse(self.controller.drop_response(1))
+        self.assertEqual(self.controller.get_statistics()["in_flight"], 0)
+
+    def test_deadline_block_applies_to_interface_methods(self):
+        driver = MagicMock()
+        driver.i2cReadFrom.side_effect = lambda id, *args: self.lost_request(id)
+        i2c = SupernovaI2CBlockingInterface(driver, self.controller, MagicMock())
+
+        with self.controller.deadline(0.05):
+            with self.assertRaises(BackendError) as context:
+                i2c.read_from(0x50, [0x00], 1)
+
+        self.assertIsInstance(context.exception.original_exception, TransferTimeoutError)
+
+    def test_nested_deadlines_only_shorten(self):
+        with self.controller.deadline(0.05):
+            with self.controller.deadline(10):
+                self.assertLessEqual(self.controller.remaining_time(), 0.05)
+        self.assertIsNone(self.controller.remaining_time())
+
+    def test_default_timeout(self):
+        controller = SupernovaTransferController(default_timeout=0.02)
+        self.controller = controller
+
+        with self.assertRaises(TransferTimeoutError):
+            controller.sync_submit([self.lost_request])
+        self.assertEqual(controller.sync_submit([self.answered_request], timeout=5), [{"id": 2}])
+
+    def test_device_drops_late_responses(self):
+        device = SupernovaDevice(default_timeout=0.01)
+        device.driver = MagicMock()
+        try:
+            with self.assertRaises(TransferTimeoutError):
+                device.controller.sync_submit([lambda id: None])
+
+            device._process_sdk_response({"id": 1}, None)
+            device._process_sdk_response({"id": 99}, None)
+
+            statistics = device.get_transfer_statistics()
+            self.assertEqual((statistics["cancelled_transfers"], statistics["late_responses"], statistics["unmatched_responses"]), (1, 1, 1))
+        finally:
+            device.running = False
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
+from BinhoSupernova.utils.system_message import SystemOpcode
+
+from supernovacontroller.sequential.supernova_device import SupernovaDevice
+
+
+USB_STRINGS = {
+    GetUsbStringSubCommand.HW_VERSION: "HW-C",
+    GetUsbStringSubCommand.FW_VERSION: "FW-2.0.0",
+    GetUsbStringSubCommand.SERIAL_NUMBER: "SN-1234",
+    GetUsbStringSubCommand.MANUFACTURER: "MF-Binho LLC",
+    GetUsbStringSubCommand.PRODUCT_NAME: "PR-Binho Supernova",
+}
+
+
+class TestDeviceIdentity(unittest.TestCase):
+    def setUp(self):
+        SupernovaDevice.clear_identity_cache()
+        self.devices = []
+
+    def tearDown(self):
+        for device in self.devices:
+            device.running = False
+        SupernovaDevice.clear_identity_cache()
+
+    def new_device(self):
+        device = SupernovaDevice()
+        self.devices.append(device)
+
+        driver = MagicMock()
+        driver.open.return_value = {"opcode": SystemOpcode.OK.value, "message": "Connection opened"}
+
+        def get_usb_string(id, sub_command):
+            response = {"id": id, "name": "GET USB STRING", "message": USB_STRINGS[sub_command]}
+            threading.Thread(target=device.controller.handle_response, kwargs={"transfer_id": id, "response": response}, daemon=True).start()
+
+        driver.getUsbString.side_effect = get_usb_string
+        device.driver = driver
+        return device
+
+    def test_open_returns_the_device_identity(self):
+        device = self.new_device()
+
+        info = device.open("path-1")
+
+        self.assertEqual(info, {
+            "hw_version": "C",
+            "fw_version": "2.0.0",
+            "serial_number": "1234",
+            "manufacturer": "Binho LLC",
+            "product_name": "Binho Supernova",
+        })
+        self.assertEqual(device.driver.getUsbString.call_count, 5)
+        self.assertEqual(device.get_hardware_version(), "HW-C")
+        self.assertEqual(device.driver.getUsbString.call_count, 5)
+
+    def test_lazy_open_fetches_on_first_access(self):
+        device = self.new_device()
+
+        info = device.open("path-1", lazy=True)
+        device.driver.getUsbString.assert_not_called()
+
+        self.assertEqual(info.serial_number, "1234")
+        self.assertEqual(info["serial_number"], "1234")
+        self.assertEqual(device.driver.getUsbString.call_count, 1)
+
+    def test_identity_is_cached_per_usb_path(self):
+        self.new_device().open("path-1")
+
+        device = self.new_device()
+        device.open("path-1")
+        device.driver.getUsbString.assert_not_called()
+
+        other = self.new_device()
+        other.open("path-2")
+        self.assertEqual(other.driver.getUsbString.call_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+import os
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+from BinhoSupernova.commands.definitions import GpioPinNumber
+
+from supernovacontroller.errors import BackendError
+from supernovacontroller.sharing import SupernovaDaemon, SupernovaDaemonClient
+from supernovacontroller.sharing import protocol
+
+
+class FakeInterface:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def read(self, address, register, length):
+        self.calls.append(("read", address, register, length))
+        return (True, [register[0]] * length)
+
+    def slow_read(self):
+        self.release.wait()
+        return (True, "slow")
+
+    def pin(self, pin_number):
+        return (True, pin_number)
+
+
+class FakeDevice:
+    def __init__(self):
+        self.interface = FakeInterface()
+        self.notification_handlers = {}
+        self.info = {"serial_number": "1234"}
+
+    def create_interface(self, interface_name):
+        return self.interface
+
+    def on_notification(self, name, filter_func, handler_func):
+        self.notification_handlers[name] = (filter_func, handler_func)
+
+    def remove_notification(self, name):
+        self.notification_handlers.pop(name, None)
+
+    def notify(self, message):
+        for name, (filter_func, handler_func) in list(self.notification_handlers.items()):
+            if filter_func(name, message):
+                handler_func(name, message)
+
+
+class TestProtocol(unittest.TestCase):
+    def test_values_round_trip(self):
+        value = [None, True, False, 0, -1, 300, -70000, 1.5, "text", b"\x00\x01", (1, 2), {"a": [1, {"b": None}]},
+                 GpioPinNumber.GPIO_5]
+
+        self.assertEqual(protocol.decode_value(protocol.encode_value(value)), value)
+
+    def test_small_calls_are_compact(self):
+        frame = protocol.encode_frame(protocol.CALL, 1, (0, "i2c", "read_from", [0x50, [0x10], 2], {}))
+
+        self.assertLessEqual(len(frame), 48)
+
+    def test_deeply_nested_values_are_rejected(self):
+        value = []
+        for _ in range(protocol.MAX_DEPTH + 1):
+            value = [value]
+
+        with self.assertRaises(protocol.ProtocolError):
+            protocol.decode_value(protocol.encode_value(value))
+
+
+class TestDeviceSharing(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "supernova.sock")
+        self.device = FakeDevice()
+        self.daemon = SupernovaDaemon(self.socket_path, [self.device])
+        self.daemon.start()
+        self.client = SupernovaDaemonClient(self.socket_path, timeout=5)
+
+    def tearDown(self):
+        self.device.interface.release.set()
+        self.client.close()
+        self.daemon.close()
+        self.directory.cleanup()
+
+    def test_remote_interface_calls(self):
+        i2c = self.client.create_interface("i2c")
+
+        self.assertEqual(i2c.read(0x50, [0x10], 2), (True, [0x10, 0x10]))
+        self.assertEqual(i2c.pin(GpioPinNumber.GPIO_5), (True, GpioPinNumber.GPIO_5))
+        self.assertEqual(self.client.devices(), [{"serial_number": "1234"}])
+
+    def test_private_and_unknown_methods_are_rejected(self):
+        with self.assertRaises(BackendError):
+            self.client.call("i2c", "_FakeInterface__secret")
+        with self.assertRaises(BackendError):
+            self.client.call("i2c", "missing")
+
+    def test_requests_are_multiplexed(self):
+        self.device.interface.release.clear()
+        slow_result = []
+        slow_call = threading.Thread(target=lambda: slow_result.append(self.client.call("i2c", "slow_read")))
+        slow_call.start()
+
+        # The fast call completes while the slow one is still in flight on the same connection
+        self.assertEqual(self.client.call("i2c", "read", 0x50, [0x01], 1), (True, [0x01]))
+        self.device.interface.release.set()
+        slow_call.join(5)
+
+        self.assertEqual(slow_result, [(True, "slow")])
+
+    def test_batch_is_executed_in_order(self):
+        with self.client.batch() as batch:
+            for register in range(4):
+                batch.call("i2c", "read", 0x50, [register], 1)
+            batch.call("i2c", "missing")
+
+        self.assertEqual(batch.results[:4], [(True, (True, [register])) for register in range(4)])
+        self.assertFalse(batch.results[4][0])
+        self.assertEqual([call[2] for call in self.device.interface.calls], [[0], [1], [2], [3]])
+
+    def test_oversized_frames_close_the_connection(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(protocol.HEADER.pack(protocol.MAX_FRAME_SIZE + 1, protocol.CALL, 1))
+            sock.settimeout(5)
+            self.assertEqual(sock.recv(1), b"")
+        finally:
+            sock.close()
+
+    def test_socket_is_private(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_socket_in_use_is_not_replaced(self):
+        other = SupernovaDaemon(self.socket_path, [])
+        with self.assertRaises(OSError):
+            other.start()
+        other.close()
+
+        self.assertEqual(self.client.create_interface("i2c").read(0x50, [0x10], 2), (True, [0x10, 0x10]))
+
+    def test_stale_socket_is_replaced(self):
+        self.client.close()
+        self.daemon.close()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+
+        self.daemon = SupernovaDaemon(self.socket_path, [self.device])
+        self.daemon.start()
+        self.client = SupernovaDaemonClient(self.socket_path, timeout=5)
+        self.assertEqual(self.client.create_interface("i2c").read(0x50, [0x10], 2), (True, [0x10, 0x10]))
+
+    def test_other_files_are_not_replaced(self):
+        path = os.path.join(self.directory.name, "file")
+        with open(path, "w") as file:
+            file.write("data")
+
+        with self.assertRaises(FileExistsError):
+            SupernovaDaemon(path, []).start()
+        self.assertTrue(os.path.isfile(path))
+
+    def test_failing_notification_handler_keeps_the_client_working(self):
+        handled = threading.Event()
+
+        def failing_handler(device_index, message):
+            handled.set()
+            raise RuntimeError("handler failed")
+
+        self.client.on_notification(failing_handler)
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.device.notify({"name": "GPIO INTERRUPTION"})
+            self.assertTrue(handled.wait(5))
+            # The response is read by the same thread as the notification
+            self.assertEqual(self.client.devices(), [{"serial_number": "1234"}])
+
+    def test_requests_fail_fast_once_the_connection_is_lost(self):
+        client = SupernovaDaemonClient(self.socket_path)
+        self.daemon.close()
+        client.reader.join(5)
+
+        with self.assertRaises(BackendError):
+            client.devices()
+        client.close()
+
+    def test_notifications_are_fanned_out(self):
+        other = SupernovaDaemonClient(self.socket_path, timeout=5)
+        received = []
+        everything = threading.Event()
+        ibis = threading.Event()
+
+        def on_any(device_index, message):
+            received.append(("any", device_index, message["name"]))
+            everything.set()
+
+        def on_ibi(device_index, message):
+            received.append(("ibi", device_index, message["name"]))
+            ibis.set()
+
+        try:
+            self.client.on_notification(on_any)
+            other.on_notification(on_ibi, name="I3C IBI NOTIFICATION")
+
+            self.device.notify({"name": "GPIO INTERRUPTION"})
+            self.device.notify({"name": "I3C IBI NOTIFICATION "})
+
+            self.assertTrue(everything.wait(5))
+            self.assertTrue(ibis.wait(5))
+        finally:
+            other.close()
+
+        self.assertIn(("ibi", 0, "I3C IBI NOTIFICATION "), received)
+        self.assertNotIn(("ibi", 0, "GPIO INTERRUPTION"), received)
+
+
+if __name__ == "__main__":
+    unittest.main()
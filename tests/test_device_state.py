@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.commands.definitions import COMMANDS_DICTIONARY, SPI_CONTROLLER_INIT, SPI_CONTROLLER_SET_PARAMETERS
+
+from supernovacontroller.sequential.device_state import DeviceStateShadow
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.spi_controller import SupernovaSPIControllerBlockingInterface
+from supernovacontroller.sequential.uart import SupernovaUARTBlockingInterface
+
+
+class TestDeviceStateShadow(unittest.TestCase):
+    def setUp(self):
+        self.state = DeviceStateShadow()
+        self.controller = MagicMock()
+        self.i2c = SupernovaI2CBlockingInterface(MagicMock(), self.controller, MagicMock(), device_state=self.state)
+        self.spi = SupernovaSPIControllerBlockingInterface(MagicMock(), self.controller, MagicMock(), device_state=self.state)
+        self.uart = SupernovaUARTBlockingInterface(MagicMock(), self.controller, MagicMock(), device_state=self.state)
+
+    def respond_with(self, response):
+        self.controller.sync_submit.reset_mock()
+        self.controller.sync_submit.return_value = [response]
+
+    def test_shared_bus_voltage_is_set_once(self):
+        self.respond_with({"name": "SET I2C-SPI-UART BUS VOLTAGE", "result": "SYS_NO_ERROR"})
+
+        self.assertEqual(self.i2c.set_bus_voltage(3300), (True, 3300))
+        self.assertEqual(self.spi.set_bus_voltage(3300), (True, 3300))
+        self.assertEqual(self.uart.set_bus_voltage(3300), (True, 3300))
+
+        self.assertEqual(self.controller.sync_submit.call_count, 1)
+        self.assertEqual(self.spi.bus_voltage, 3300)
+        self.assertEqual(self.uart.bus_voltage, 3300)
+
+        self.i2c.set_bus_voltage(1800)
+        self.assertEqual(self.controller.sync_submit.call_count, 2)
+        self.assertEqual(self.uart.bus_voltage, 1800)
+
+    def test_failed_bus_voltage_is_not_recorded(self):
+        self.respond_with({"name": "SET I2C-SPI-UART BUS VOLTAGE", "result": "SYS_ERROR"})
+
+        (success, _) = self.i2c.set_bus_voltage(3300)
+        self.assertFalse(success)
+        self.assertIsNone(self.spi.bus_voltage)
+
+        self.i2c.set_bus_voltage(3300)
+        self.assertEqual(self.controller.sync_submit.call_count, 2)
+
+    def test_i2c_set_parameters_skips_repeats_and_updates_frequency(self):
+        self.respond_with({"name": "I2C SET PARAMETERS", "completed": 0})
+
+        self.assertEqual(self.i2c.set_parameters(400000), (True, 400000))
+        self.assertEqual(self.i2c.get_parameters(), (True, 400000))
+        self.i2c.set_parameters(400000)
+
+        self.assertEqual(self.controller.sync_submit.call_count, 1)
+
+    def test_spi_init_and_parameters_skip_repeats(self):
+        self.respond_with({"name": COMMANDS_DICTIONARY[SPI_CONTROLLER_INIT]["name"], "usb_error": "CMD_SUCCESSFUL", "manager_error": "SPI_NO_ERROR",
+                           "driver_error": "SPI_DRIVER_NO_TRANSFER_ERROR"})
+
+        self.assertTrue(self.spi.init_bus()[0])
+        self.assertTrue(self.spi.init_bus()[0])
+        self.assertTrue(self.spi.set_parameters()[0])
+        self.assertEqual(self.controller.sync_submit.call_count, 1)
+
+        self.controller.sync_submit.return_value[0]["name"] = COMMANDS_DICTIONARY[SPI_CONTROLLER_SET_PARAMETERS]["name"]
+        self.assertTrue(self.spi.set_parameters(frequency=1000000)[0])
+        self.assertEqual(self.controller.sync_submit.call_count, 2)
+
+    def test_invalidate_forces_the_next_command(self):
+        self.respond_with({"name": "SET I2C-SPI-UART BUS VOLTAGE", "result": "SYS_NO_ERROR"})
+
+        self.i2c.set_bus_voltage(3300)
+        self.state.invalidate()
+        self.i2c.set_bus_voltage(3300)
+
+        self.assertEqual(self.controller.sync_submit.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
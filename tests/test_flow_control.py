@@ -0,0 +1,132 @@
+import threading
+import unittest
+
+from supernovacontroller.errors import TransferQueueFullError, TransferTimeoutError
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.flow_control import FlowControl
+
+
+class TestFlowControl(unittest.TestCase):
+    def test_window_grows_while_round_trips_are_fast(self):
+        flow_control = FlowControl(initial_window=4, max_window=6)
+
+        for _ in range(100):
+            flow_control.on_response(1000)
+
+        self.assertEqual(flow_control.get_statistics()["window"], 6)
+
+    def test_window_halves_on_slow_round_trip(self):
+        flow_control = FlowControl(initial_window=16, latency_threshold=2.0)
+        flow_control.on_response(1000)
+
+        flow_control.on_response(5000)
+
+        statistics = flow_control.get_statistics()
+        self.assertEqual((statistics["window"], statistics["window_decreases"]), (8, 1))
+
+    def test_window_halves_on_timeout_down_to_its_minimum(self):
+        flow_control = FlowControl(initial_window=4, min_window=2)
+
+        flow_control.on_timeout()
+        flow_control.on_timeout()
+
+        self.assertEqual(flow_control.get_statistics()["window"], 2)
+
+    def test_full_window_rejects_when_not_blocking(self):
+        flow_control = FlowControl(initial_window=1, block=False)
+        flow_control.acquire()
+
+        with self.assertRaises(TransferQueueFullError):
+            flow_control.acquire()
+        self.assertEqual(flow_control.get_statistics()["rejected_transfers"], 1)
+
+    def test_full_window_times_out(self):
+        flow_control = FlowControl(initial_window=1)
+        flow_control.acquire()
+
+        with self.assertRaises(TransferTimeoutError):
+            flow_control.acquire(timeout=0.01)
+
+    def test_invalid_priority_does_not_take_a_slot(self):
+        flow_control = FlowControl(initial_window=1)
+
+        with self.assertRaises(ValueError):
+            flow_control.acquire(priority=99)
+
+        self.assertEqual(flow_control.get_statistics()["window_in_flight"], 0)
+        flow_control.acquire(timeout=0)
+
+    def test_invalid_windows(self):
+        with self.assertRaises(ValueError):
+            FlowControl(initial_window=2, min_window=4)
+
+
+class TestControllerFlowControl(unittest.TestCase):
+    def test_outstanding_sequences_are_capped(self):
+        controller = SupernovaTransferController(flow_control=FlowControl(initial_window=2, max_window=2))
+        issued = []
+        lock = threading.Lock()
+
+        def request(id):
+            with lock:
+                issued.append(id)
+
+        results = []
+        count = 10
+
+        def submit_all():
+            for _ in range(count):
+                controller.submit(request, on_ready=lambda responses: results.append(responses[0]))
+
+        submitter = threading.Thread(target=submit_all, daemon=True)
+        submitter.start()
+
+        answered = 0
+        while answered < count:
+            threading.Event().wait(0.005)
+            with lock:
+                pending = issued[answered:]
+            self.assertLessEqual(controller.get_statistics()["window_in_flight"], 2)
+            for transfer_id in pending:
+                controller.handle_response(transfer_id=transfer_id, response=transfer_id)
+            answered += len(pending)
+
+        submitter.join(1)
+        statistics = controller.get_statistics()
+        self.assertEqual(len(results), count)
+        self.assertEqual((statistics["window_in_flight"], statistics["window_peak_in_flight"]), (0, 2))
+        self.assertGreater(statistics["max_queueing_delay_ns"], 0)
+
+    def test_submission_waits_for_slot_until_deadline(self):
+        controller = SupernovaTransferController(flow_control=FlowControl(initial_window=1))
+        controller.submit(lambda id: None)
+
+        with self.assertRaises(TransferTimeoutError):
+            controller.sync_submit([lambda id: None], timeout=0.05)
+
+    def test_cancel_frees_slot_and_shrinks_window(self):
+        controller = SupernovaTransferController(flow_control=FlowControl(initial_window=2))
+
+        with self.assertRaises(TransferTimeoutError):
+            controller.sync_submit([lambda id: None], timeout=0.01)
+
+        statistics = controller.get_statistics()
+        self.assertEqual((statistics["window"], statistics["window_in_flight"]), (1, 0))
+
+    def test_failing_on_ready_frees_slot(self):
+        controller = SupernovaTransferController(flow_control=FlowControl(initial_window=1))
+        issued = []
+
+        def on_ready(responses):
+            raise RuntimeError("on_ready failed")
+
+        controller.submit(issued.append, on_ready=on_ready)
+        while not issued:
+            threading.Event().wait(0.001)
+        with self.assertRaises(RuntimeError):
+            controller.handle_response(transfer_id=issued[0], response={})
+        self.assertEqual(controller.get_statistics()["window_in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
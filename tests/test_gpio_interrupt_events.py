@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.commands.definitions import GpioPinNumber, GpioLogicLevel, GpioTriggerType
+from supernovacontroller.sequential.gpio import SupernovaGPIOInterface
+
+
+def gpio_interrupt(pin_number: GpioPinNumber):
+    return {
+        "id": 0,
+        "command": 0,
+        "name": "GPIO INTERRUPTION",
+        "pin_number": pin_number.name,
+        "usb_error": "CMD_SUCCESSFUL",
+        "manager_error": "GPIO_NO_ERROR",
+        "driver_error": "GPIO_DRIVER_NO_ERROR",
+    }
+
+
+class TestSupernovaGPIOInterruptEvents(unittest.TestCase):
+    def setUp(self):
+        self.subscriptions = {}
+
+        def notification_subscription(name, filter_func, handler_func):
+            self.subscriptions[name] = (filter_func, handler_func)
+
+        self.controller = MagicMock()
+        self.controller.sync_submit.return_value = [{
+            "name": "GPIO SET INTERRUPT",
+            "usb_error": "CMD_SUCCESSFUL",
+            "manager_error": "GPIO_NO_ERROR",
+            "driver_error": "GPIO_DRIVER_NO_ERROR",
+        }]
+        self.gpio = SupernovaGPIOInterface(MagicMock(), self.controller, notification_subscription, "HW-C")
+
+    def notify(self, message):
+        for name, (filter_func, handler_func) in self.subscriptions.items():
+            if filter_func(name, message):
+                handler_func(name, message)
+
+    def test_event_is_decoded_and_timestamped(self):
+        self.gpio.set_interrupt(GpioPinNumber.GPIO_5, GpioTriggerType.TRIGGER_RISING_EDGE)
+
+        before = time.monotonic_ns()
+        self.notify(gpio_interrupt(GpioPinNumber.GPIO_5))
+
+        (success, event) = self.gpio.wait_for_interrupt(GpioPinNumber.GPIO_5, timeout=0)
+        self.assertTrue(success)
+        self.assertEqual(event.pin, GpioPinNumber.GPIO_5)
+        self.assertEqual(event.level, GpioLogicLevel.HIGH)
+        self.assertEqual(event.trigger, GpioTriggerType.TRIGGER_RISING_EDGE)
+        self.assertGreaterEqual(event.timestamp_ns, before)
+
+    def test_failing_listener_does_not_lose_the_event(self):
+        def failing_listener(event):
+            raise RuntimeError("listener failed")
+
+        self.gpio.gpio_notification.add_listener(GpioPinNumber.GPIO_5, failing_listener)
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.notify(gpio_interrupt(GpioPinNumber.GPIO_5))
+
+        self.assertEqual(self.gpio.gpio_notification.pending(GpioPinNumber.GPIO_5), 1)
+
+    def test_wait_times_out_without_events(self):
+        (success, _) = self.gpio.wait_for_interrupt(GpioPinNumber.GPIO_5, timeout=0.01)
+        self.assertFalse(success)
+
+    def test_queue_is_bounded_per_pin(self):
+        handler = self.gpio.gpio_notification
+        for _ in range(handler.queue_size + 10):
+            self.notify(gpio_interrupt(GpioPinNumber.GPIO_5))
+        self.notify(gpio_interrupt(GpioPinNumber.GPIO_6))
+
+        self.assertEqual(handler.pending(GpioPinNumber.GPIO_5), handler.queue_size)
+        self.assertEqual(handler.pending(GpioPinNumber.GPIO_6), 1)
+        (_, statistics) = self.gpio.get_interrupt_statistics(GpioPinNumber.GPIO_5)
+        self.assertEqual(statistics["dropped"], 10)
+
+    def test_debounce_discards_close_edges(self):
+        self.gpio.set_interrupt(GpioPinNumber.GPIO_5, GpioTriggerType.TRIGGER_BOTH_EDGES, debounce_us=1000000)
+
+        for _ in range(5):
+            self.notify(gpio_interrupt(GpioPinNumber.GPIO_5))
+
+        (_, statistics) = self.gpio.get_interrupt_statistics(GpioPinNumber.GPIO_5)
+        self.assertEqual(statistics["accepted"], 1)
+        self.assertEqual(statistics["debounced"], 4)
+
+    def test_iterator_and_blocking_consumers(self):
+        def produce():
+            for pin in [GpioPinNumber.GPIO_1, GpioPinNumber.GPIO_2, GpioPinNumber.GPIO_1]:
+                time.sleep(0.01)
+                self.notify(gpio_interrupt(pin))
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        pins = [event.pin for event in self.gpio.interrupt_events(timeout=1)]
+        producer.join()
+
+        self.assertEqual(pins, [GpioPinNumber.GPIO_1, GpioPinNumber.GPIO_2, GpioPinNumber.GPIO_1])
+
+    def test_async_consumer(self):
+        self.notify(gpio_interrupt(GpioPinNumber.GPIO_3))
+
+        (success, event) = asyncio.run(self.gpio.wait_for_interrupt_async(GpioPinNumber.GPIO_3, timeout=1))
+        self.assertTrue(success)
+        self.assertEqual(event.pin, GpioPinNumber.GPIO_3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import unittest
+
+from supernovacontroller.errors import BackendError, TransferTimeoutError
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.sequential.hooks import TransferHooks
+from supernovacontroller.soak import FakeSupernovaDriver
+
+
+def open_fake_device(**driver_options):
+    device = SupernovaDevice(default_timeout=1.0)
+    device.driver = FakeSupernovaDriver(**driver_options)
+    device.open()
+    return device
+
+
+class TestTransferHooks(unittest.TestCase):
+    def test_unknown_event(self):
+        with self.assertRaises(ValueError):
+            TransferHooks().add("dispatch", print)
+
+    def test_failing_callbacks_do_not_stop_the_others(self):
+        hooks = TransferHooks()
+        calls = []
+        hooks.add("submit", lambda *args: 1 / 0)
+        hooks.add("submit", lambda *args: calls.append(args))
+
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            hooks.emit("submit", 1, 2, 3)
+
+        self.assertEqual(calls, [(1, 2, 3)])
+
+
+class TestDeviceHooks(unittest.TestCase):
+    def test_no_hooks_by_default(self):
+        device = open_fake_device()
+        try:
+            self.assertIsNone(device.controller.hooks)
+
+            device.on_submit(print)
+            self.assertIs(device.controller.hooks, device.hooks)
+            self.assertTrue(device.remove_hook(print))
+            self.assertIsNone(device.controller.hooks)
+            self.assertFalse(device.remove_hook(print))
+        finally:
+            device.close()
+
+    def test_submit_and_response(self):
+        device = open_fake_device()
+        submitted = []
+        answered = []
+        device.on_submit(lambda *args: submitted.append(args))
+        device.on_response(lambda *args: answered.append(args))
+        try:
+            (success, _) = device.create_interface("i2c").write(0x50, [0x00], [0x01])
+        finally:
+            device.close()
+
+        self.assertTrue(success)
+        # Opening the device issues transfers before the hooks are registered
+        self.assertEqual(len(submitted), 1)
+        self.assertEqual(len(answered), 1)
+        (submitted_ns, transfer_id, _) = submitted[0]
+        (answered_ns, answered_id, command, latency_ns) = answered[0]
+        self.assertEqual((answered_id, command), (transfer_id, "I2C WRITE"))
+        self.assertEqual(answered_ns - submitted_ns, latency_ns)
+
+    def test_error_on_deadline(self):
+        device = open_fake_device(latency_s=0.2)
+        errors = []
+        device.on_error(lambda *args: errors.append(args))
+        try:
+            with device.deadline(0.01), self.assertRaises(BackendError):
+                device.create_interface("i2c").write(0x50, [0x00], [0x01])
+        finally:
+            device.close()
+
+        self.assertEqual(len(errors), 1)
+        (_, _, command, error) = errors[0]
+        self.assertIsNone(command)
+        self.assertIsInstance(error, TransferTimeoutError)
+
+    def test_notification_dispatched(self):
+        device = open_fake_device(notification_interval_s=0.001)
+        dispatched = threading.Event()
+        calls = []
+
+        def on_dispatched(*args):
+            calls.append(args)
+            dispatched.set()
+
+        device.on_notification("ibi", lambda name, message: message["name"] == "I3C IBI NOTIFICATION", lambda name, message: None)
+        device.on_notification_dispatched(on_dispatched)
+        try:
+            self.assertTrue(dispatched.wait(1))
+        finally:
+            device.close()
+
+        (_, command, handler_name, duration_ns) = calls[0]
+        self.assertEqual((command, handler_name), ("I3C IBI NOTIFICATION", "ibi"))
+        self.assertGreaterEqual(duration_ns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+from supernovacontroller.sequential.scheduler import Priority
+
+TransferMode = SupernovaI3CBlockingInterface.TransferMode
+SUCCESS = {"header": {"result": "I3C_TRANSFER_SUCCESS"}}
+
+
+class FakeMemoryTarget:
+    """
+    Executes the requests of a sequence against a driver mock and answers them like a target with a 16-bit
+    addressed memory. In HDR-DDR, the command code is taken as the start address, and consecutive transfers
+    with the same command go on where the previous one ended.
+    """
+
+    def __init__(self, driver, caps1=0x01, hdr_works=True, hdr_errors=None):
+        self.driver = driver
+        self.caps1 = caps1
+        self.hdr_works = hdr_works
+        # Error of each HDR-DDR transfer, by order of the transfer. None succeeds.
+        self.hdr_errors = list(hdr_errors or [])
+        self.memory = bytearray(range(256)) * 16
+        self.transfers = []
+        self.schedules = []
+        self.hdr_cursors = {}
+
+    @contextmanager
+    def scheduling(self, priority=None, flow=None, override=True):
+        self.schedules.append((priority, flow))
+        yield
+
+    def sync_submit(self, sequence):
+        responses = []
+        for request in sequence:
+            self.driver.reset_mock()
+            request(1)
+            (name, args, _) = self.driver.method_calls[0]
+            if name == "i3cGETCAPS":
+                responses.append(dict(SUCCESS, caps1={"value": ["", self.caps1]}, caps2={"value": ["", 0]},
+                                      caps3={"value": ["", 0]}, caps4={"value": 0}))
+                continue
+
+            (_, _, mode, _, _, subaddress, payload) = args
+            self.transfers.append((name, mode, subaddress))
+            error = None
+            if mode == TransferMode.I3C_HDR_DDR:
+                error = self.hdr_errors.pop(0) if self.hdr_errors else (None if self.hdr_works else "DDR_CRC_ERROR")
+            if error is not None:
+                responses.append({"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": [error]}})
+                continue
+
+            address = int.from_bytes(bytes(subaddress), "big")
+            if mode == TransferMode.I3C_HDR_DDR:
+                command = tuple(subaddress)
+                address += self.hdr_cursors.get(command, 0)
+                self.hdr_cursors[command] = self.hdr_cursors.get(command, 0) + (payload if name == "i3cRead" else len(payload))
+            if name == "i3cRead":
+                responses.append(dict(SUCCESS, data=list(self.memory[address:address + payload])))
+            else:
+                self.memory[address:address + len(payload)] = bytes(payload)
+                responses.append(dict(SUCCESS))
+        return responses
+
+
+class TestI3CBulkTransfers(unittest.TestCase):
+    def new_interface(self, **kwargs):
+        driver = MagicMock()
+        self.target = FakeMemoryTarget(driver, **kwargs)
+        i3c = SupernovaI3CBlockingInterface(driver, self.target, MagicMock())
+        i3c.initialized = True
+        return i3c
+
+    def test_capable_targets_are_read_in_hdr_ddr(self):
+        i3c = self.new_interface()
+
+        (success, result) = i3c.bulk_read(0x08, [0x00, 0x10], 600, chunk_size=256)
+
+        self.assertTrue(success)
+        self.assertEqual(result["mode"], TransferMode.I3C_HDR_DDR)
+        self.assertEqual(result["data"], list(self.target.memory[0x10:0x10 + 600]))
+        # The command code of HDR-DDR transfers is not incremented
+        self.assertEqual([subaddress for (_, _, subaddress) in self.target.transfers], [[0x00, 0x10]] * 3)
+        self.assertIn("I3C_HDR_DDR", i3c.get_bulk_throughput()[1])
+        self.assertEqual(self.target.schedules, [(Priority.BULK, ("i3c", 0x08))])
+
+    def test_other_targets_use_sdr(self):
+        i3c = self.new_interface(caps1=0x00)
+
+        (success, result) = i3c.bulk_write(0x08, [0x00, 0x00], [0xAA] * 100)
+
+        self.assertTrue(success)
+        self.assertEqual(result["mode"], TransferMode.I3C_SDR)
+        self.assertEqual(self.target.memory[:100], bytes([0xAA] * 100))
+
+    def test_short_transfers_use_sdr(self):
+        i3c = self.new_interface()
+
+        (_, result) = i3c.bulk_read(0x08, [0x00, 0x00], 4)
+
+        self.assertEqual(result["mode"], TransferMode.I3C_SDR)
+
+    def test_failed_hdr_transfers_fall_back_to_sdr(self):
+        i3c = self.new_interface(hdr_works=False)
+
+        (success, result) = i3c.bulk_read(0x08, [0x00, 0x00], 64)
+
+        self.assertTrue(success)
+        self.assertTrue(result["fell_back"])
+        self.assertEqual(result["mode"], TransferMode.I3C_SDR)
+        self.assertEqual(i3c.supports_hdr_ddr(0x08), (True, False))
+
+    def test_fallback_resumes_from_the_failed_chunk(self):
+        i3c = self.new_interface(hdr_errors=[None, "NACK_ERROR"])
+
+        (success, result) = i3c.bulk_read(0x08, [0x00, 0x10], 600, chunk_size=256)
+
+        self.assertTrue(success)
+        self.assertTrue(result["fell_back"])
+        self.assertEqual(result["data"], list(self.target.memory[0x10:0x10 + 600]))
+        self.assertEqual([(mode, subaddress) for (_, mode, subaddress) in self.target.transfers], [
+            (TransferMode.I3C_HDR_DDR, [0x00, 0x10]),
+            (TransferMode.I3C_HDR_DDR, [0x00, 0x10]),
+            (TransferMode.I3C_HDR_DDR, [0x00, 0x10]),
+            (TransferMode.I3C_SDR, [0x01, 0x10]),
+            (TransferMode.I3C_SDR, [0x02, 0x10]),
+        ])
+        # A NACK does not show that the target can not do HDR-DDR
+        self.assertEqual(i3c.supports_hdr_ddr(0x08), (True, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
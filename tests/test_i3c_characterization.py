@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+
+
+SUCCESS = {"header": {"result": "I3C_TRANSFER_SUCCESS"}}
+
+CCC_RESPONSES = {
+    "i3cGETPID": dict(SUCCESS, pid=["0x04", "0x6a", "0x00", "0x00", "0x00", "0x00"]),
+    "i3cGETBCR": dict(SUCCESS, bcr={"value": ["", "", "0x07"]}),
+    "i3cGETDCR": dict(SUCCESS, dcr="0xa0"),
+    "i3cGETMRL": dict(SUCCESS, maxReadLength=256),
+    "i3cGETMWL": dict(SUCCESS, maxWriteLength=128),
+    "i3cGETMXDS": dict(SUCCESS, maxWr={"value": ["", "fSCL Max"]}, maxRd={"value": ["", "fSCL Max"]}, maxRdTurn=["", "0 us"]),
+    "i3cGETCAPS": dict(SUCCESS, caps1={"value": ["", "HDR-DDR"]}, caps2={"value": ["", "v1.1"]}, caps3={"value": ["", ""]}, caps4={"value": 0}),
+    "i3cGETXTIME": dict(SUCCESS, supportedModes={"value": ["", "Sync"]}, state={"value": ["", "Sync"]},
+                        frequency={"value": 0}, inaccuracy={"value": 0}),
+}
+
+FAILED_GETXTIME = {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["NACK_ERROR"]}}
+
+
+class FakeController:
+    """
+    Answers every request of a sequence with the canned response of its driver method.
+    """
+
+    def __init__(self, driver, failures=None):
+        self.driver = driver
+        self.failures = failures or {}
+        self.submissions = []
+
+    def sync_submit(self, sequence):
+        self.submissions.append(len(sequence))
+        responses = []
+        for request in sequence:
+            self.driver.reset_mock()
+            request(1)
+            responses.append(self.responses(self.driver.method_calls[0][0]))
+        return responses
+
+    def responses(self, name):
+        if name == "i3cGetTargetDeviceTable":
+            return {"table": [{
+                "staticAddress": 0x50, "dynamicAddress": 0x08, "bcr": {"value": ["", "", "0x07"]}, "dcr": 0xA0,
+                "pid": ["0x04", "0x6a", "0x00", "0x00", "0x00", "0x00"],
+            }]}
+        if name == "i3cControllerInit":
+            return {"result": "I3C_CONTROLLER_INIT_SUCCESS"}
+        return self.failures.get(name, CCC_RESPONSES[name])
+
+
+class TestI3CCharacterization(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.directory.name, "cache", "i3c_capabilities.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def new_interface(self, failures=None):
+        driver = MagicMock()
+        controller = FakeController(driver, failures)
+        i3c = SupernovaI3CBlockingInterface(driver, controller, MagicMock())
+        return (i3c, controller)
+
+    def test_targets_are_characterized_in_one_pass(self):
+        (i3c, controller) = self.new_interface({"i3cGETXTIME": FAILED_GETXTIME})
+
+        (success, capabilities) = i3c.characterize(self.cache_path)
+
+        self.assertTrue(success)
+        record = capabilities[0x08]
+        self.assertEqual(record["pid"], [0x04, 0x6A, 0, 0, 0, 0])
+        self.assertEqual(record["mrl"], 256)
+        self.assertEqual(record["caps"][0], "HDR-DDR")
+        self.assertIsNone(record["xtime"])
+        self.assertEqual(record["errors"], {"ccc_getxtime": "NACK_ERROR"})
+        self.assertFalse(record["cached"])
+        # Controller init, target table, then the 8 CCCs of the target in a single sequence
+        self.assertEqual(controller.submissions[-1], 8)
+
+    def test_records_are_reused_by_later_sessions(self):
+        self.new_interface()[0].characterize(self.cache_path)
+        with open(self.cache_path) as file:
+            self.assertIn("046A00000000", json.load(file)["targets"])
+
+        (i3c, controller) = self.new_interface()
+        (_, capabilities) = i3c.characterize(self.cache_path)
+
+        self.assertTrue(capabilities[0x08]["cached"])
+        self.assertEqual(capabilities[0x08]["mwl"], 128)
+        self.assertNotIn(8, controller.submissions)
+
+        (_, capabilities) = i3c.characterize(self.cache_path, refresh=True)
+        self.assertFalse(capabilities[0x08]["cached"])
+
+    def test_records_with_errors_are_queried_again(self):
+        (i3c, controller) = self.new_interface({"i3cGETXTIME": FAILED_GETXTIME})
+
+        i3c.characterize(self.cache_path)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+        (_, capabilities) = i3c.characterize(self.cache_path)
+        self.assertFalse(capabilities[0x08]["cached"])
+        self.assertEqual(controller.submissions.count(8), 2)
+
+        controller.failures.clear()
+        i3c.characterize(self.cache_path)
+        (_, capabilities) = i3c.characterize(self.cache_path)
+        self.assertTrue(capabilities[0x08]["cached"])
+        self.assertEqual(capabilities[0x08]["errors"], {})
+
+    def test_failure_to_save_the_cache_is_logged(self):
+        # The parent of the cache file is a file, so the cache directory cannot be created
+        blocker = os.path.join(self.directory.name, "blocker")
+        open(blocker, "w").close()
+        (i3c, _) = self.new_interface()
+
+        with self.assertLogs("supernovacontroller", level="WARNING"):
+            (success, capabilities) = i3c.characterize(os.path.join(blocker, "i3c_capabilities.json"))
+
+        self.assertTrue(success)
+        self.assertEqual(capabilities[0x08]["mwl"], 128)
+
+
+if __name__ == "__main__":
+    unittest.main()
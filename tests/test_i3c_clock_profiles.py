@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+
+PushPull = SupernovaI3CBlockingInterface.I3cPushPullTransferRate
+OpenDrain = SupernovaI3CBlockingInterface.I3cOpenDrainTransferRate
+SUCCESS = {"header": {"result": "I3C_TRANSFER_SUCCESS"}}
+
+
+class FakeTarget:
+    """
+    Executes the requests of a sequence against a driver mock and answers them like a target that corrupts
+    reads above max_rate.
+    """
+
+    def __init__(self, driver, max_rate, mxds=0x00, max_read=None):
+        self.driver = driver
+        self.max_rate = max_rate
+        self.mxds = mxds
+        self.max_read = mxds if max_read is None else max_read
+        self.read_rates = []
+
+    def sync_submit(self, sequence):
+        responses = []
+        for request in sequence:
+            self.driver.reset_mock()
+            request(1)
+            (name, args, _) = self.driver.method_calls[0]
+            if name == "i3cGETMXDS":
+                responses.append(dict(SUCCESS, maxWr={"value": ["", self.mxds]}, maxRd={"value": ["", self.max_read]}, maxRdTurn=["", "0 us"]))
+            else:
+                rate = args[3]
+                self.read_rates.append(rate)
+                data = [0x42] if rate.value <= self.max_rate.value else [0x40]
+                responses.append(dict(SUCCESS, data=data))
+        return responses
+
+
+class TestI3CClockProfiles(unittest.TestCase):
+    def setUp(self):
+        self.driver = MagicMock()
+        self.controller = MagicMock()
+        self.controller.sync_submit.return_value = [dict(SUCCESS, data=[0x42])]
+        self.i3c = SupernovaI3CBlockingInterface(self.driver, self.controller, MagicMock())
+        self.i3c.initialized = True
+
+    def submitted_rates(self):
+        self.controller.sync_submit.call_args[0][0][0](1)
+        return self.driver.method_calls[-1][1][3:5]
+
+    def test_profiles_apply_to_directed_transfers_only(self):
+        self.i3c.set_parameters(PushPull.PUSH_PULL_5_MHZ, OpenDrain.OPEN_DRAIN_250_KHZ)
+        self.i3c.set_target_parameters(0x08, PushPull.PUSH_PULL_12_5_MHZ)
+
+        self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1)
+        self.assertEqual(self.submitted_rates(), (PushPull.PUSH_PULL_12_5_MHZ, OpenDrain.OPEN_DRAIN_250_KHZ))
+
+        self.i3c.read(0x09, self.i3c.TransferMode.I3C_SDR, [0x00], 1)
+        self.assertEqual(self.submitted_rates(), (PushPull.PUSH_PULL_5_MHZ, OpenDrain.OPEN_DRAIN_250_KHZ))
+
+        self.controller.sync_submit.return_value = [dict(SUCCESS, maxReadLength=256)]
+        self.i3c.ccc_getmrl(0x08)
+        self.controller.sync_submit.call_args[0][0][0](1)
+        self.assertEqual(self.driver.method_calls[-1][1][2], PushPull.PUSH_PULL_12_5_MHZ)
+
+        self.controller.sync_submit.return_value = [dict(SUCCESS, data=[0x42])]
+        self.i3c.prepare_read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1).execute()
+        self.assertEqual(self.submitted_rates(), (PushPull.PUSH_PULL_12_5_MHZ, OpenDrain.OPEN_DRAIN_250_KHZ))
+
+    def test_profile_follows_address_changes(self):
+        self.i3c.set_target_parameters(0x08, PushPull.PUSH_PULL_10_MHZ)
+        self.controller.sync_submit.return_value = [SUCCESS]
+
+        self.i3c.ccc_setnewda(0x08, 0x0A)
+
+        self.assertEqual(self.i3c.get_target_parameters(0x0A)[1][0], PushPull.PUSH_PULL_10_MHZ)
+        self.assertEqual(self.i3c.get_target_parameters(0x08)[1][0], self.i3c.push_pull_clock_freq_mhz)
+
+        self.i3c.clear_target_parameters()
+        self.assertEqual(self.i3c.clock_profiles, {})
+
+    def test_tuner_selects_the_fastest_error_free_rate(self):
+        target = FakeTarget(self.driver, PushPull.PUSH_PULL_7_5_MHZ)
+        self.i3c = SupernovaI3CBlockingInterface(self.driver, target, MagicMock())
+        self.i3c.initialized = True
+
+        (success, result) = self.i3c.tune_target_clock(0x08, [0x75], 1, iterations=4)
+
+        self.assertTrue(success)
+        self.assertEqual(result["push_pull"], PushPull.PUSH_PULL_7_5_MHZ)
+        self.assertEqual(list(result["results"].values()), [False, False, True])
+        self.assertEqual(self.i3c.get_target_parameters(0x08)[1][0], PushPull.PUSH_PULL_7_5_MHZ)
+
+    def test_tuner_honours_getmxds_limits(self):
+        # Maximum sustained data rate of 6 MHz
+        target = FakeTarget(self.driver, PushPull.PUSH_PULL_12_5_MHZ, mxds=0x02)
+        self.i3c = SupernovaI3CBlockingInterface(self.driver, target, MagicMock())
+        self.i3c.initialized = True
+
+        (success, result) = self.i3c.tune_target_clock(0x08, [0x75], 1, iterations=4)
+
+        self.assertTrue(success)
+        self.assertEqual(result["limit_mhz"], 6)
+        self.assertEqual(result["push_pull"], PushPull.PUSH_PULL_5_MHZ)
+        self.assertNotIn(PushPull.PUSH_PULL_6_25_MHZ, target.read_rates)
+
+    def test_read_turnaround_does_not_limit_the_rate(self):
+        # tSCO of at most 9 ns with fSCL Max reads
+        target = FakeTarget(self.driver, PushPull.PUSH_PULL_12_5_MHZ, max_read=0x08)
+        self.i3c = SupernovaI3CBlockingInterface(self.driver, target, MagicMock())
+        self.i3c.initialized = True
+
+        (success, result) = self.i3c.tune_target_clock(0x08, [0x75], 1, iterations=4)
+
+        self.assertTrue(success)
+        self.assertIsNone(result["limit_mhz"])
+        self.assertEqual(result["push_pull"], PushPull.PUSH_PULL_12_5_MHZ)
+
+
+if __name__ == "__main__":
+    unittest.main()
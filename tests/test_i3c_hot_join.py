@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.commands.definitions import I3cChangeDynAddrError
+
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+
+PID = ["0x04", "0x6a", "0x00", "0x00", "0x00", "0x01"]
+PID_VALUE = 0x046A00000001
+
+
+def hot_join(address, pid=PID):
+    return {
+        "id": 0,
+        "name": "I3C IBI NOTIFICATION",
+        "header": {"address": address, "type": "IBI_HOT_JOIN"},
+        "pid": pid,
+        "bcr": 0x27,
+        "dcr": 0x63,
+    }
+
+
+class TestI3CHotJoin(unittest.TestCase):
+    def setUp(self):
+        self.controller = MagicMock()
+        subscription = MagicMock()
+        self.i3c = SupernovaI3CBlockingInterface(MagicMock(), self.controller, subscription)
+        self.i3c.initialized = True
+
+        subscriptions = {call.kwargs["name"]: call.kwargs for call in subscription.call_args_list}
+        self.subscription = subscriptions["I3C Hot-Join Notification"]
+
+    def notify(self, message):
+        if self.subscription["filter_func"]("I3C Hot-Join Notification", message):
+            self.subscription["handler_func"]("I3C Hot-Join Notification", message)
+
+    def test_joined_target_is_added_to_the_table(self):
+        joins = []
+        self.i3c.on_hot_join(lambda target, latency_ns: joins.append((target, latency_ns)))
+
+        self.notify(hot_join(0x0A))
+        self.notify({"id": 0, "name": "I3C IBI NOTIFICATION", "header": {"address": 0x08, "type": "IBI_NORMAL"}, "payload": []})
+
+        (success, targets) = self.i3c.cached_targets(typed=True)
+        self.assertTrue(success)
+        self.assertEqual(targets, [SupernovaI3CBlockingInterface.I3CTarget(0, 0x0A, 0x27, 0x63, PID_VALUE)])
+        self.assertEqual([target for (target, _) in joins], targets)
+        self.assertEqual(self.i3c.get_hot_join_statistics()[1]["joins"], 1)
+        # No transfer is needed to use the new target
+        self.controller.sync_submit.assert_not_called()
+
+    def test_rejoining_target_replaces_its_entry(self):
+        self.notify(hot_join(0x0A))
+        self.notify(hot_join(0x0B))
+
+        (_, targets) = self.i3c.cached_targets()
+        self.assertEqual([target["dynamic_address"] for target in targets], [0x0B])
+
+    def test_address_plan_is_applied(self):
+        self.controller.sync_submit.return_value = [{"result": I3cChangeDynAddrError.I3C_CHANGE_DYNAMIC_ADDRESS_SUCCESS}]
+        self.i3c.set_hot_join_address_plan({PID_VALUE: 0x30})
+        joins = []
+        self.i3c.on_hot_join(lambda target, latency_ns: joins.append(target))
+
+        self.notify(hot_join(0x0A))
+
+        self.controller.sync_submit.assert_called_once()
+        self.assertEqual(joins[0].dynamic_address, 0x30)
+        self.assertEqual([target.dynamic_address for target in self.i3c.cached_targets(typed=True)[1]], [0x30])
+
+    def test_failed_address_plan_keeps_the_assigned_address(self):
+        self.controller.sync_submit.return_value = [{"result": "I3C_CHANGE_DYNAMIC_ADDRESS_FAILED"}]
+        self.i3c.set_hot_join_address_plan({bytes.fromhex("046a00000001"): 0x30})
+
+        self.notify(hot_join(0x0A))
+
+        (_, statistics) = self.i3c.get_hot_join_statistics()
+        self.assertEqual((statistics["joins"], statistics["address_plan_failures"]), (1, 1))
+        self.assertEqual([target.dynamic_address for target in self.i3c.cached_targets(typed=True)[1]], [0x0A])
+
+    def test_hot_joins_are_handled_on_a_worker(self):
+        self.assertTrue(self.subscription["threaded"])
+
+    def test_failing_listener_does_not_stop_the_others(self):
+        joins = []
+
+        def failing_listener(target, latency_ns):
+            raise RuntimeError("listener failed")
+
+        self.i3c.on_hot_join(failing_listener)
+        self.i3c.on_hot_join(lambda target, latency_ns: joins.append(target))
+
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.notify(hot_join(0x0A))
+
+        self.assertEqual([target.dynamic_address for target in joins], [0x0A])
+
+
+if __name__ == "__main__":
+    unittest.main()
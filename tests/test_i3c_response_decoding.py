@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c import I3CTarget, SupernovaI3CBlockingInterface
+
+
+def table_entry(static_address, dynamic_address, bcr, dcr, pid):
+    return {
+        "staticAddress": static_address,
+        "dynamicAddress": dynamic_address,
+        "bcr": {"value": ["", "", f"{bcr:#04x}"]},
+        "dcr": dcr,
+        "pid": [f"{byte:#04x}" for byte in pid],
+    }
+
+
+class TestI3CResponseDecoding(unittest.TestCase):
+    def setUp(self):
+        self.controller = MagicMock()
+        self.i3c = SupernovaI3CBlockingInterface(MagicMock(), self.controller, MagicMock())
+        self.i3c.initialized = True
+        self.controller.sync_submit.return_value = [{"table": [
+            table_entry(0x50, 0x08, 0x07, 0xA0, [0x04, 0x6A, 0x00, 0x00, 0x00, 0x00]),
+            table_entry(0x51, 0x09, 0x26, 0x00, [0x02, 0x08, 0x00, 0x00, 0x00, 0x01]),
+        ]}]
+
+    def test_targets_keeps_the_legacy_shape(self):
+        (success, targets) = self.i3c.targets()
+
+        self.assertTrue(success)
+        self.assertEqual(targets[0], {
+            "static_address": 0x50,
+            "dynamic_address": 0x08,
+            "bcr": 0x07,
+            "dcr": 0xA0,
+            "pid": ["0x04", "0x6a", "0x00", "0x00", "0x00", "0x00"],
+        })
+
+    def test_typed_targets(self):
+        (_, targets) = self.i3c.targets(typed=True)
+
+        self.assertEqual(targets[1], I3CTarget(0x51, 0x09, 0x26, 0x00, 0x020800000001))
+        self.assertEqual(targets[1].pid_bytes, bytes([0x02, 0x08, 0x00, 0x00, 0x00, 0x01]))
+        self.assertFalse(hasattr(targets[1], "__dict__"))
+
+    def test_find_target_by_pid_in_any_representation(self):
+        for pid in [["0x04", "0x6a", "0x00", "0x00", "0x00", "0x00"], 0x046A00000000, bytes([0x04, 0x6A, 0, 0, 0, 0])]:
+            (found, target) = self.i3c.find_target_device_by_pid(pid)
+            self.assertTrue(found)
+            self.assertEqual(target["dynamic_address"], 0x08)
+
+        self.assertEqual(self.i3c.find_target_device_by_pid(0x1234), (False, None))
+        self.assertEqual(self.i3c.find_target_device_by_pid(0x020800000001, typed=True)[1].dynamic_address, 0x09)
+
+    def test_process_response_dispatch(self):
+        success = {"header": {"result": "I3C_TRANSFER_SUCCESS"}}
+
+        self.assertEqual(self.i3c._process_response("read", [dict(success, data=[1, 2])]), (True, [1, 2]))
+        self.assertEqual(self.i3c._process_response("ccc_getpid", [dict(success, pid=["0x04", "0x6a"])]), (True, [0x04, 0x6A]))
+        self.assertEqual(self.i3c._process_response("ccc_getmrl", [dict(success, maxReadLength=256)]), (True, 256))
+        self.assertEqual(self.i3c._process_response("ccc_broadcast_enec", [success]), (True, None))
+
+        nack = {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["NACK_ERROR"]}}
+        self.assertEqual(self.i3c._process_response("write", [nack]), (False, "NACK_ERROR"))
+
+        daa_failure = {"header": {"result": "DAA_FAILED"}, "invalidAddresses": [0x08]}
+        self.assertEqual(self.i3c._process_response("ccc_entdaa", [daa_failure]), (False, {"error": "DAA_FAILED", "error_data": [0x08]}))
+
+    def test_typed_ccc_responses(self):
+        success = {"header": {"result": "I3C_TRANSFER_SUCCESS"}}
+        self.controller.sync_submit.side_effect = [
+            [dict(success, pid=["0x04", "0x6a", "0x00", "0x00", "0x00", "0x01"])],
+            [dict(success, bcr={"value": ["", "", "0x27"]})],
+            [dict(success, dcr="0x63")],
+            [dict(success, bcr={"value": ["", "", "0x27"]})],
+        ]
+
+        self.assertEqual(self.i3c.ccc_getpid(0x08, typed=True), (True, 0x046A00000001))
+        self.assertEqual(self.i3c.ccc_getbcr(0x08, typed=True), (True, 0x27))
+        self.assertEqual(self.i3c.ccc_getdcr(0x08, typed=True), (True, 0x63))
+        self.assertEqual(self.i3c.ccc_getbcr(0x08), (True, "27"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.errors import BackendError
+from supernovacontroller.sequential.i3c_target import SupernovaI3CTargetBlockingInterface
+from supernovacontroller.sequential.i3c_target_personality import FifoRegister, I3CTargetPersonality, Register
+
+
+class FakeTargetMemory:
+    """
+    Stands for the target interface, keeping the target memory in a dictionary.
+
+    The controller transfers wait until the personality handled their notification, as the next transfer would
+    on a real bus.
+    """
+
+    def __init__(self):
+        self.memory = {}
+        self.flushes = []
+        self.listeners = []
+        self.notified = 0
+        self.personality = None
+        self.error = None
+
+    def write_memory_blocks(self, blocks):
+        if self.error is not None:
+            raise self.error
+        self.flushes.append(blocks)
+        for (address, buffer) in blocks:
+            for offset, byte in enumerate(buffer):
+                self.memory[address + offset] = byte
+        return (True, None)
+
+    def add_notification_listener(self, callback):
+        self.listeners.append(callback)
+        self.notified = 0
+
+    def remove_notification_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def controller_write(self, address, data):
+        """
+        Writes the memory like the controller does, then notifies the listeners.
+        """
+        for offset, byte in enumerate(data):
+            self.memory[address + offset] = byte
+        self.__notify("I3C_TARGET_WRITE", address, data)
+
+    def controller_read(self, address, length):
+        data = [self.memory.get(address + offset, 0) for offset in range(length)]
+        self.__notify("I3C_TARGET_READ", address, data)
+        return data
+
+    def __notify(self, notification_type, address, data):
+        notification = {"name": "I3C TARGET NOTIFICATION", "notification_type": notification_type,
+                        "memory_address": address, "transfer_length": len(data), "data": list(data)}
+        if not self.listeners:
+            return
+        self.notified += 1
+        for listener in list(self.listeners):
+            listener(notification)
+
+        deadline = time.monotonic() + 1
+        while self.personality.get_statistics()["notifications"] < self.notified and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+
+class TestI3CTargetPersonality(unittest.TestCase):
+    def setUp(self):
+        self.target = FakeTargetMemory()
+        self.personality = I3CTargetPersonality(self.target, [
+            Register("WHO_AM_I", 0x00, 0x42, access=Register.READ_ONLY),
+            Register("STATUS", 0x01, 0x0F, access=Register.WRITE_1_TO_CLEAR),
+            Register("THRESHOLD", 0x02, 0x1234, width=2),
+            FifoRegister("FIFO_DATA", 0x10, width=4),
+        ])
+        self.target.personality = self.personality
+        self.personality.attach()
+
+    def tearDown(self):
+        self.personality.detach()
+
+    def test_attach_writes_the_register_map(self):
+        self.assertEqual(self.target.controller_read(0x00, 4), [0x42, 0x0F, 0x34, 0x12])
+        # Adjacent registers are written as a single block
+        self.assertEqual([address for (address, _) in self.target.flushes[0]], [0x00, 0x10])
+
+    def test_read_only_register_ignores_writes(self):
+        self.target.controller_write(0x00, [0x99])
+
+        self.assertEqual(self.target.controller_read(0x00, 1), [0x42])
+
+    def test_write_1_to_clear(self):
+        self.target.controller_write(0x01, [0x05])
+
+        self.assertEqual(self.personality.get("STATUS"), 0x0A)
+        self.assertEqual(self.target.controller_read(0x01, 1), [0x0A])
+
+    def test_partial_write_of_a_wide_write_1_to_clear_register(self):
+        self.personality.detach()
+        self.personality = I3CTargetPersonality(self.target, [
+            Register("STATUS", 0x00, 0x0303, width=2, access=Register.WRITE_1_TO_CLEAR),
+        ])
+        self.target.personality = self.personality
+        self.personality.attach()
+
+        self.target.controller_write(0x00, [0x01])
+
+        self.assertEqual(self.personality.get("STATUS"), 0x0302)
+        self.assertEqual(self.target.controller_read(0x00, 2), [0x02, 0x03])
+
+    def test_partial_write_of_a_wide_register(self):
+        self.target.controller_write(0x03, [0xAB])
+
+        self.assertEqual(self.personality.get("THRESHOLD"), 0xAB34)
+
+    def test_fifo_is_consumed_by_reads(self):
+        self.personality.push("FIFO_DATA", list(range(1, 7)))
+
+        self.assertEqual(self.target.controller_read(0x10, 4), [1, 2, 3, 4])
+        self.assertEqual(self.target.controller_read(0x10, 4), [5, 6, 0, 0])
+        self.assertEqual(self.target.controller_read(0x10, 1), [0])
+
+    def test_side_effects_are_flushed_once(self):
+        def soft_reset(personality, register, value):
+            if value & 0x80:
+                personality.set("STATUS", 0x00)
+                personality.set("CTRL", 0x00)
+
+        self.personality.detach()
+        self.personality = I3CTargetPersonality(self.target, [
+            Register("STATUS", 0x00, 0x0F, access=Register.WRITE_1_TO_CLEAR),
+            Register("CTRL", 0x01, 0x00, on_write=soft_reset),
+        ])
+        self.target.personality = self.personality
+        self.personality.attach()
+        self.target.flushes.clear()
+
+        self.target.controller_write(0x01, [0x80])
+
+        self.assertEqual(self.target.controller_read(0x00, 2), [0x00, 0x00])
+        self.assertEqual(self.target.flushes, [[(0x00, [0x00, 0x00])]])
+        self.assertEqual(self.personality.get_statistics()["notifications"], 2)
+
+    def test_failed_writes_are_retried(self):
+        self.target.error = BackendError("USB disconnected")
+        self.target.controller_write(0x01, [0x05])
+
+        self.assertEqual(self.personality.get_statistics()["memory_write_errors"], 1)
+        self.assertEqual(self.target.memory[0x01], 0x05)
+
+        self.target.error = None
+        self.assertEqual(self.personality.flush(), (True, None))
+        self.assertEqual(self.target.memory[0x01], 0x0A)
+
+    def test_notifications_are_handled_off_the_notification_thread(self):
+        threads = []
+
+        def record_thread(personality, register, value):
+            threads.append(threading.current_thread())
+
+        self.personality.by_name["THRESHOLD"].on_write = record_thread
+        self.target.controller_write(0x02, [0x00])
+
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_overlapping_registers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            I3CTargetPersonality(self.target, [Register("A", 0x00, width=2), Register("B", 0x01)])
+
+    def test_detach(self):
+        self.personality.detach()
+        self.target.controller_write(0x00, [0x99])
+
+        self.assertEqual(self.target.memory[0x00], 0x99)
+
+
+class TestWriteMemoryBlocks(unittest.TestCase):
+    def test_blocks_are_written_in_one_sequence(self):
+        driver = MagicMock()
+        controller = MagicMock()
+        controller.sync_submit.return_value = [{"result": "I3C_TARGET_WRITE_MEM_SUCCESS"}] * 2
+        target = SupernovaI3CTargetBlockingInterface(driver, controller, MagicMock())
+
+        self.assertEqual(target.write_memory_blocks([(0x00, [0x01]), (0x10, [0x02, 0x03])]), (True, None))
+
+        sequence = controller.sync_submit.call_args[0][0]
+        for (transfer_id, request) in enumerate(sequence, start=1):
+            request(transfer_id)
+        self.assertEqual([call.args for call in driver.i3cTargetWriteMemory.call_args_list],
+                         [(1, 0x00, [0x01]), (2, 0x10, [0x02, 0x03])])
+
+    def test_listeners_receive_every_notification(self):
+        subscription = MagicMock()
+        target = SupernovaI3CTargetBlockingInterface(MagicMock(), MagicMock(), subscription)
+        received = []
+        target.add_notification_listener(received.append)
+
+        handler = subscription.call_args.kwargs["handler_func"]
+        handler("I3C TARGET NOTIFICATION", {"name": "I3C TARGET NOTIFICATION"})
+        target.remove_notification_listener(received.append)
+        handler("I3C TARGET NOTIFICATION", {"name": "I3C TARGET NOTIFICATION"})
+
+        self.assertEqual(len(received), 1)
+        self.assertTrue(target.wait_for_notification(0)[0])
+
+    def test_failing_listener_does_not_stop_the_others(self):
+        subscription = MagicMock()
+        target = SupernovaI3CTargetBlockingInterface(MagicMock(), MagicMock(), subscription)
+        received = []
+
+        def failing_listener(notification):
+            raise RuntimeError("listener failed")
+
+        target.add_notification_listener(failing_listener)
+        target.add_notification_listener(received.append)
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            subscription.call_args.kwargs["handler_func"]("I3C TARGET NOTIFICATION", {"name": "I3C TARGET NOTIFICATION"})
+
+        self.assertEqual(len(received), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c_target import SupernovaI3CTargetBlockingInterface
+from supernovacontroller.sequential.i3c_target_stream import I3CTargetStream, counter_pattern
+
+
+class FakeTargetMemory:
+    """
+    Stands for the target interface, keeping the target memory in a list. Memory writes can be held back to
+    simulate a slow host.
+    """
+
+    def __init__(self, size=1024):
+        self.memory = [None] * size
+        self.listeners = []
+        self.writes_allowed = threading.Semaphore(1000)
+        self.written = threading.Semaphore(0)
+
+    def write_memory(self, subaddress, buffer):
+        self.writes_allowed.acquire()
+        self.memory[subaddress:subaddress + len(buffer)] = buffer
+        self.written.release()
+        return (True, None)
+
+    def add_notification_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_notification_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def controller_read(self, address, length):
+        data = self.memory[address:address + length]
+        notification = {"name": "I3C TARGET NOTIFICATION", "notification_type": "I3C_TARGET_READ",
+                        "memory_address": address, "transfer_length": length, "data": data}
+        for listener in list(self.listeners):
+            listener(notification)
+        return data
+
+
+class TestI3CTargetStream(unittest.TestCase):
+    def setUp(self):
+        self.target = FakeTargetMemory()
+        self.stream = I3CTargetStream(self.target)
+        self.assertEqual(self.stream.start(), (True, None))
+        for _ in range(2):
+            self.target.written.acquire()
+
+    def tearDown(self):
+        self.stream.stop()
+
+    def wait_for_refill(self):
+        self.assertTrue(self.target.written.acquire(timeout=1))
+
+    def test_stream_is_continuous(self):
+        received = []
+        for _ in range(3):
+            for address in range(0, 1024, 256):
+                received += self.target.controller_read(address, 256)
+                if address % 512 == 256:
+                    self.wait_for_refill()
+
+        expected = counter_pattern()(3 * 1024)
+        self.assertEqual(received, expected)
+
+        statistics = self.stream.get_statistics()
+        self.assertEqual((statistics["bytes_read"], statistics["refills"], statistics["underruns"]), (3 * 1024, 2 + 6, 0))
+        self.assertGreater(statistics["bytes_per_second"], 0)
+
+    def test_reading_a_half_before_its_refill_is_an_underrun(self):
+        self.target.writes_allowed = threading.Semaphore(0)
+
+        self.target.controller_read(0, 512)
+        self.target.controller_read(512, 512)
+        # The first half was not refilled yet
+        self.target.controller_read(0, 256)
+
+        self.assertEqual(self.stream.get_statistics()["underruns"], 1)
+        self.target.writes_allowed.release(2)
+
+    def test_writes_and_other_notifications_are_ignored(self):
+        for listener in self.target.listeners:
+            listener({"name": "I3C TARGET NOTIFICATION", "notification_type": "I3C_TARGET_WRITE",
+                      "memory_address": 0, "transfer_length": 512, "data": [0] * 512})
+
+        self.assertEqual(self.stream.get_statistics()["bytes_read"], 0)
+
+    def test_odd_memory_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            I3CTargetStream(self.target, memory_size=1023)
+
+
+class TestStartStreaming(unittest.TestCase):
+    def test_start_streaming_fills_the_memory(self):
+        driver = MagicMock()
+        controller = MagicMock()
+        controller.sync_submit.return_value = [{"result": "I3C_TARGET_WRITE_MEM_SUCCESS"}]
+        target = SupernovaI3CTargetBlockingInterface(driver, controller, MagicMock())
+
+        (success, stream) = target.start_streaming(memory_size=8)
+        stream.stop()
+
+        self.assertTrue(success)
+        for sequence in [call.args[0] for call in controller.sync_submit.call_args_list]:
+            sequence[0](1)
+        self.assertEqual([call.args[1:] for call in driver.i3cTargetWriteMemory.call_args_list],
+                         [(0, [0, 1, 2, 3]), (4, [4, 5, 6, 7])])
+        self.assertEqual(target.i3c_notification.listeners, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
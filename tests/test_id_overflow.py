@@ -1,8 +1,7 @@
-import threading
 import unittest
 import os
 from supernovacontroller.sequential import SupernovaDevice
-from supernovacontroller.errors import DeviceOpenError
+from supernovacontroller.errors import BackendError, DeviceOpenError
 
 class TestSupernovaControllerIdOverflow(unittest.TestCase):
     @classmethod
@@ -17,29 +16,17 @@ class TestSupernovaControllerIdOverflow(unittest.TestCase):
         if self.use_simulator:
             self.skipTest("For real device only")
 
-        d = SupernovaDevice(start_id=65535)
-        timeout = 3
+        # A lost response makes open() fail when the deadline expires instead of hanging
+        d = SupernovaDevice(start_id=65535, default_timeout=3)
 
-        device_info = None
-        device_error = None
-        def open_device():
-            nonlocal device_info, device_error
-            try:
-                device_info = d.open()
-            except DeviceOpenError as e:
-                device_error = e
+        try:
+            device_info = d.open()
+        except BackendError as e:
+            self.fail(f"Transaction ID over 65535 timed out: {e}")
+        except DeviceOpenError as e:
+            self.fail(f"Failed to open device: {e}")
 
-        thread = threading.Thread(target=open_device, daemon=True)
-        thread.start()
-        thread.join(timeout)
-
-        if thread.is_alive():
-            self.fail("Transaction ID over 65535 timed out")
-        else:
-            if isinstance(device_error, DeviceOpenError):
-                self.fail(f"Failed to open device: {device_error}")
-            else:
-              self.assertIsNotNone(device_info, "device_info is None")
+        self.assertIsNotNone(device_info, "device_info is None")
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+import urllib.request
+
+from supernovacontroller.metrics import MetricsHTTPExporter, MetricsTextfileExporter, TransferMetrics, render
+from supernovacontroller.metrics.collector import response_errors
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.soak import FakeSupernovaDriver
+
+
+def open_fake_device():
+    device = SupernovaDevice(default_timeout=1.0)
+    device.driver = FakeSupernovaDriver(latency_s=0.0001, notification_interval_s=0.001)
+    device.open()
+    return device
+
+
+class TestTransferMetrics(unittest.TestCase):
+    def test_error_codes_are_decoded(self):
+        self.assertEqual(response_errors({"name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}), [])
+        self.assertEqual(response_errors({"name": "I2C WRITE", "status": "NACK_ERROR"}), ["NACK_ERROR"])
+        self.assertEqual(response_errors({"header": {"result": "I3C_TRANSFER_SUCCESS"}, "descriptor": {"errors": []}}), [])
+        self.assertEqual(response_errors({"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["NACK"]}}), ["NACK"])
+        self.assertEqual(response_errors({"usb_error": "CMD_SUCCESSFUL", "manager_error": "SPI_NO_ERROR",
+                                          "driver_error": "SPI_DRIVER_BUSY"}), ["SPI_DRIVER_BUSY"])
+
+    def test_responses_are_counted_per_interface_and_command(self):
+        metrics = TransferMetrics()
+
+        metrics.record_response({"name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}, 200_000)
+        metrics.record_response({"name": "I2C WRITE", "status": "NACK_ERROR"}, 3_000_000)
+        metrics.record_response({"name": "GET USB STRING", "message": "FAKE"})
+        metrics.record_notification({"name": "I3C IBI NOTIFICATION"})
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["transfers"], {("i2c", "I2C WRITE"): 2, ("system", "GET USB STRING"): 1})
+        self.assertEqual(snapshot["errors"], {("i2c", "I2C WRITE", "NACK_ERROR"): 1})
+        self.assertEqual(snapshot["notifications"], {"I3C IBI NOTIFICATION": 1})
+        histogram = snapshot["latency"]["i2c"]
+        self.assertEqual(histogram["count"], 2)
+        self.assertEqual(dict(histogram["buckets"])[0.00025], 1)
+        self.assertEqual(histogram["buckets"][-1][1], 2)
+
+
+class TestExporters(unittest.TestCase):
+    def setUp(self):
+        self.device = open_fake_device()
+        self.i2c = self.device.create_interface("i2c")
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_render(self):
+        self.device.enable_metrics()
+        self.i2c.write(0x50, [0x00], [0x01])
+        time.sleep(0.05)
+
+        exposition = render({"bench": self.device})
+
+        self.assertTrue(exposition.endswith("# EOF\n"))
+        self.assertIn('supernova_transfers_total{device="bench",interface="i2c",command="I2C WRITE"} 1', exposition)
+        self.assertIn('supernova_transfer_latency_seconds_bucket{device="bench",interface="i2c",le="+Inf"} 1', exposition)
+        self.assertIn('supernova_queue_depth{device="bench",queue="pending_sequences"} 0', exposition)
+        self.assertIn('supernova_notifications_total{device="bench",name="I3C IBI NOTIFICATION"}', exposition)
+        self.assertEqual(exposition.count("# TYPE supernova_transfers counter"), 1)
+
+    def test_http_exporter(self):
+        exporter = MetricsHTTPExporter({"bench": self.device}, port=0).start()
+        try:
+            self.i2c.write(0x50, [0x00], [0x01])
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=5) as response:
+                content_type = response.headers["Content-Type"]
+                body = response.read().decode()
+        finally:
+            exporter.close()
+
+        self.assertTrue(content_type.startswith("application/openmetrics-text"))
+        self.assertIn('supernova_transfers_total{device="bench",interface="i2c",command="I2C WRITE"} 1', body)
+
+    def test_textfile_exporter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "supernova.prom")
+            exporter = MetricsTextfileExporter({"bench": self.device}, path, interval_s=0.01).start()
+            self.i2c.write(0x50, [0x00], [0x01])
+            exporter.close()
+
+            with open(path) as file:
+                exposition = file.read()
+            self.assertEqual(os.listdir(directory), ["supernova.prom"])
+
+        self.assertIn('supernova_transfers_total{device="bench",interface="i2c",command="I2C WRITE"} 1', exposition)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.sequential.notification_worker import NotificationWorker
+from supernovacontroller.soak import FakeSupernovaDriver
+
+
+class TestNotificationWorker(unittest.TestCase):
+    def test_notifications_are_handled_in_order(self):
+        handled = []
+        done = threading.Event()
+
+        def run(message):
+            handled.append(message)
+            if message == 99:
+                done.set()
+
+        worker = NotificationWorker("test", run)
+        for message in range(100):
+            worker.submit(message)
+
+        self.assertTrue(done.wait(1))
+        worker.stop()
+        self.assertEqual(handled, list(range(100)))
+        self.assertEqual(worker.get_statistics()["dispatched"], 100)
+
+    def test_oldest_notifications_are_dropped_when_full(self):
+        release = threading.Event()
+        handled = []
+        worker = NotificationWorker("test", lambda message: (release.wait(1), handled.append(message)), max_pending=4)
+
+        worker.submit(0)
+        # The first notification is being handled, so it does not count as pending
+        while worker.get_statistics()["pending"]:
+            time.sleep(0.001)
+        for message in range(1, 8):
+            worker.submit(message)
+
+        statistics = worker.get_statistics()
+        self.assertEqual((statistics["pending"], statistics["peak_pending"], statistics["dropped"]), (4, 4, 3))
+
+        release.set()
+        while worker.get_statistics()["dispatched"] < 5:
+            time.sleep(0.001)
+        worker.stop()
+        self.assertEqual(handled, [0, 4, 5, 6, 7])
+
+    def test_failing_handler_keeps_the_worker_running(self):
+        handled = threading.Event()
+
+        def run(message):
+            if message == "fail":
+                raise RuntimeError(message)
+            handled.set()
+
+        worker = NotificationWorker("test", run)
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            worker.submit("fail")
+            worker.submit("ok")
+            self.assertTrue(handled.wait(1))
+        worker.stop()
+
+
+class TestThreadedSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.device = SupernovaDevice()
+        self.device.driver = FakeSupernovaDriver(notification_interval_s=0.001)
+        self.device.open()
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_slow_handler_does_not_delay_other_subscriptions(self):
+        release = threading.Event()
+        uart_received = threading.Event()
+
+        self.device.on_notification("slow-ibi", lambda name, message: message["name"] == "I3C IBI NOTIFICATION",
+                                    lambda name, message: release.wait(2), threaded=True, max_pending=8)
+        self.device.on_notification("uart", lambda name, message: message["name"] == "UART CONTROLLER RECEIVE MESSAGE",
+                                    lambda name, message: uart_received.set())
+        try:
+            self.assertTrue(uart_received.wait(1))
+            # The IBIs keep arriving while the handler is stuck
+            time.sleep(0.05)
+            statistics = self.device.get_notification_statistics()["slow-ibi"]
+            self.assertEqual(statistics["pending"], 8)
+            self.assertGreater(statistics["dropped"], 0)
+        finally:
+            release.set()
+
+    def test_failing_handler_does_not_hide_notifications_from_other_subscriptions(self):
+        uart_received = threading.Event()
+
+        def fail(name, message):
+            raise RuntimeError(name)
+
+        is_uart = lambda name, message: message["name"] == "UART CONTROLLER RECEIVE MESSAGE"
+        self.device.on_notification("failing", is_uart, fail)
+        self.device.on_notification("uart", is_uart, lambda name, message: uart_received.set())
+
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.assertTrue(uart_received.wait(1))
+
+    def test_removing_a_threaded_subscription_stops_its_worker(self):
+        self.device.on_notification("ibi", lambda name, message: True, lambda name, message: None, threaded=True)
+        worker = self.device.notification_workers["ibi"]
+
+        self.device.remove_notification("ibi")
+
+        self.assertFalse(worker.thread.is_alive())
+        self.assertEqual(self.device.get_notification_statistics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from transfer_controller import TransferController
+from BinhoSupernova.commands.definitions import TransferMode
+
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+from supernovacontroller.sequential.spi_controller import SupernovaSPIControllerBlockingInterface
+
+
+def id_gen():
+    i = 0
+    while True:
+        i += 1
+        yield i
+
+
+class TestPreparedTransfers(unittest.TestCase):
+    def setUp(self):
+        self.controller = TransferController(id_gen())
+        self.driver = MagicMock()
+        self.counter = 0
+
+        def respond(id, response):
+            response["id"] = id
+            threading.Thread(target=self.controller.handle_response, kwargs={"transfer_id": id, "response": response}, daemon=True).start()
+
+        def i2c_read_from(id, address, register, length):
+            self.counter += 1
+            respond(id, {"name": "I2C READ FROM", "status": "NO_TRANSFER_ERROR", "data": [self.counter] * length})
+
+        def i3c_read(id, address, mode, push_pull, open_drain, subaddress, length):
+            self.counter += 1
+            respond(id, {"header": {"result": "I3C_TRANSFER_SUCCESS"}, "data": [self.counter] * length})
+
+        def i3c_write(id, address, mode, push_pull, open_drain, subaddress, buffer):
+            respond(id, {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["I3C_NACK"]}})
+
+        self.driver.i2cReadFrom.side_effect = i2c_read_from
+        self.driver.i3cRead.side_effect = i3c_read
+        self.driver.i3cWrite.side_effect = i3c_write
+        self.driver.i3cControllerInit.side_effect = lambda id: respond(id, {"result": "I3C_CONTROLLER_INIT_SUCCESS"})
+
+    def test_i2c_prepared_read(self):
+        i2c = SupernovaI2CBlockingInterface(self.driver, self.controller, MagicMock())
+        prepared = i2c.prepare_read(0x50, [0x10], 2)
+
+        self.assertEqual(prepared.execute(), (True, [1, 1]))
+        self.assertEqual(prepared.execute_many(3), [(True, [2, 2]), (True, [3, 3]), (True, [4, 4])])
+        self.assertEqual(prepared.execute_many(0), [])
+        self.driver.i2cReadFrom.assert_called_with(unittest.mock.ANY, 0x50, [0x10], 2)
+
+    def test_i3c_prepared_transfers_match_the_blocking_methods(self):
+        i3c = SupernovaI3CBlockingInterface(self.driver, self.controller, MagicMock())
+        read = i3c.prepare_read(0x08, TransferMode.I3C_SDR, [0x1D], 2)
+        write = i3c.prepare_write(0x08, TransferMode.I3C_SDR, [0x4E], [0x0F])
+
+        self.assertEqual(read.execute(), (True, [1, 1]))
+        self.assertEqual(i3c.read(0x08, TransferMode.I3C_SDR, [0x1D], 2), (True, [2, 2]))
+        self.assertEqual(write.execute(), i3c.write(0x08, TransferMode.I3C_SDR, [0x4E], [0x0F]))
+        self.driver.i3cControllerInit.assert_called_once()
+
+    def test_i3c_failure_without_error_list_reports_the_result(self):
+        i3c = SupernovaI3CBlockingInterface(self.driver, self.controller, MagicMock())
+        self.driver.i3cWrite.side_effect = lambda id, *args: threading.Thread(
+            target=self.controller.handle_response,
+            kwargs={"transfer_id": id, "response": {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": []}}},
+            daemon=True).start()
+        write = i3c.prepare_write(0x08, TransferMode.I3C_SDR, [0x4E], [0x0F])
+
+        self.assertEqual(write.execute(), (False, "I3C_TRANSFER_FAIL"))
+        self.assertEqual(i3c.write(0x08, TransferMode.I3C_SDR, [0x4E], [0x0F]), (False, "I3C_TRANSFER_FAIL"))
+
+    def test_arguments_are_validated_once(self):
+        i2c = SupernovaI2CBlockingInterface(self.driver, self.controller, MagicMock())
+        i3c = SupernovaI3CBlockingInterface(self.driver, self.controller, MagicMock())
+        spi = SupernovaSPIControllerBlockingInterface(self.driver, self.controller, MagicMock())
+
+        with self.assertRaises(ValueError):
+            i2c.prepare_read(0x80, [0x10], 1)
+        with self.assertRaises(ValueError):
+            i2c.prepare_write(0x50, [0x10], [0x100])
+        with self.assertRaises(ValueError):
+            i3c.prepare_read(0x08, "SDR", [0x1D], 2)
+        with self.assertRaises(ValueError):
+            spi.prepare_transfer([0x01], 2048)
+
+
+if __name__ == "__main__":
+    unittest.main()
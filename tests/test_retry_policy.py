@@ -0,0 +1,115 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+from supernovacontroller.sequential.retry import RetryPolicy
+from supernovacontroller.sequential.transaction_script import TransactionScript
+
+SUCCESS = {"header": {"result": "I3C_TRANSFER_SUCCESS"}, "data": [0x42]}
+NACK = {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["NACK_ERROR"]}}
+INVALID = {"header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["INVALID_REQUEST_ERROR"]}}
+
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_attempts_per_error_class(self):
+        policy = RetryPolicy(max_attempts=3, errors={"NACK_ERROR": 5, "TIMEOUT_ERROR": 2})
+
+        self.assertEqual(policy.attempts_for("NACK_ERROR"), 5)
+        self.assertEqual(policy.attempts_for(["TIMEOUT_ERROR", "NACK_ERROR"]), 5)
+        self.assertEqual(policy.attempts_for("INVALID_REQUEST_ERROR"), 1)
+        self.assertEqual(RetryPolicy(max_attempts=4).attempts_for("I2C_NACK_ADDRESS"), 4)
+
+    def test_backoff_is_exponential_and_bounded(self):
+        policy = RetryPolicy(backoff_s=0.001, backoff_factor=2, max_backoff_s=0.003)
+
+        self.assertEqual([policy.delay(retry) for retry in (1, 2, 3)], [0.001, 0.002, 0.003])
+
+
+class TestInterfaceRetries(unittest.TestCase):
+    def setUp(self):
+        self.controller = MagicMock()
+        self.i3c = SupernovaI3CBlockingInterface(MagicMock(), self.controller, MagicMock())
+        self.i3c.initialized = True
+        self.i3c.set_retry_policy(RetryPolicy(max_attempts=3, backoff_s=0))
+
+    def test_transient_errors_are_retried(self):
+        self.controller.sync_submit.side_effect = [[NACK], [NACK], [SUCCESS]]
+
+        self.assertEqual(self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1), (True, [0x42]))
+        self.assertEqual(self.i3c.retry_statistics.snapshot(), {
+            "transfers": 1, "retries": 2, "recovered": 1, "exhausted": 0, "errors": {"NACK_ERROR": 2},
+        })
+
+    def test_attempts_are_bounded(self):
+        self.controller.sync_submit.side_effect = [[NACK], [NACK], [NACK], [SUCCESS]]
+
+        self.assertEqual(self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1), (False, "NACK_ERROR"))
+        self.assertEqual(self.controller.sync_submit.call_count, 3)
+        self.assertEqual(self.i3c.retry_statistics.exhausted, 1)
+
+    def test_permanent_errors_are_not_retried(self):
+        self.controller.sync_submit.side_effect = [[INVALID], [SUCCESS]]
+
+        self.assertEqual(self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1), (False, "INVALID_REQUEST_ERROR"))
+        self.assertEqual(self.controller.sync_submit.call_count, 1)
+
+    def test_only_failed_transfers_of_a_batch_are_retried(self):
+        prepared = self.i3c.prepare_read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1)
+        self.controller.sync_submit.side_effect = [[SUCCESS, NACK, SUCCESS, NACK], [SUCCESS, SUCCESS]]
+
+        self.assertEqual(prepared.execute_many(4), [(True, [0x42])] * 4)
+        self.assertEqual(len(self.controller.sync_submit.call_args_list[1][0][0]), 2)
+
+    def test_no_policy_keeps_failures(self):
+        self.i3c.set_retry_policy(None)
+        self.controller.sync_submit.side_effect = [[NACK], [SUCCESS]]
+
+        self.assertEqual(self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, [0x00], 1), (False, "NACK_ERROR"))
+
+
+class FlakyI2CDevice:
+    """
+    Device whose I2C target NACKs every other read.
+    """
+
+    def __init__(self):
+        self.controller = SupernovaTransferController()
+        self.driver = MagicMock()
+        self.driver.i2cReadFrom.side_effect = self.read_from
+        self.i2c = SupernovaI2CBlockingInterface(self.driver, self.controller, MagicMock())
+        self.reads = 0
+
+    def create_interface(self, interface_name):
+        return self.i2c
+
+    def read_from(self, id, address, register, length):
+        self.reads += 1
+        status = "I2C_NACK_ADDRESS" if self.reads % 2 == 0 else "NO_TRANSFER_ERROR"
+        response = {"id": id, "name": "I2C READ FROM", "status": status, "data": [register[0]] * length}
+        threading.Thread(target=self.controller.handle_response, kwargs={"transfer_id": id, "response": response}, daemon=True).start()
+
+
+class TestScriptRetries(unittest.TestCase):
+    def test_batched_steps_are_retried(self):
+        device = FlakyI2CDevice()
+        script = TransactionScript({
+            "steps": [{"op": "i2c.read", "id": f"r{register}", "address": 0x50, "register": [register], "length": 1}
+                      for register in range(4)],
+        })
+
+        (success, report) = script.run(device, retry_policy=RetryPolicy(backoff_s=0))
+
+        self.assertTrue(success)
+        self.assertEqual(report["results"], {f"r{register}": [register] for register in range(4)})
+        # Reads 2 and 4 fail, then the retry of read 4 fails again
+        self.assertEqual([step["retries"] for step in report["steps"]], [0, 1, 0, 2])
+        self.assertEqual(report["retries"], 3)
+        self.assertEqual(report["batches"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from supernovacontroller.errors import TransferTimeoutError
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.flow_control import FlowControl
+from supernovacontroller.sequential.scheduler import FairQueue, Priority
+
+
+class TestFairQueue(unittest.TestCase):
+    def test_higher_priority_is_served_first(self):
+        queue = FairQueue()
+        queue.push(Priority.BULK, "spi", "bulk")
+        queue.push(Priority.INTERRUPT, "ibi", "interrupt")
+        queue.push(Priority.NORMAL, "i3c", "normal")
+
+        self.assertEqual([queue.pop() for _ in range(3)], ["interrupt", "normal", "bulk"])
+        self.assertEqual(len(queue), 0)
+
+    def test_flows_of_a_class_are_served_round_robin(self):
+        queue = FairQueue()
+        for index in range(3):
+            queue.push(Priority.BULK, "a", f"a{index}")
+        queue.push(Priority.BULK, "b", "b0")
+        queue.push(Priority.BULK, "b", "b1")
+
+        self.assertEqual([queue.pop() for _ in range(5)], ["a0", "b0", "a1", "b1", "a2"])
+
+    def test_remove(self):
+        queue = FairQueue()
+        queue.push(Priority.NORMAL, "a", "first")
+        queue.push(Priority.NORMAL, "a", "second")
+
+        queue.remove(Priority.NORMAL, "a", "first")
+
+        self.assertEqual((len(queue), queue.pop()), (1, "second"))
+
+
+class TestPriorityScheduling(unittest.TestCase):
+    def wait_for_waiters(self, flow_control, count):
+        while flow_control.get_statistics()["waiting_submitters"] < count:
+            time.sleep(0.001)
+
+    def test_interrupt_transfers_jump_ahead_of_bulk_traffic(self):
+        flow_control = FlowControl(initial_window=1, max_window=1)
+        controller = SupernovaTransferController(flow_control=flow_control)
+        issued = []
+        lock = threading.Lock()
+
+        def request(name):
+            def issue(id):
+                with lock:
+                    issued.append((name, id))
+            return issue
+
+        # Fill the window, then queue bulk traffic and an interrupt service transfer behind it
+        controller.submit(request("first"))
+
+        def submit(name, priority):
+            with controller.scheduling(priority, flow=name):
+                controller.submit(request(name))
+
+        submitters = [threading.Thread(target=submit, args=(f"bulk{index}", Priority.BULK), daemon=True) for index in range(3)]
+        for thread in submitters:
+            thread.start()
+        self.wait_for_waiters(flow_control, 3)
+        submitters.append(threading.Thread(target=submit, args=("ibi", Priority.INTERRUPT), daemon=True))
+        submitters[-1].start()
+        self.wait_for_waiters(flow_control, 4)
+
+        # Answer every transfer as soon as it is issued
+        answered = 0
+        while answered < 5:
+            with lock:
+                pending = issued[answered:]
+            for (_, transfer_id) in pending:
+                controller.handle_response(transfer_id=transfer_id, response=None)
+            answered += len(pending)
+            time.sleep(0.001)
+
+        self.assertEqual([name for (name, _) in issued][:2], ["first", "ibi"])
+        self.assertIn("INTERRUPT", flow_control.get_statistics()["max_queueing_delay_ns_by_priority"])
+
+    def test_scheduling_blocks_nest(self):
+        controller = SupernovaTransferController()
+
+        with controller.scheduling(Priority.CONTROL, flow="user"):
+            # Defaults of an interface do not override the caller
+            with controller.scheduling(Priority.BULK, flow="bulk", override=False):
+                self.assertEqual(controller.current_scheduling(), (Priority.CONTROL, "user"))
+            with controller.scheduling(Priority.INTERRUPT):
+                self.assertEqual(controller.current_scheduling(), (Priority.INTERRUPT, "user"))
+
+        self.assertEqual(controller.current_scheduling(), (Priority.NORMAL, threading.get_ident()))
+
+    def test_expired_waiter_leaves_the_queue(self):
+        flow_control = FlowControl(initial_window=1)
+        flow_control.acquire()
+
+        with self.assertRaises(TransferTimeoutError):
+            flow_control.acquire(timeout=0.01, priority=Priority.CONTROL, flow="a")
+
+        self.assertEqual(flow_control.get_statistics()["waiting_submitters"], 0)
+        flow_control.release()
+        flow_control.acquire(timeout=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.i3c_target import I3CTargetNotificationHandler
+from supernovacontroller.soak import FakeSupernovaDriver, SoakHarness, find_drift
+
+
+def samples(**metrics):
+    count = len(next(iter(metrics.values())))
+    return [{metric: values[index] for metric, values in metrics.items()} for index in range(count)]
+
+
+class TestFindDrift(unittest.TestCase):
+    def test_steady_metrics_are_not_reported(self):
+        steady = samples(rss_bytes=[100 * 1024 * 1024] * 10, pending_sequences=[3, 0, 5, 2, 4, 1, 3, 0, 2, 4])
+
+        self.assertEqual(find_drift(steady), [])
+
+    def test_growing_structures_are_reported(self):
+        growing = samples(rss_bytes=[1024 * 1024 * 1024] * 10, pending_sequences=[100 * index for index in range(10)])
+
+        self.assertEqual([finding["metric"] for finding in find_drift(growing)], ["pending_sequences"])
+
+    def test_latency_drift_is_reported(self):
+        drifting = samples(latency_p99_ns=[1_000_000] * 5 + [10_000_000] * 5)
+
+        self.assertEqual([finding["metric"] for finding in find_drift(drifting)], ["latency_p99_ns"])
+
+
+class TestSoakHarness(unittest.TestCase):
+    def test_short_soak_with_lost_responses(self):
+        driver = FakeSupernovaDriver(latency_s=0.0001, loss_rate=0.002, notification_interval_s=0.001)
+        harness = SoakHarness(driver=driver, workers=3, default_timeout=0.05)
+        handlers = len(harness.device.notification_handlers)
+        try:
+            report = harness.run(duration_s=1.0, sample_interval_s=0.1)
+        finally:
+            harness.device.close()
+
+        # The latencies of a one second run on a shared host are too noisy to judge, only growth is checked
+        self.assertEqual([finding for finding in report["findings"] if not finding["metric"].startswith("latency_")], [])
+        self.assertTrue(all(count > 0 for count in report["operations"].values()))
+        self.assertGreater(driver.notifications, 0)
+
+        # Only the ids of cancelled transfers, waiting for a late response, stay in flight
+        controller = harness.device.controller
+        self.assertEqual((controller.request_states, controller.transfer_states), ({}, {}))
+        # Late responses may still arrive after the report, so both are read now that the device is closed
+        self.assertEqual(controller.get_statistics()["in_flight"], len(controller.cancelled_ids))
+        self.assertLessEqual(len(controller.cancelled_ids), controller.MAX_CANCELLED_IDS)
+        self.assertEqual(max(sample["notification_handlers"] for sample in report["samples"]), handlers)
+
+    def test_unread_target_notifications_are_bounded(self):
+        handler = I3CTargetNotificationHandler(MagicMock())
+        notification = {"name": "I3C TARGET NOTIFICATION"}
+
+        for _ in range(I3CTargetNotificationHandler.MAX_PENDING_NOTIFICATIONS + 10):
+            handler.handle_i3c_target_notification("I3C TARGET NOTIFICATION", dict(notification))
+
+        self.assertEqual(len(handler.high_notification_queue), I3CTargetNotificationHandler.MAX_PENDING_NOTIFICATIONS)
+        self.assertEqual(handler.dropped_notifications, 10)
+        self.assertEqual(handler.wait_for_notification(0)[0], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.utils.system_message import SystemOpcode
+
+from supernovacontroller.errors import BackendError
+from supernovacontroller.sequential import SupernovaDevice
+
+
+# Cold import budget of supernovacontroller.sequential, in milliseconds. It can be overridden for slow machines.
+IMPORT_BUDGET_MS = float(os.environ.get("SUPERNOVA_IMPORT_BUDGET_MS", "250"))
+
+IMPORT_BENCHMARK = """
+import json, sys, time
+start = time.perf_counter()
+import supernovacontroller.sequential
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "modules": sorted(sys.modules)}))
+"""
+
+INTERFACE_MODULES = [
+    "supernovacontroller.sequential.gpio",
+    "supernovacontroller.sequential.i2c",
+    "supernovacontroller.sequential.i3c",
+    "supernovacontroller.sequential.i3c_target",
+    "supernovacontroller.sequential.spi_controller",
+    "supernovacontroller.sequential.uart",
+    "BinhoSupernova.Supernova",
+    "BinhoSupernova.commands.definitions",
+    "asyncio",
+]
+
+
+def run_import_benchmark():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_BENCHMARK], cwd=root)
+    return json.loads(output)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_interfaces_are_not_imported_with_the_package(self):
+        modules = run_import_benchmark()["modules"]
+
+        for module in INTERFACE_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_import_time_is_within_budget(self):
+        # The best of a few runs filters out the noise of the machine
+        elapsed_ms = min(run_import_benchmark()["elapsed_ms"] for _ in range(3))
+
+        self.assertLess(elapsed_ms, IMPORT_BUDGET_MS)
+
+
+class TestDeferredInterfaces(unittest.TestCase):
+    def setUp(self):
+        self.device = SupernovaDevice()
+        self.device.driver = MagicMock()
+        self.device.driver.open.return_value = {"opcode": SystemOpcode.OK.value, "message": "Connection opened"}
+        self.device.mounted = True
+        self.device.controller = MagicMock()
+        self.device.controller.sync_submit.return_value = [{"name": "I3C CONTROLLER INIT", "result": "I3C_CONTROLLER_INIT_SUCCESS"}]
+
+    def tearDown(self):
+        self.device.running = False
+
+    def test_interface_class_is_resolved_on_creation(self):
+        from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+
+        i2c = self.device.create_interface("i2c")
+
+        self.assertIsInstance(i2c, SupernovaI2CBlockingInterface)
+        self.assertIs(self.device.interfaces["i2c"][1], SupernovaI2CBlockingInterface)
+        self.assertIs(self.device.create_interface("i2c"), i2c)
+
+    def test_i3c_controller_is_initialized_on_first_use(self):
+        i3c = self.device.create_interface("i3c.controller")
+        self.device.controller.sync_submit.assert_not_called()
+
+        # Every command goes through the controller, which initializes the Supernova the first time
+        i3c.controller
+        i3c.controller
+        i3c.controller_init()
+
+        self.assertTrue(i3c.initialized)
+        self.assertEqual(self.device.controller.sync_submit.call_count, 1)
+
+    def test_failed_implicit_i3c_controller_init_raises(self):
+        self.device.controller.sync_submit.return_value = [{"name": "I3C CONTROLLER INIT", "result": "I3C_CONTROLLER_INIT_FAILED"}]
+        i3c = self.device.create_interface("i3c.controller")
+
+        with self.assertRaises(BackendError):
+            i3c.controller
+        self.assertFalse(i3c.initialized)
+
+        # The next command tries again
+        self.device.controller.sync_submit.return_value = [{"name": "I3C CONTROLLER INIT", "result": "I3C_CONTROLLER_INIT_SUCCESS"}]
+        i3c.controller
+        self.assertTrue(i3c.initialized)
+        self.assertEqual(self.device.controller.sync_submit.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.sequential.device_state import DeviceStateShadow
+from supernovacontroller.sequential.gpio import SupernovaGPIOInterface
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.i3c import SupernovaI3CBlockingInterface
+from supernovacontroller.sequential.uart import SupernovaUARTBlockingInterface
+
+I2C_WRITE_OK = {"name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}
+I2C_PARAMETERS_OK = {"name": "I2C SET PARAMETERS", "completed": 0}
+I3C_BUS_VOLTAGE_OK = {"name": "SET I3C BUS VOLTAGE", "result": "SYS_NO_ERROR"}
+
+
+class GatedController:
+    """
+    Answers every sequence with the next canned response, but holds the first one until released.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def sync_submit(self, sequence):
+        with self.lock:
+            first = not self.entered.is_set()
+            self.entered.set()
+            response = self.responses.pop(0)
+        if first:
+            self.release.wait(5)
+        return [response]
+
+
+class TestInterfaceLocks(unittest.TestCase):
+    def test_transfer_and_parameter_change_do_not_interleave(self):
+        controller = GatedController([I2C_WRITE_OK, I2C_PARAMETERS_OK])
+        i2c = SupernovaI2CBlockingInterface(MagicMock(), controller, MagicMock())
+
+        writer = threading.Thread(target=i2c.write, args=(0x50, [0x00], [0x01]), daemon=True)
+        writer.start()
+        controller.entered.wait(5)
+
+        configured = threading.Event()
+        configurer = threading.Thread(target=lambda: (i2c.set_parameters(400000), configured.set()), daemon=True)
+        configurer.start()
+
+        # The configuration waits for the write in progress
+        self.assertFalse(configured.wait(0.05))
+        controller.release.set()
+        self.assertTrue(configured.wait(5))
+        self.assertEqual(i2c.get_parameters(), (True, 400000))
+
+    def test_interfaces_do_not_block_each_other(self):
+        controller = GatedController([I2C_WRITE_OK])
+        i2c = SupernovaI2CBlockingInterface(MagicMock(), controller, MagicMock())
+        other = SupernovaI2CBlockingInterface(MagicMock(), MagicMock(), MagicMock())
+
+        writer = threading.Thread(target=i2c.write, args=(0x50, [0x00], [0x01]), daemon=True)
+        writer.start()
+        controller.entered.wait(5)
+
+        # Another interface is used while the first one is busy
+        self.assertEqual(other.get_parameters(), (True, 1000000))
+        controller.release.set()
+        writer.join(5)
+
+    def test_caller_can_hold_the_lock_across_calls(self):
+        i2c = SupernovaI2CBlockingInterface(MagicMock(), MagicMock(), MagicMock())
+        finished = threading.Event()
+
+        with i2c.lock:
+            threading.Thread(target=lambda: (i2c.get_parameters(), finished.set()), daemon=True).start()
+            self.assertFalse(finished.wait(0.05))
+        self.assertTrue(finished.wait(5))
+
+    def test_waiting_for_notifications_does_not_hold_the_lock(self):
+        uart = SupernovaUARTBlockingInterface(MagicMock(), MagicMock(), MagicMock())
+        uart.uart_notification = MagicMock()
+        uart.uart_notification.wait_for_notification.side_effect = lambda timeout: (threading.Event().wait(timeout), None)
+
+        waiter = threading.Thread(target=uart.wait_for_notification, args=(0.5,), daemon=True)
+        waiter.start()
+
+        self.assertTrue(uart.lock.acquire(timeout=0.2))
+        uart.lock.release()
+        waiter.join(5)
+
+    def test_shared_rail_has_a_lock(self):
+        state = DeviceStateShadow()
+
+        self.assertIs(state.key_lock(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE),
+                      state.key_lock(DeviceStateShadow.I2C_SPI_UART_BUS_VOLTAGE))
+
+    def test_interfaces_sharing_a_rail_set_it_once(self):
+        controller = GatedController([I3C_BUS_VOLTAGE_OK, I3C_BUS_VOLTAGE_OK])
+        state = DeviceStateShadow()
+        i3c = SupernovaI3CBlockingInterface(MagicMock(), controller, MagicMock(), state)
+        i3c.initialized = True
+        # The GPIO pins of Rev. B are powered by the I3C rail
+        gpio = SupernovaGPIOInterface(MagicMock(), controller, MagicMock(), "HW-B", state)
+
+        setter = threading.Thread(target=i3c.set_bus_voltage, args=(1800,), daemon=True)
+        setter.start()
+        controller.entered.wait(5)
+
+        result = []
+        configurer = threading.Thread(target=lambda: result.append(gpio.set_pins_voltage(1800)), daemon=True)
+        configurer.start()
+
+        # The GPIO interface waits for the I3C one instead of sending its own command
+        configurer.join(0.05)
+        self.assertFalse(result)
+        controller.release.set()
+        configurer.join(5)
+        self.assertEqual(result, [(True, 1800)])
+        self.assertEqual(len(controller.responses), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
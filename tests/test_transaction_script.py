@@ -0,0 +1,129 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from supernovacontroller.errors import ScriptValidationError
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.sequential.transaction_script import TransactionScript
+
+
+
+class FakeI2CDevice:
+    """
+    Device with an I2C interface whose driver answers from a register map.
+    """
+
+    def __init__(self):
+        self.controller = SupernovaTransferController()
+        self.registers = {0x10: 0x81, 0x11: 0x00}
+        self.driver = MagicMock()
+        self.driver.i2cReadFrom.side_effect = self.read_from
+        self.driver.i2cWrite.side_effect = self.write
+        self.i2c = SupernovaI2CBlockingInterface(self.driver, self.controller, MagicMock())
+        self.submissions = 0
+        submit = self.controller.submit
+
+        def counting_submit(*args, **kwargs):
+            self.submissions += 1
+            return submit(*args, **kwargs)
+
+        self.controller.submit = counting_submit
+
+    def create_interface(self, interface_name):
+        return self.i2c
+
+    def respond(self, id, response):
+        response["id"] = id
+        threading.Thread(target=self.controller.handle_response, kwargs={"transfer_id": id, "response": response}, daemon=True).start()
+
+    def read_from(self, id, address, register, length):
+        data = [self.registers.get(register[0] + offset, 0) for offset in range(length)]
+        self.respond(id, {"name": "I2C READ FROM", "status": "NO_TRANSFER_ERROR", "data": data})
+
+    def write(self, id, address, register, data):
+        for offset, value in enumerate(data):
+            self.registers[register[0] + offset] = value
+        self.respond(id, {"name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"})
+
+
+class TestTransactionScript(unittest.TestCase):
+    def test_read_modify_write(self):
+        device = FakeI2CDevice()
+        script = TransactionScript({
+            "constants": {"EEPROM": 0x50, "CONFIG": 0x10},
+            "steps": [
+                {"op": "i2c.read", "id": "config", "address": "EEPROM", "register": ["CONFIG"], "length": 1},
+                {"op": "i2c.write", "address": "EEPROM", "register": ["CONFIG"], "data": ["config[0] & ~0x01 | 0x10"]},
+                {"op": "i2c.read", "id": "check", "address": "EEPROM", "register": ["CONFIG"], "length": 2},
+            ],
+        })
+
+        (success, report) = script.run(device)
+
+        self.assertTrue(success)
+        self.assertEqual(device.registers[0x10], 0x90)
+        self.assertEqual(report["results"], {"config": [0x81], "check": [0x90, 0x00]})
+        self.assertEqual(len(report["steps"]), 3)
+        self.assertTrue(all(step["duration_ns"] >= 0 for step in report["steps"]))
+
+    def test_independent_steps_are_batched(self):
+        device = FakeI2CDevice()
+        script = TransactionScript({
+            "steps": [
+                {"op": "i2c.write", "address": 0x50, "register": [0x20 + n], "data": [n]} for n in range(8)
+            ] + [
+                {"op": "i2c.read", "id": "first", "address": 0x50, "register": [0x20], "length": 8},
+                {"op": "wait", "ms": 1},
+                {"op": "i2c.write", "address": 0x50, "register": [0x30], "data": "first"},
+            ],
+        })
+
+        (success, report) = script.run(device)
+
+        self.assertTrue(success)
+        self.assertEqual(report["batches"], 2)
+        self.assertEqual(device.submissions, 2)
+        self.assertEqual([device.registers[0x30 + n] for n in range(8)], list(range(8)))
+
+    def test_constants_can_be_overridden(self):
+        device = FakeI2CDevice()
+        script = TransactionScript({
+            "constants": {"VALUE": 0},
+            "steps": [{"op": "i2c.write", "address": 0x50, "register": [0x11], "data": ["VALUE"]}],
+        })
+
+        script.run(device, constants={"VALUE": 7})
+
+        self.assertEqual(device.registers[0x11], 7)
+        with self.assertRaises(ScriptValidationError):
+            script.run(device, constants={"OTHER": 1})
+
+    def test_invalid_scripts_are_rejected(self):
+        invalid_steps = [
+            {"op": "i2c.teleport"},
+            {"op": "i2c.read", "address": 0x50},
+            {"op": "i2c.write", "address": 0x50, "data": ["undefined_name"]},
+            {"op": "i2c.write", "address": 0x50, "data": ["__import__('os')"]},
+            {"op": "gpio.write", "pin": "GPIO_99", "level": "HIGH"},
+            {"op": "call", "interface": "i2c", "method": "_private"},
+            {"op": "wait", "ms": -1},
+        ]
+
+        for step in invalid_steps:
+            with self.assertRaises(ScriptValidationError):
+                TransactionScript({"steps": [step]})
+
+    def test_yaml_and_json_scripts(self):
+        text = '{"steps": [{"op": "wait", "ms": 0}]}'
+
+        self.assertEqual(len(TransactionScript.from_string(text).steps), 1)
+        try:
+            import yaml
+        except ImportError:
+            self.skipTest("PyYAML is not installed")
+        self.assertEqual(len(TransactionScript.from_string("steps:\n  - op: wait\n    ms: 0\n", "yaml").steps), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
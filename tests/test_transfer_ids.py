@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from supernovacontroller.sequential.controller import SupernovaTransferController, TransferIdAllocator
+
+
+class TestTransferIdAllocator(unittest.TestCase):
+    def test_ids_wrap_and_skip_zero(self):
+        allocator = TransferIdAllocator(start_id=65534)
+
+        self.assertEqual([next(allocator) for _ in range(3)], [65535, 1, 2])
+        self.assertEqual(allocator.get_statistics()["wraps"], 1)
+
+    def test_ids_in_flight_are_never_reused(self):
+        allocator = TransferIdAllocator()
+        outstanding = allocator.allocate_many(10)
+        for transfer_id in outstanding[1:]:
+            allocator.release(transfer_id)
+
+        # Go around the whole id space: id 1 is still in flight and must be skipped
+        ids = allocator.allocate_many(TransferIdAllocator.MAX_ID - 1)
+
+        self.assertNotIn(outstanding[0], ids)
+        self.assertNotIn(0, ids)
+        self.assertEqual(len(set(ids)), len(ids))
+        with self.assertRaises(RuntimeError):
+            allocator.allocate()
+
+    def test_peak_in_flight(self):
+        allocator = TransferIdAllocator()
+        ids = allocator.allocate_many(100)
+        for transfer_id in ids:
+            allocator.release(transfer_id)
+        allocator.allocate()
+
+        statistics = allocator.get_statistics()
+        self.assertEqual((statistics["in_flight"], statistics["peak_in_flight"], statistics["allocated"]), (1, 100, 101))
+
+
+class TestControllerIds(unittest.TestCase):
+    def test_thousands_of_outstanding_transfers(self):
+        controller = SupernovaTransferController(TransferIdAllocator(start_id=65000))
+        issued = []
+        lock = threading.Lock()
+
+        def request(id):
+            with lock:
+                issued.append(id)
+
+        results = []
+        count = 3000
+        for index in range(count):
+            controller.submit(request, on_ready=lambda responses: results.append(responses[0]))
+        while len(issued) < count:
+            threading.Event().wait(0.001)
+
+        self.assertEqual(controller.get_statistics()["in_flight"], count)
+        self.assertEqual(len(set(issued)), count)
+
+        # Answer out of order; every response reaches its own transfer
+        for transfer_id in reversed(issued):
+            self.assertTrue(controller.handle_response(transfer_id=transfer_id, response=transfer_id))
+
+        self.assertEqual(sorted(results), sorted(issued))
+        statistics = controller.get_statistics()
+        self.assertEqual((statistics["in_flight"], statistics["peak_in_flight"]), (0, count))
+        self.assertGreaterEqual(statistics["wraps"], 1)
+        # Completed sequences are forgotten
+        self.assertEqual(controller.request_states, {})
+        self.assertEqual(controller.transfer_states, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
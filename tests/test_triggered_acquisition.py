@@ -0,0 +1,101 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from BinhoSupernova.commands.definitions import GpioPinNumber, GpioTriggerType
+from supernovacontroller.sequential.acquisition import TriggeredAcquisition
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.sequential.flow_control import FlowControl
+from supernovacontroller.sequential.gpio import SupernovaGPIOInterface
+
+
+class TestTriggeredAcquisition(unittest.TestCase):
+    def setUp(self):
+        self.subscriptions = {}
+
+        def notification_subscription(name, filter_func, handler_func):
+            self.subscriptions[name] = (filter_func, handler_func)
+
+        self.controller = SupernovaTransferController(flow_control=FlowControl(initial_window=1, max_window=1))
+        self.gpio = SupernovaGPIOInterface(MagicMock(), MagicMock(), notification_subscription, "HW-C")
+        self.release_response = threading.Event()
+        self.release_response.set()
+
+        def request(id):
+            def respond():
+                self.release_response.wait()
+                self.controller.handle_response(transfer_id=id, response={"id": id, "data": [id]})
+            threading.Thread(target=respond, daemon=True).start()
+
+        self.decode_error = None
+
+        def decode(response):
+            if self.decode_error is not None:
+                raise self.decode_error
+            return (True, response["data"])
+
+        self.acquisition = TriggeredAcquisition(self.controller, request, decode, max_samples=4)
+        self.acquisition.trigger_on_gpio(self.gpio, GpioPinNumber.GPIO_5)
+        self.acquisition.start()
+
+    def trigger(self):
+        message = {"name": "GPIO INTERRUPTION", "pin_number": GpioPinNumber.GPIO_5.name}
+        for name, (filter_func, handler_func) in self.subscriptions.items():
+            if filter_func(name, message):
+                handler_func(name, message)
+
+    def test_each_trigger_produces_a_sample(self):
+        for _ in range(3):
+            self.trigger()
+            sample = self.acquisition.get_sample(timeout=1)
+            self.assertIsNotNone(sample)
+            self.assertTrue(sample.success)
+            self.assertGreaterEqual(sample.latency_ns, 0)
+
+        statistics = self.acquisition.get_statistics()
+        self.assertEqual(statistics["triggers"], 3)
+        self.assertEqual(statistics["completed"], 3)
+        self.assertIsNotNone(statistics["latency_avg_ns"])
+
+    def test_triggers_are_skipped_while_a_read_is_in_flight(self):
+        self.release_response.clear()
+        self.trigger()
+        self.trigger()
+        self.release_response.set()
+
+        samples = list(self.acquisition.samples(timeout=0.5))
+        self.assertEqual([sample.sequence for sample in samples], [0])
+        self.assertEqual(self.acquisition.get_statistics()["skipped"], 1)
+
+    def test_triggers_are_skipped_while_the_window_is_full(self):
+        self.release_response.clear()
+        self.controller.submit(lambda id: None)
+        self.trigger()
+        self.release_response.set()
+
+        self.assertIsNone(self.acquisition.get_sample(timeout=0.05))
+        statistics = self.acquisition.get_statistics()
+        self.assertEqual((statistics["triggers"], statistics["skipped"]), (1, 1))
+        self.assertEqual(self.acquisition.in_flight, 0)
+
+    def test_decode_errors_are_failed_samples(self):
+        self.decode_error = ValueError("Short read")
+        self.trigger()
+        sample = self.acquisition.get_sample(timeout=1)
+        self.assertFalse(sample.success)
+        self.assertEqual(sample.data, "Short read")
+
+        self.decode_error = None
+        self.trigger()
+        self.assertTrue(self.acquisition.get_sample(timeout=1).success)
+
+    def test_no_reads_after_close(self):
+        self.acquisition.close()
+        self.trigger()
+
+        self.assertIsNone(self.acquisition.get_sample(timeout=0.05))
+        self.assertEqual(self.acquisition.get_statistics()["triggers"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()